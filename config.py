@@ -222,12 +222,18 @@ CACHING_GRANULARITY = 'OBJECT'
 # Format in which results are saved.
 # Result readers and writers are located in module ./icarus/results/readwrite.py
 # Currently only PICKLE is supported 
+# STREAM appends the results of each experiment to the output file as soon as
+# it completes, so that they are not lost if the simulation is interrupted
 RESULTS_FORMAT = 'PICKLE'
 
 # Number of times each experiment is replicated
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 3
 
+# Maximum wall-clock duration of each experiment, in seconds. Experiments
+# running longer are interrupted and reported as failed. None for no limit
+JOB_TIMEOUT = None
+
 # List of metrics to be measured in the experiments
 # The implementation of data collectors are located in ./icaurs/execution/collectors.py
 # Remove collectors not needed
@@ -310,6 +316,9 @@ default['workload'] = {'name':       'STATIONARY',
 default['cache_placement']['name'] = 'UNIFORM'
 default['content_placement']['name'] = 'UNIFORM'
 default['cache_policy']['name'] = CACHE_POLICY
+# Cadence of intermediate collector snapshots (optional): an interval in
+# number of 'requests' or of simulated 'time'. Defaults to 500 requests.
+# default['snapshot'] = {'interval': 500, 'unit': 'requests'}
 
 # Create experiments multiplexing all desired parameters
 for alpha in ALPHA:
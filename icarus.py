@@ -21,6 +21,9 @@ def main():
     parser.add_argument("-c", "--config-override", dest="config_override", action="append",
                         help='override specific key=value parameter of configuration file',
                         required=False)
+    parser.add_argument("--resume", dest="resume", action="store_true",
+                        help='keep the results already saved in the results file '
+                             'and only run the experiments missing from it')
     parser.add_argument("config",
                         help="configuration file")
     parser.add_argument('-v', '--version', action='version',
@@ -28,7 +31,7 @@ def main():
     args = parser.parse_args()
     config_override = dict(c.split("=") for c in args.config_override) \
                       if args.config_override else None
-    run(args.config, args.results, config_override)
+    run(args.config, args.results, config_override, args.resume)
 
 if __name__ == "__main__":
     main()
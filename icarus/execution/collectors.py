@@ -144,6 +144,41 @@ class DataCollector(object):
 
         pass
 
+    def optimisation_solved(self, solve_time, timestamp):
+        """Reports that a strategy has solved its optimisation problem
+
+        Parameters
+        ----------
+        solve_time : float
+            Wall-clock time spent in the solver, in seconds
+        timestamp : float
+            The simulation time at which the problem was solved
+        """
+        pass
+
+    def replication(self, s, d):
+        """Reports that node *s* requested the replication of a content to
+        node *d*
+
+        Parameters
+        ----------
+        s : any hashable type
+            Storage requesting node
+        d : any hashable type
+            Destination node
+        """
+        pass
+
+    def replication_hop(self, content):
+        """Reports that a content has made one more replication hop
+
+        Parameters
+        ----------
+        content : Message
+            The replicated content
+        """
+        pass
+
     def reassign_vm(self, node, serviceToReplace, serviceToAdd):
         """ Reports the instantiation of a VM running the service "serviceToAdd",
             optionally replacing a VM which is running the service serviceToReplace.
@@ -196,6 +231,22 @@ class DataCollector(object):
         """
         pass
 
+    def snapshot(self, timestamp):
+        """Reports that a periodic snapshot of the intermediate results should
+        be taken, e.g. appended to the report files of the collector.
+
+        Unlike `results`, this is called repeatedly during the simulation, so
+        collectors should only report the state that changed since the last
+        snapshot and must not rebuild their aggregated results.
+
+        Parameters
+        ----------
+        timestamp : float
+            The simulation time of the snapshot, or None for the final
+            snapshot taken when the results are collected
+        """
+        pass
+
     def results(self):
         """Returns the aggregated results measured by the collector.
 
@@ -206,6 +257,23 @@ class DataCollector(object):
         """
         pass
 
+    def _report_file(self, path):
+        """Return the report file at *path*, opened for appending. Files stay
+        open across snapshots until `_close_report_files` is called.
+        """
+        files = self.__dict__.setdefault('_report_files', {})
+        if path not in files:
+            files[path] = open(path, 'a')
+        return files[path]
+
+    def _flush_report_files(self):
+        for f in self.__dict__.get('_report_files', {}).values():
+            f.flush()
+
+    def _close_report_files(self):
+        for f in self.__dict__.pop('_report_files', {}).values():
+            f.close()
+
 
 # Note: The implementation of CollectorProxy could be improved to avoid having
 # to rewrite almost identical methods, for example by playing with __dict__
@@ -221,7 +289,8 @@ class CollectorProxy(DataCollector):
     """
 
     EVENTS = ('start_session', 'end_session', 'cache_hit', 'cache_miss', 'server_hit',
-              'request_hop', 'content_hop', 'results', 'replacement_interval_over', 'execute_service', 'reassign_vm')
+              'request_hop', 'content_hop', 'results', 'replacement_interval_over', 'execute_service', 'reassign_vm',
+              'optimisation_solved', 'replication', 'replication_hop', 'snapshot')
 
     def __init__(self, view, collectors):
         """Constructor
@@ -282,11 +351,31 @@ class CollectorProxy(DataCollector):
         for c in self.collectors['reassign_vm']:
             c.reassign_vm(node, serviceToReplace, serviceToAdd)
 
+    @inheritdoc(DataCollector)
+    def optimisation_solved(self, solve_time, timestamp):
+        for c in self.collectors['optimisation_solved']:
+            c.optimisation_solved(solve_time, timestamp)
+
+    @inheritdoc(DataCollector)
+    def replication(self, s, d):
+        for c in self.collectors['replication']:
+            c.replication(s, d)
+
+    @inheritdoc(DataCollector)
+    def replication_hop(self, content):
+        for c in self.collectors['replication_hop']:
+            c.replication_hop(content)
+
     @inheritdoc(DataCollector)
     def end_session(self, success=True, time=0, flow_id=0):
         for c in self.collectors['end_session']:
             c.end_session(success, time, flow_id)
 
+    @inheritdoc(DataCollector)
+    def snapshot(self, timestamp):
+        for c in self.collectors['snapshot']:
+            c.snapshot(timestamp)
+
     @inheritdoc(DataCollector)
     def results(self):
         return Tree(**{c.name: c.results() for c in self.collectors['results']})
@@ -357,6 +446,122 @@ class LinkLoadCollector(DataCollector):
 
 
 # @register_log_writer('LATENCY_W_STORAGE')
+class _ChangedState(object):
+    """State changed since the last snapshot of a collector.
+
+    Snapshots write one row per report file with a value for every service,
+    content or node, as `v, v, ...`, but only recompute the values of the
+    services, contents, nodes and labels recorded here. The others are
+    written from the values cached at the previous snapshots. Services,
+    contents and nodes are recorded by the event hooks of the collector,
+    while labels are added by the model, which notifies the sets registered
+    in its `label_watchers`.
+    """
+
+    # Number of contents, from 0, reported in each row of the overheads file
+    n_contents = 1000
+
+    def __init__(self, view):
+        """Constructor
+
+        Parameters
+        ----------
+        view : NetworkView
+            The network view instance
+        """
+        self.view = view
+        model = view.model
+        # Services of the sessions ended since the last snapshot
+        self.services = set()
+        # Contents whose replication hops changed, mapped to the last message
+        # reported for them, if any. Contents placed before the start of the
+        # experiment start with one hop
+        self.contents = dict.fromkeys(c for c, hops in model.replication_hops.items() if hops)
+        # Nodes requesting and receiving replications
+        self.sources = set()
+        self.destinations = set()
+        self.labels = set(model.labels_sources).union(model.request_labels_nodes)
+        model.label_watchers.append(self.labels)
+        # Values written at the last snapshot, keyed by report and column
+        self.values = collections.defaultdict(dict)
+
+    def row(self, report, keys, changed, value, cell=lambda v: str(v) + ", "):
+        """Return the cells of *keys* in a report row, calling *value* only
+        for the keys not reported yet or in *changed*.
+        """
+        cache = self.values[report]
+        for key in changed:
+            cache[key] = cell(value(key))
+        for key in keys:
+            if key not in cache:
+                cache[key] = cell(value(key))
+        return "".join(cache[key] for key in keys)
+
+    def msg_size(self, content):
+        """Return the size of a content, as stored by one of its holders"""
+        msg = self.contents.get(content)
+        if msg is not None and msg.get('msg_size') is not None:
+            return msg['msg_size']
+        storage = self.view.storage_nodes()
+        for node in self.view.model.content_source.get(content, ()):
+            if node in storage:
+                stored = storage[node].hasMessage(content, [])
+                if stored:
+                    return stored['msg_size']
+        return 1000000
+
+    def write_satisfaction(self, res, service_requests, service_satisfied):
+        res.write(self.row('satisfaction', service_requests, self.services,
+                           lambda s: 100 * service_satisfied[s] / service_requests[s]) + "\n")
+        self.services.clear()
+
+    def write_overheads(self, overhead):
+        model = self.view.model
+        for content in self.contents:
+            model.replication_overheads[content] = model.replication_overheads.get(content, 0) + \
+                model.replication_hops[content] * self.msg_size(content)
+            model.replication_hops[content] = 0
+        overhead.write(self.row('overheads', range(self.n_contents), self.contents,
+                                lambda c: model.replication_overheads.get(c, 0)) + "\n")
+        self.contents.clear()
+
+    def write_replications(self, r_replicas, s_replicas, reset):
+        model = self.view.model
+        r_replicas.write(self.row('r_replicas', model.storageSize, self.sources,
+                                  self.view.replications_requests) + "\n")
+        s_replicas.write(self.row('s_replicas', model.storageSize, self.destinations,
+                                  self.view.replications_destination) + "\n")
+        if reset:
+            for node in self.sources:
+                model.replications_from[node] = 0
+                self.values['r_replicas'][node] = "0, "
+            for node in self.destinations:
+                model.replications_to[node] = 0
+                self.values['s_replicas'][node] = "0, "
+        self.sources.clear()
+        self.destinations.clear()
+
+    def write_labels(self, r_labels_dist, s_labels_dist):
+        model = self.view.model
+
+        # One line per label, with its requests or sources per node
+        def requests_line(label):
+            if label not in model.request_labels_nodes:
+                return ""
+            return "".join(str(requests) + ", " for requests in
+                           model.request_labels_nodes[label].values()) + "\n "
+
+        def sources_line(label):
+            sources = self.view.labels_sources([label])
+            return "".join(str(sources[node]) + ", " for node in sources) + "\n "
+
+        r_labels_dist.write(self.row('r_labels', model.labels_sources, self.labels,
+                                     requests_line, cell=str))
+        s_labels_dist.write(self.row('s_labels', model.labels_sources, self.labels,
+                                     sources_line, cell=str))
+        self.labels.clear()
+
+
 @register_data_collector('LATENCY')
 class LatencyCollector(DataCollector):
     """Data collector measuring latency, i.e. the delay taken to delivery a
@@ -408,6 +613,7 @@ class LatencyCollector(DataCollector):
         self.deadline_metric_times = {}
         self.cloud_sat_times = {}
         self.instantiations_times = {}
+        self.solve_times = {}
 
         # Log-specific paths TODO: Maybe set up in the same way that the result output is set up.
         # self.logs_path = logs_path
@@ -419,6 +625,7 @@ class LatencyCollector(DataCollector):
             self.latency_data = collections.deque()
         self.css = self.view.service_nodes()
         # self.n_services = self.css.items()[0][1].numOfVMs
+        self.changed = _ChangedState(view)
 
     @inheritdoc(DataCollector)
     def execute_service(self, flow_id, service, node, timestamp, is_cloud):
@@ -431,6 +638,19 @@ class LatencyCollector(DataCollector):
     def reassign_vm(self, node, serviceToReplace, serviceToAdd):
         self.n_instantiations_interval += 1
 
+    @inheritdoc(DataCollector)
+    def replication(self, s, d):
+        self.changed.sources.add(s)
+        self.changed.destinations.add(d)
+
+    @inheritdoc(DataCollector)
+    def replication_hop(self, content):
+        self.changed.contents[content['content']] = content
+
+    @inheritdoc(DataCollector)
+    def optimisation_solved(self, solve_time, timestamp):
+        self.solve_times[timestamp] = solve_time
+
     @inheritdoc(DataCollector)
     def replacement_interval_over(self, replacement_interval, timestamp):
         if self.interval_sess_count == 0:
@@ -535,6 +755,7 @@ class LatencyCollector(DataCollector):
                 self.deadline_metric_interval += self.flow_deadline[flow_id] - timestamp
 
             service = self.flow_service[flow_id]
+            self.changed.services.add(service['content'])
             if service['content'] not in self.service_requests.keys():
                 self.service_requests[service['content']] = 1
                 self.service_satisfied[service['content']] = 0
@@ -555,7 +776,7 @@ class LatencyCollector(DataCollector):
             pass
 
     @inheritdoc(DataCollector)
-    def results(self):
+    def snapshot(self, timestamp):
         # TODO: Maybe revise the below and make it even more customisable
         if self.view.model.strategy == 'HYBRID':
             res_file = "/hybrid.txt"
@@ -590,102 +811,55 @@ class LatencyCollector(DataCollector):
             overhead_file = "/spec_overheads.txt"
 
         if self.view.model.strategy == 'HYBRID':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_repo.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_repo.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_PRO_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_pro_repo.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_pro_repo.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_RE_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_re_repo.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_re_repo.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_SPEC_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_spec_repo.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_spec_repo.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overheads.txt")
+        # TODO: Possibly create another file, specifically for tracking repo/service-specific performance!!!!!!!!!!!!!!!
+
+        self.changed.write_satisfaction(res, self.service_requests, self.service_satisfied)
+        self.changed.write_overheads(overhead)
+        if self.view.model.strategy != 'HYBRID':
+            self.changed.write_replications(r_replicas, s_replicas, True)
+            self.changed.write_labels(r_labels_dist, s_labels_dist)
+        self._flush_report_files()
+
+    @inheritdoc(DataCollector)
+    def results(self):
+        self.snapshot(None)
         if self.cdf:
             self.results['CDF'] = cdf(self.latency_data)
         results = Tree({'SATISFACTION': 1.0 * self.n_satisfied / self.sess_count})
 
-        # TODO: Possibly create another file, specifically for tracking repo/service-specific performance!!!!!!!!!!!!!!!
-
         per_service_sats = {}
-        per_node_r_replicas_requested = {}
-        per_node_s_replicas_stored = {}
-        per_label_node_storage = {}
-        per_label_node_requests = {}
-        # res.write(str(100*self.n_satisfied/self.sess_count) + " " + str(self.n_satisfied) + " " + str(self.sess_count) + ": \n")
         for service in self.service_requests.keys():
             per_service_sats[service] = 1.0 * self.service_satisfied[service] / self.service_requests[service]
-            res.write(str(100 * self.service_satisfied[service] / self.service_requests[service]) + ", ")
-        res.write("\n")
-
-        for content in range(0, 1000):
-            # overhead.write(str(content) + ": ")
-            msg = dict()
-            msg['content'] = content
-            msg['msg_size'] = 1000000
-            for node in self.view.model.storageSize:
-                if self.view.storage_nodes()[node].hasMessage(content, []):
-                    msg = self.view.storage_nodes()[node].hasMessage(content, [])
-                    break
-            if msg['content'] in self.view.model.replication_overheads:
-                self.view.model.replication_overheads[msg['content']] = self.view.model.replication_overheads[
-                                                                            msg['content']] + \
-                                                                        self.view.model.replication_hops[
-                                                                            msg['content']] * msg['msg_size']
-            else:
-                self.view.model.replication_overheads[msg['content']] = self.view.model.replication_hops[
-                                                                            msg['content']] * msg['msg_size']
-            overhead.write(str(self.view.replication_overhead(content)) + ", ")
-            self.view.model.replication_hops[msg['content']] = 0
-        overhead.write("\n")
-
-        if self.view.model.strategy != 'HYBRID':
-            for node in self.view.model.storageSize:
-                per_node_r_replicas_requested[node] = self.view.replications_requests(node)
-                r_replicas.write(str(per_node_r_replicas_requested[node]) + ", ")
-                self.view.model.replications_from[node] = 0
-            r_replicas.write("\n")
-            for node in self.view.model.storageSize:
-                per_node_s_replicas_stored[node] = self.view.replications_destination(node)
-                s_replicas.write(str(per_node_s_replicas_stored[node]) + ", ")
-                self.view.model.replications_to[node] = 0
-            s_replicas.write("\n")
-
-            # TODO: Modify the following, to include ALL NODES, no matter what!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-
-            for label in self.view.model.labels_sources:
-                # r_labels_dist.write(label + ": ")
-                if label in self.view.model.request_labels_nodes:
-                    for node in self.view.model.request_labels_nodes[label]:
-                        per_label_node_requests[node] = self.view.model.request_labels_nodes[label][node]
-                        r_labels_dist.write(str(per_label_node_requests[node]) + ", ")
-                    r_labels_dist.write("\n ")
-            # r_labels_dist.write("r\n")
-            for label in self.view.model.labels_sources:
-                # s_labels_dist.write(label + ": ")
-                for node in self.view.labels_sources([label]):
-                    per_label_node_storage[node] = self.view.labels_sources([label])[node]
-                    s_labels_dist.write(str(per_label_node_storage[node]) + ", ")
-                s_labels_dist.write("\n ")
 
         results['PER_SERVICE_SATISFACTION'] = per_service_sats
         results['PER_SERVICE_REQUESTS'] = self.service_requests
@@ -697,6 +871,8 @@ class LatencyCollector(DataCollector):
         results['DEADLINE_METRIC'] = self.deadline_metric_times
         results['CLOUD_SAT_TIMES'] = self.cloud_sat_times
         results['INSTANTIATION_OVERHEAD'] = self.instantiations_times
+        if self.solve_times:
+            results['SOLVE_TIMES'] = self.solve_times
 
         print "Printing Sat. rate times:"
         for key in sorted(self.satrate_times):
@@ -706,7 +882,7 @@ class LatencyCollector(DataCollector):
         for key in sorted(self.idle_times):
             print (repr(key) + " " + repr(self.idle_times[key]))
         # results['VMS_PER_SERVICE'] = self.vms_per_service
-        res.close()
+        self._close_report_files()
 
         return results
 
@@ -775,6 +951,7 @@ class RepoStatsLatencyCollector(DataCollector):
             self.latency_data = collections.deque()
         self.css = self.view.service_nodes()
         # self.n_services = self.css.items()[0][1].numOfVMs
+        self.changed = _ChangedState(view)
 
     @inheritdoc(DataCollector)
     def execute_service(self, flow_id, service, node, timestamp, is_cloud):
@@ -787,6 +964,15 @@ class RepoStatsLatencyCollector(DataCollector):
     def reassign_vm(self, node, serviceToReplace, serviceToAdd):
         self.n_instantiations_interval += 1
 
+    @inheritdoc(DataCollector)
+    def replication(self, s, d):
+        self.changed.sources.add(s)
+        self.changed.destinations.add(d)
+
+    @inheritdoc(DataCollector)
+    def replication_hop(self, content):
+        self.changed.contents[content['content']] = content
+
     @inheritdoc(DataCollector)
     def replacement_interval_over(self, replacement_interval, timestamp):
         if self.interval_sess_count == 0:
@@ -891,6 +1077,7 @@ class RepoStatsLatencyCollector(DataCollector):
                 self.deadline_metric_interval += self.flow_deadline[flow_id] - timestamp
 
             service = self.flow_service[flow_id]
+            self.changed.services.add(service['content'])
             if service['content'] not in self.service_requests.keys():
                 self.service_requests[service['content']] = 1
                 self.service_satisfied[service['content']] = 0
@@ -911,7 +1098,7 @@ class RepoStatsLatencyCollector(DataCollector):
             pass
 
     @inheritdoc(DataCollector)
-    def results(self):
+    def snapshot(self, timestamp):
         # TODO: Maybe revise the below and make it even more customisable
         if self.view.model.strategy == 'HYBRID':
             res_file = "/hybrid.txt"
@@ -946,145 +1133,89 @@ class RepoStatsLatencyCollector(DataCollector):
             overhead_file = "/spec_overheads.txt"
 
         if self.view.model.strategy == 'HYBRID':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_repo.txt", 'a')
-            repo_usage = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_usage.txt", 'a')
-            repo_proc_vs_stor = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_proc_vs_stor.txt", 'a')
-            repo_overtime = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_overtime.txt", 'a')
-            repo_incoming_BW = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_incoming.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_repo.txt")
+            repo_usage = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_usage.txt")
+            repo_proc_vs_stor = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_proc_vs_stor.txt")
+            repo_overtime = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_overtime.txt")
+            repo_incoming_BW = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/repo_incoming.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/gen_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_PRO_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_pro_repo.txt", 'a')
-            repo_usage = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_usage.txt", 'a')
-            repo_proc_vs_stor = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_proc_vs_stor.txt", 'a')
-            repo_overtime = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overtime.txt", 'a')
-            repo_incoming_BW = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_incoming.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_pro_repo.txt")
+            repo_usage = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_usage.txt")
+            repo_proc_vs_stor = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_proc_vs_stor.txt")
+            repo_overtime = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overtime.txt")
+            repo_incoming_BW = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_incoming.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/pro_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_RE_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_re_repo.txt", 'a')
-            repo_usage = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_usage.txt", 'a')
-            repo_proc_vs_stor = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_proc_vs_stor.txt", 'a')
-            repo_overtime = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overtime.txt", 'a')
-            repo_incoming_BW = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_incoming.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overheads.txt", 'a')
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_re_repo.txt")
+            repo_usage = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_usage.txt")
+            repo_proc_vs_stor = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_proc_vs_stor.txt")
+            repo_overtime = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overtime.txt")
+            repo_incoming_BW = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_incoming.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/re_overheads.txt")
         elif self.view.model.strategy == 'HYBRIDS_SPEC_REPO_APP':
-            res = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_spec_repo.txt", 'a')
-            repo_usage = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_usage.txt", 'a')
-            repo_proc_vs_stor = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_proc_vs_stor.txt", 'a')
-            repo_overtime = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overtime.txt", 'a')
-            repo_incoming_BW = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_incoming.txt", 'a')
-            r_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_replicas.txt", 'a')
-            s_replicas = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_replicas.txt", 'a')
-            r_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_labels.txt", 'a')
-            s_labels_dist = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_labels.txt", 'a')
-            overhead = open("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overheads.txt", 'a')
-        if self.cdf:
-            self.results['CDF'] = cdf(self.latency_data)
-        results = Tree({'SATISFACTION': 1.0 * self.n_satisfied / self.sess_count})
-
+            res = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/hybrid_spec_repo.txt")
+            repo_usage = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_usage.txt")
+            repo_proc_vs_stor = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_proc_vs_stor.txt")
+            repo_overtime = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overtime.txt")
+            repo_incoming_BW = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_incoming.txt")
+            r_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_replicas.txt")
+            s_replicas = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_replicas.txt")
+            r_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_r_labels.txt")
+            s_labels_dist = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_s_labels.txt")
+            overhead = self._report_file("/home/chrisys/Icarus-repos/IcarusEdgeSim/examples/repos-mgmt/spec_overheads.txt")
         # TODO: Possibly create another file, specifically for tracking repo/service-specific performance!!!!!!!!!!!!!!!
 
-        per_service_sats = {}
-        per_node_r_replicas_requested = {}
-        per_node_s_replicas_stored = {}
-        per_label_node_storage = {}
-        per_label_node_requests = {}
-        per_node_storage_used = {}
-        per_node_proc_vs_stor_used = {}
-        per_node_overtime= {}
-        incoming_bw = {}
-        # res.write(str(100*self.n_satisfied/self.sess_count) + " " + str(self.n_satisfied) + " " + str(self.sess_count) + ": \n")
-        for service in self.service_requests.keys():
-            per_service_sats[service] = 1.0 * self.service_satisfied[service] / self.service_requests[service]
-            res.write(str(100 * self.service_satisfied[service] / self.service_requests[service]) + ", ")
-        res.write("\n")
-
-        for content in range(0, 1000):
-            # overhead.write(str(content) + ": ")
-            msg = dict()
-            msg['content'] = content
-            msg['msg_size'] = 1000000
-            for node in self.view.model.storageSize:
-                if self.view.storage_nodes()[node].hasMessage(content, []):
-                    msg = self.view.storage_nodes()[node].hasMessage(content, [])
-                    break
-            if msg['content'] in self.view.model.replication_overheads:
-                self.view.model.replication_overheads[msg['content']] = self.view.model.replication_overheads[msg['content']] + self.view.model.replication_hops[msg['content']] * msg['msg_size']
-            else:
-                self.view.model.replication_overheads[msg['content']] = self.view.model.replication_hops[msg['content']] * msg['msg_size']
-            overhead.write(str(self.view.replication_overhead(content)) + ", ")
-            self.view.model.replication_hops[msg['content']] = 1
-        overhead.write("\n")
-
+        self.changed.write_satisfaction(res, self.service_requests, self.service_satisfied)
+        self.changed.write_overheads(overhead)
         if self.view.model.strategy != 'HYBRID':
-            for node in self.view.model.storageSize:
-                per_node_r_replicas_requested[node] = self.view.replications_requests(node)
-                r_replicas.write(str(per_node_r_replicas_requested[node]) + ", ")
-            r_replicas.write("\n")
-            for node in self.view.model.storageSize:
-                per_node_s_replicas_stored[node] = self.view.replications_destination(node)
-                s_replicas.write(str(per_node_s_replicas_stored[node]) + ", ")
-            s_replicas.write("\n")
+            self.changed.write_replications(r_replicas, s_replicas, False)
 
+            storage = self.view.storage_nodes()
             for node in self.view.model.storageSize:
-                per_node_storage_used[node] = self.view.storage_nodes()[node].getMessagesSize() + \
-                                              self.view.storage_nodes()[node].getProcMessagesSize() + \
-                                              self.view.storage_nodes()[node].getProcessedMessagesSize()
-                repo_usage.write(str(per_node_storage_used[node]) + ", ")
-            repo_usage.write("\n")
-
-            for node in self.view.model.storageSize:
-                if self.view.storage_nodes()[node].getMessagesSize():
-                    per_node_proc_vs_stor_used[node] = 100 * self.view.storage_nodes()[node].getProcessedMessagesSize() / \
-                                                       self.view.storage_nodes()[node].getMessagesSize()
+                repo = storage[node]
+                used = repo.getMessagesSize() + repo.getProcMessagesSize() + repo.getProcessedMessagesSize()
+                if repo.getMessagesSize():
+                    proc_vs_stor = 100 * repo.getProcessedMessagesSize() / repo.getMessagesSize()
                 else:
-                    per_node_proc_vs_stor_used[node] = 0
-                repo_proc_vs_stor.write(str(per_node_proc_vs_stor_used[node]) + ", ")
+                    proc_vs_stor = 0
+                repo_usage.write(str(used) + ", ")
+                repo_proc_vs_stor.write(str(proc_vs_stor) + ", ")
+                repo_overtime.write(str(repo.getNrofOvertimeMessages()) + ", ")
+                repo_incoming_BW.write(str(repo.getOverallMeanIncomingSpeed()) + ", ")
+            repo_usage.write("\n")
             repo_proc_vs_stor.write("\n")
-
-
-            for node in self.view.model.storageSize:
-                per_node_overtime[node] = self.view.storage_nodes()[node].getNrofOvertimeMessages()
-                repo_overtime.write(str(per_node_overtime[node]) + ", ")
             repo_overtime.write("\n")
-
-
-            for node in self.view.model.storageSize:
-                incoming_bw[node] = self.view.storage_nodes()[node].getOverallMeanIncomingSpeed()
-                repo_incoming_BW.write(str(incoming_bw[node]) + ", ")
             repo_incoming_BW.write("\n")
 
+            self.changed.write_labels(r_labels_dist, s_labels_dist)
+        self._flush_report_files()
 
-            # TODO: Modify the following, to include ALL NODES, no matter what!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    @inheritdoc(DataCollector)
+    def results(self):
+        self.snapshot(None)
+        if self.cdf:
+            self.results['CDF'] = cdf(self.latency_data)
+        results = Tree({'SATISFACTION': 1.0 * self.n_satisfied / self.sess_count})
 
-            for label in self.view.model.labels_sources:
-                # r_labels_dist.write(label + ": ")
-                if label in self.view.model.request_labels_nodes:
-                    for node in self.view.model.request_labels_nodes[label]:
-                        per_label_node_requests[node] = self.view.model.request_labels_nodes[label][node]
-                        r_labels_dist.write(str(per_label_node_requests[node]) + ", ")
-                    r_labels_dist.write("\n ")
-            # r_labels_dist.write("r\n")
-            for label in self.view.model.labels_sources:
-                # s_labels_dist.write(label + ": ")
-                for node in self.view.labels_sources([label]):
-                    per_label_node_storage[node] = self.view.labels_sources([label])[node]
-                    s_labels_dist.write(str(per_label_node_storage[node]) + ", ")
-                s_labels_dist.write("\n ")
+        per_service_sats = {}
+        for service in self.service_requests.keys():
+            per_service_sats[service] = 1.0 * self.service_satisfied[service] / self.service_requests[service]
 
         results['PER_SERVICE_SATISFACTION'] = per_service_sats
         results['PER_SERVICE_REQUESTS'] = self.service_requests
@@ -1105,7 +1236,7 @@ class RepoStatsLatencyCollector(DataCollector):
         for key in sorted(self.idle_times):
             print (repr(key) + " " + repr(self.idle_times[key]))
         # results['VMS_PER_SERVICE'] = self.vms_per_service
-        res.close()
+        self._close_report_files()
 
         return results
 
@@ -12,8 +12,12 @@ from icarus.registry import DATA_COLLECTOR, STRATEGY
 
 __all__ = ['exec_experiment']
 
+# Default cadence of intermediate result snapshots: every 500 requests
+DEFAULT_SNAPSHOT = {'interval': 500, 'unit': 'requests'}
 
-def exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_policy, collectors, warmup_strategy, sched_policy = {'name': 'EDF'}):
+
+def exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_policy, collectors, warmup_strategy, sched_policy = {'name': 'EDF'}, snapshot=None,
+                    shortest_path=None):
     """Execute the simulation of a specific scenario.
 
     Parameters
@@ -38,13 +42,21 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_po
         The collectors to be used. It is a dictionary in which keys are the
         names of collectors to use and values are dictionaries of attributes
         for the collector they refer to.
+    snapshot : dict, optional
+        Cadence of the intermediate snapshots taken by the collectors. Its
+        *interval* is a number of requests if its *unit* is 'requests' or an
+        amount of simulated time if it is 'time'. Snapshots are disabled if
+        the interval is None. Defaults to a snapshot every 500 requests.
+    shortest_path : dict of dict, optional
+        The all-pair shortest paths of the topology, if already computed
 
     Returns
     -------
     results : Tree
         A tree with the aggregated simulation results from all collectors
     """
-    model = NetworkModel(topology, cache_policy, repo_policy, sched_policy['name'], workload.n_services, workload.rate, **netconf)
+    model = NetworkModel(topology, cache_policy, repo_policy, sched_policy['name'], workload.n_services, workload.rate,
+                         shortest_path=shortest_path, **netconf)
     workload.model = model
     view = NetworkView(model)
     controller = NetworkController(model)
@@ -60,14 +72,30 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_po
     strategy_inst = STRATEGY[strategy_name](view, controller, **strategy_args)
     warmup_strategy_inst = STRATEGY[warmup_strategy_name](view, controller, **warmup_strategy_args)
 
+    snapshot = dict(DEFAULT_SNAPSHOT, **(snapshot or {}))
+    interval = snapshot['interval']
+    if snapshot['unit'] not in ('requests', 'time'):
+        raise ValueError('Unknown snapshot unit: %s' % str(snapshot['unit']))
+    by_time = snapshot['unit'] == 'time'
+    next_snapshot = None
+
     n = 0
     for time, event in workload:
         #continue
         strategy_inst.process_event(time, **event)
-        if n % 500 == 0 and n:
-            collector.results()
         if event['status'] == 1:
             n += 1
+        if interval is None:
+            continue
+        if by_time:
+            if next_snapshot is None:
+                next_snapshot = time + interval
+            elif time >= next_snapshot:
+                collector.snapshot(time)
+                while next_snapshot <= time:
+                    next_snapshot += interval
+        elif event['status'] == 1 and n % interval == 0:
+            collector.snapshot(time)
 
     return collector.results()
 
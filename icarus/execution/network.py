@@ -25,11 +25,12 @@ import sys
 
 import networkx as nx
 import fnss
+import numpy as np
 
 import heapq
 
 from icarus.registry import CACHE_POLICY, REPO_POLICY
-from icarus.util import path_links, iround
+from icarus.util import path_links, iround, Message
 from icarus.models.service.compSpot import ComputationSpot
 from icarus.models.service.compSpot import Task
 from collections import Counter
@@ -117,6 +118,43 @@ def symmetrify_paths(shortest_paths):
     return shortest_paths
 
 
+def path_delays(shortest_paths, link_delay):
+    """Compute the delay of the shortest paths between all pairs of nodes
+
+    Parameters
+    ----------
+    shortest_paths : dict of dict
+        All pairs shortest paths
+    link_delay : dict
+        Delay of each (directed) link, keyed by (u, v)
+
+    Returns
+    -------
+    node_index : dict
+        Row/column of each node in the delay matrix
+    delays : numpy.ndarray
+        Node-indexed matrix of path delays. Pairs of nodes that are not
+        connected, or whose path includes links with unknown delay, are NaN
+    """
+    node_index = dict((v, i) for i, v in enumerate(shortest_paths))
+    delays = np.empty((len(node_index), len(node_index)))
+    delays.fill(np.nan)
+    for s, paths in shortest_paths.items():
+        row = node_index[s]
+        for t, path in paths.items():
+            if t not in node_index:
+                continue
+            # Sum in path order, as NetworkView.path_delay used to do
+            delay = 0.0
+            try:
+                for indx in range(0, len(path) - 1):
+                    delay += link_delay[(path[indx], path[indx + 1])]
+            except KeyError:
+                continue
+            delays[row, node_index[t]] = delay
+    return node_index, delays
+
+
 class NetworkView(object):
     """Network view
 
@@ -265,7 +303,7 @@ class NetworkView(object):
         """
 
 
-        if type(k) is dict:
+        if isinstance(k, (dict, Message)):
             if k['content'] == '':
                 return self.labels_sources(labels)
             return self.model.content_source[k['content']]
@@ -289,7 +327,7 @@ class NetworkView(object):
             source is unavailable
         """
 
-        if type(k) is dict:
+        if isinstance(k, (dict, Message)):
             if k['content'] == '':
                 for node in self.labels_sources(labels):
                     if type(node) != int:
@@ -326,56 +364,26 @@ class NetworkView(object):
             The node persistently storing the given content or None if the
             source is unavailable
         """
-        if type(k) is dict:
-            hops = 100
-            if node in self.content_source(k, k['labels']):
-                if self.has_cache(node):
-                    if self.cache_lookup(node, k['content']) or self.local_cache_lookup(node, k['content']):
-                        cache = True
-                    else:
-                        cache = False
-                else:
-                    cache = False
-                return node, cache
-            for n in self.content_source(k, k['labels']):
-                content = self.model.repoStorage[n].hasMessage(k['content'], k['labels'])
-                if len(self.shortest_path(node, n)) < hops:
-                    hops = len(self.shortest_path(node, n))
-                    res = n
-            if self.has_cache(res):
-                if self.cache_lookup(res, content['content']) or self.local_cache_lookup(res, content['content']):
-                    cache = True
-                else:
-                    cache = False
+        if isinstance(k, (dict, Message)):
+            if k['content'] == '':
+                res = self.model.nearest_source(node, self.labels_sources(k['labels']))
             else:
-                cache = False
+                res = self.model.closest_holder(node, k['content'])
         else:
-            content = dict()
-            content['content'] = k
-            content['labels'] = []
-            hops = 100
-            if node in self.content_source(content, content['labels']):
-                if self.has_cache(node):
-                    if self.cache_lookup(node, content['content']) or self.local_cache_lookup(node, content['content']):
-                        cache = True
-                    else:
-                        cache = False
-                else:
-                    cache = False
-                return node, cache
-            for n in self.content_source(content, content['labels']):
-                content = self.model.contents[n][k]
-                if len(self.shortest_path(node, n)) < hops:
-                    hops = len(self.shortest_path(node, n))
-                    res = n
-            if self.has_cache(res):
-                if self.cache_lookup(res, content['content']) or self.local_cache_lookup(res, content['content']):
-                    cache = True
-                else:
-                    cache = False
+            res = self.model.closest_holder(node, k)
+        cache = False
+        if self.has_cache(res):
+            if not isinstance(k, (dict, Message)):
+                content = k
+            elif k['content'] != '' or res == node:
+                content = k['content']
             else:
-                cache = False
-
+                # The content held by the source of the labels, if any
+                message = self.model.repoStorage[res].hasMessage(k['content'], k['labels'])
+                content = message['content'] if message is not None else None
+            if content is not None and (self.cache_lookup(res, content) or
+                                        self.local_cache_lookup(res, content)):
+                cache = True
         return res, cache
 
     def labels_sources(self, labels):
@@ -396,28 +404,20 @@ class NetworkView(object):
 
         for label in labels:
             nodes.update(self.model.labels_sources[label])
-        valid_nodes = list(nodes)
+        if not nodes:
+            return nodes
 
-        del_nodes = []
+        # Nodes whose stored labels include all the labels of interest
+        all_labels = self._intersect(self.model.label_index, labels)
+        node_labels = self.model.node_labels
 
-        for n in valid_nodes:
+        for n in list(nodes):
             if type(n) != int and "src" in n:
                 del nodes[n]
-            for l in labels:
-                if n in self.model.node_labels:
-                    Found = False
-                    for label in self.model.node_labels[n]:
-                        if l == label:
-                            Found = True
-                    if not Found:
-                        del_nodes.append(n)
-                        break
-
-        for n in del_nodes:
-            del nodes[n]
-
+            elif n in node_labels and n not in all_labels:
+                del nodes[n]
 
-        return nodes 
+        return nodes
 
     def labels_requests(self, r_labels):
         """Return the node identifier where the content is persistently stored.
@@ -438,25 +438,25 @@ class NetworkView(object):
         for label in r_labels:
 
             nodes.update(self.model.request_labels_nodes.get(label, None))
+        if not nodes:
+            return nodes
 
-        del_nodes = []
-
-        for n in nodes:
-            for l in r_labels:
-                if n in self.model.request_labels:
-                    Found = False
-                    for label in self.model.request_labels[n]:
-                        if l == label:
-                            Found = True
-                    if not Found:
-                        del_nodes.append(n)
-                        break
+        # Nodes whose latest requests include all the labels of interest
+        all_labels = self._intersect(self.model.request_label_index, r_labels)
+        request_labels = self.model.request_labels
 
-        for n in del_nodes:
-            del nodes[n]
+        for n in list(nodes):
+            if n in request_labels and n not in all_labels:
+                del nodes[n]
 
         return nodes
 
+    @staticmethod
+    def _intersect(index, labels):
+        """Return the set of nodes indexed under all the given labels"""
+        node_sets = sorted((index.get(label, set()) for label in set(labels)), key=len)
+        return node_sets[0].intersection(*node_sets[1:])
+
     def all_labels_main_source(self, labels):
         """Return the node identifier where the content is persistently stored.
 
@@ -748,6 +748,13 @@ class NetworkView(object):
         -------
         delay : float
         """
+        model = self.model
+        if s in model.node_index and t in model.node_index:
+            delay = model.path_delays[model.node_index[s], model.node_index[t]]
+            if not np.isnan(delay):
+                return float(delay)
+        # Not in the precomputed matrix: walk the path, failing as before
+        # if there is none
         path = self.shortest_path(s, t)
         delay = 0.0
         for indx in range(0, len(path) - 1):
@@ -1120,6 +1127,9 @@ class NetworkModel(object):
                 self.link_type[(v, u)] = link_type
             for (u, v), delay in list(self.link_delay.items()):
                 self.link_delay[(v, u)] = delay
+        # Delays of all shortest paths, updated whenever paths are recomputed
+        self.node_index, self.path_delays = path_delays(self.shortest_path,
+                                                        self.link_delay)
 
         cache_size = {}
         self.storageSize = {}
@@ -1170,7 +1180,7 @@ class NetworkModel(object):
                     self.contents[node] = stack_props['contents']
                     if self.contents[node]:
                         k = list(self.contents[node].keys())[0]
-                        if type(self.contents[node][k]) is dict:
+                        if isinstance(self.contents[node][k], (dict, Message)):
                             for c in self.contents[node]:
                                 self.replication_hops[self.contents[node][c]['content']] = 1
                                 for label in self.contents[node][c]['labels']:
@@ -1210,7 +1220,7 @@ class NetworkModel(object):
                 if stack_props and stack_props.has_key('contents'):
                     self.contents[node] = stack_props['contents']
                     k = list(self.contents[node].keys())[0]
-                    if type(self.contents[node][k]) is dict:
+                    if isinstance(self.contents[node][k], (dict, Message)):
                         for c in self.contents[node]:
                             self.replication_hops[self.contents[node][c]['content']] = 1
                             for label in self.contents[node][c]['labels']:
@@ -1245,6 +1255,22 @@ class NetworkModel(object):
                             else:
                                 self.content_source[content] = [node]
 
+        # Inverted indexes of node_labels and request_labels: the set of nodes
+        # holding (or having requested) each label, kept up to date by the
+        # label methods below
+        self.label_index = {}
+        self.request_label_index = {}
+        # Sets to which the labels whose sources or requests change are
+        # added, registered by the collectors reporting label distributions
+        self.label_watchers = []
+
+        # Nearest holder of each content from each node, answered from
+        # content_source and dropped whenever the holders or paths change
+        self.closest_holders = {}
+        for node, labels in self.node_labels.items():
+            for label in labels:
+                self.label_index.setdefault(label, set()).add(node)
+
         if any(c < 1 for c in cache_size.values()):
             logger.warn('Some content caches have size equal to 0. '
                         'I am setting them to 1 and run the experiment anyway')
@@ -1402,6 +1428,183 @@ class NetworkModel(object):
         self.removed_caches = {}
         self.removed_local_caches = {}
 
+    def add_node_labels(self, node, labels):
+        """Record that *node* stores an item with the given labels
+
+        Parameters
+        ----------
+        node : any hashable type
+            The storage node
+        labels : list
+            The labels of the stored item
+        """
+        if node not in self.node_labels:
+            self.node_labels[node] = Counter()
+        for label in labels:
+            self.node_labels[node].update([label])
+            if label not in self.labels_sources:
+                self.labels_sources[label] = Counter()
+            self.labels_sources[label].update([node])
+            self.label_index.setdefault(label, set()).add(node)
+        self.labels_changed(labels)
+
+    def clear_node_labels(self, node):
+        """Forget all the labels stored by *node*, which will no longer be
+        returned as a source of any label
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        """
+        labels = self.node_labels.get(node, ())
+        for label in labels:
+            self.label_index[label].discard(node)
+        self.labels_changed(labels)
+        self.node_labels[node] = Counter()
+
+    def add_request_labels(self, node, labels, reset=False):
+        """Record a request for the given labels received by *node*
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node receiving the request
+        labels : list
+            The labels of the request
+        reset : bool, optional
+            If *True*, the labels of the previous requests of the node are
+            forgotten first
+        """
+        if reset and node in self.request_labels:
+            self.remove_request_labels(node, list(self.request_labels[node]))
+        if node not in self.request_labels or reset:
+            self.request_labels[node] = Counter()
+        for label in labels:
+            self.request_labels[node].update([label])
+            if label not in self.request_labels_nodes:
+                self.request_labels_nodes[label] = Counter()
+            self.request_labels_nodes[label].update([node])
+            self.request_label_index.setdefault(label, set()).add(node)
+        self.labels_changed(labels)
+
+    def remove_request_labels(self, node, labels):
+        """Forget the requests for the given labels received by *node*
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        labels : list
+            The labels to forget
+        """
+        for label in labels:
+            if label in self.request_labels[node]:
+                del self.request_labels[node][label]
+                self.request_label_index[label].discard(node)
+        self.labels_changed(labels)
+
+    def labels_changed(self, labels):
+        """Notify the label watchers that the sources or requests of the
+        given labels changed
+
+        Parameters
+        ----------
+        labels : iterable
+            The labels
+        """
+        for watcher in self.label_watchers:
+            watcher.update(labels)
+
+    def add_content_source(self, content, node):
+        """Record *node* as a holder of *content*
+
+        Parameters
+        ----------
+        content : any hashable type
+            The content identifier
+        node : any hashable type
+            The node now storing the content
+        """
+        sources = self.content_source.setdefault(content, [])
+        if node not in sources:
+            sources.append(node)
+            self.closest_holders.pop(content, None)
+
+    def remove_content_source(self, content, node):
+        """Forget *node* as a holder of *content*
+
+        Parameters
+        ----------
+        content : any hashable type
+            The content identifier
+        node : any hashable type
+            The node no longer storing the content
+        """
+        sources = self.content_source.get(content)
+        if sources and node in sources:
+            sources.remove(node)
+            self.closest_holders.pop(content, None)
+
+    def nearest_source(self, node, sources):
+        """Return the node of *sources* with the fewest hops from *node*
+
+        Ties are broken in favour of the first node of *sources*.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node looking for a source
+        sources : iterable
+            The candidate sources
+
+        Returns
+        -------
+        source : any hashable type
+            The nearest source, *node* itself if it is one of the *sources*
+            or None if no source is reachable
+        """
+        if node in sources:
+            return node
+        paths = self.shortest_path[node]
+        hops = 100
+        res = None
+        for n in sources:
+            n_hops = len(paths[n])
+            if n_hops < hops:
+                hops = n_hops
+                res = n
+        return res
+
+    def closest_holder(self, node, content):
+        """Return the holder of *content* with the fewest hops from *node*
+
+        Answers are cached until the holders of the content or the shortest
+        paths change.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node looking for the content
+        content : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        holder : any hashable type
+            The nearest holder of the content (see `nearest_source`)
+        """
+        holders = self.closest_holders.get(content)
+        if holders is None:
+            sources = self.content_source[content]
+            holders = self.closest_holders[content] = {}
+        elif node in holders:
+            return holders[node]
+        else:
+            sources = self.content_source[content]
+        holders[node] = self.nearest_source(node, sources)
+        return holders[node]
+
 
 class NetworkController(object):
     """Network controller
@@ -1640,15 +1843,8 @@ class NetworkController(object):
 
         """
 
-        if s not in self.model.request_labels:
-            self.model.request_labels[s] = Counter()
-        elif type(self.model.request_labels[s]) is not Counter():
-            self.model.request_labels[s] = Counter()
-        for label in service_request['labels']:
-            self.model.request_labels[s].update([label])
-            if not self.model.request_labels_nodes.has_key(label):
-                self.model.request_labels_nodes[label] = Counter()
-            self.model.request_labels_nodes[label].update([s])
+        # Only the labels of the latest request are kept for the node
+        self.model.add_request_labels(s, service_request['labels'], reset=True)
 
 
     def has_request_labels(self, s, labels):
@@ -1699,16 +1895,9 @@ class NetworkController(object):
             if label in self.model.request_labels[s]:
                 Deletion.append(label)
                 if add:
-                    if s not in self.model.node_labels:
-                        self.model.node_labels[s] = Counter()
-                    self.model.node_labels[s].update([label])
-                    if label not in self.model.labels_sources:
-                        self.model.labels_sources[label] = Counter()
-                    self.model.labels_sources[label].update([s])
-                    
-        for label in Deletion:
-            if label in self.model.request_labels[s]:
-                del self.model.request_labels[s][label]
+                    self.model.add_node_labels(s, [label])
+
+        self.model.remove_request_labels(s, Deletion)
 
     def add_message_to_storage(self, s, content):
         """Forward a content from node *s* to node *t* over the provided path.
@@ -1733,18 +1922,16 @@ class NetworkController(object):
             *True*
         """
         self.model.repoStorage[s].addToStoredMessages(content)
-        for c in self.model.content_source:
-            if content['content'] == c:
-                if s not in self.model.content_source[content['content']]:
-                    self.model.content_source[content['content']].append(s)
-                if s in self.model.contents:
-                    if content['content'] in self.model.contents[s]:
-                        self.model.contents[s][content['content']].update(content)
-                    else:
-                        self.model.contents[s][content['content']] = content
+        if content['content'] in self.model.content_source:
+            self.model.add_content_source(content['content'], s)
+            if s in self.model.contents:
+                if content['content'] in self.model.contents[s]:
+                    self.model.contents[s][content['content']].update(content)
                 else:
-                    self.model.contents[s] = dict()
                     self.model.contents[s][content['content']] = content
+            else:
+                self.model.contents[s] = dict()
+                self.model.contents[s][content['content']] = content
 
     def add_storage_labels_to_node(self, s, content):
         """Forward a content from node *s* to node *t* over the provided path.
@@ -1763,13 +1950,7 @@ class NetworkController(object):
         content: hashable object
             Message with content hash (name), labels and properties
         """
-        if s not in self.model.node_labels:
-            self.model.node_labels[s] = Counter()
-        for l in content["labels"]:
-            self.model.node_labels[s].update([l])
-            if l not in self.model.labels_sources:
-                self.model.labels_sources[l] = Counter()
-            self.model.labels_sources[l].update([s])
+        self.model.add_node_labels(s, content["labels"])
 
 
 
@@ -1797,6 +1978,8 @@ class NetworkController(object):
         """
         self.model.replications_from.update([s])
         self.model.replications_to.update([d])
+        if self.collector is not None:
+            self.collector.replication(s, d)
 
 
 
@@ -1823,6 +2006,8 @@ class NetworkController(object):
             *True*
         """
         self.model.replication_hops.update([content['content']])
+        if self.collector is not None:
+            self.collector.replication_hop(content)
 
 
 
@@ -1999,6 +2184,12 @@ class NetworkController(object):
 
         self.collector.execute_service(flow_id, service, node, timestamp, is_cloud)
 
+    def optimisation_solved(self, solve_time, timestamp):
+        """ Report the time spent by a strategy solving its optimisation problem
+        """
+        if self.collector is not None:
+            self.collector.optimisation_solved(solve_time, timestamp)
+
     def complete_task(self, task, timestamp):
         """ Perform execution of the task at node with starting time
         """
@@ -2036,6 +2227,16 @@ class NetworkController(object):
         self.collector.end_session(success, timestamp, flow_id)
         self.session.pop(flow_id, None)
 
+    def update_shortest_paths(self):
+        """Recompute all shortest paths and their delays after a change in
+        the topology
+        """
+        shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
+        self.model.shortest_path = symmetrify_paths(shortest_path)
+        self.model.node_index, self.model.path_delays = \
+            path_delays(self.model.shortest_path, self.model.link_delay)
+        self.model.closest_holders.clear()
+
     def rewire_link(self, u, v, up, vp, recompute_paths=True):
         """Rewire an existing link to new endpoints
 
@@ -2059,8 +2260,7 @@ class NetworkController(object):
         self.model.topology.remove_edge(u, v)
         self.model.topology.add_edge(up, vp, **link)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.update_shortest_paths()
 
     def remove_link(self, u, v, recompute_paths=True):
         """Remove a link from the topology and update the network model.
@@ -2087,8 +2287,7 @@ class NetworkController(object):
         self.model.removed_links[(u, v)] = self.model.topology.edge[u][v]
         self.model.topology.remove_edge(u, v)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.update_shortest_paths()
 
     def restore_link(self, u, v, recompute_paths=True):
         """Restore a previously-removed link and update the network model
@@ -2104,8 +2303,7 @@ class NetworkController(object):
         """
         self.model.topology.add_edge(u, v, **self.model.removed_links.pop((u, v)))
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.update_shortest_paths()
 
     def remove_node(self, v, recompute_paths=True):
         """Remove a node from the topology and update the network model.
@@ -2154,10 +2352,9 @@ class NetworkController(object):
         if v in self.model.source_node:
             self.model.removed_sources[v] = self.model.source_node.pop(v)
             for content in self.model.removed_sources[v]:
-                self.model.countent_source.pop(content)
+                self.model.remove_content_source(content, v)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.update_shortest_paths()
 
     def restore_node(self, v, recompute_paths=True):
         """Restore a previously-removed node and update the network model.
@@ -2181,10 +2378,9 @@ class NetworkController(object):
         if v in self.model.removed_sources:
             self.model.source_node[v] = self.model.removed_sources.pop(v)
             for content in self.model.source_node[v]:
-                self.model.countent_source[content] = v
+                self.model.add_content_source(content, v)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.update_shortest_paths()
 
     def reserve_local_cache(self, ratio=0.1):
         """Reserve a fraction of cache as local.
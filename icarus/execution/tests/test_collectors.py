@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
+import os
 import unittest
+from StringIO import StringIO
+
+import fnss
 
 import icarus.execution as collectors
+from icarus.execution import NetworkModel, NetworkView, NetworkController
+from icarus.scenarios import IcnTopology
+from icarus.util import Message
 
 
 class TestLinkLoadCollector(unittest.TestCase):
@@ -156,6 +163,87 @@ class TestLatencyCollector(unittest.TestCase):
         self.assertEqual((10 + 20 + 2 * (2 + 4)) / 2, res['MEAN'])
 
 
+class TestRepoStatsLatencyCollector(unittest.TestCase):
+
+    @classmethod
+    def topology(cls):
+        #
+        #  rec_0 ---- 1 ---- 2
+        #
+        topology = IcnTopology()
+        topology.add_path(['rec_0', 1, 2])
+        fnss.add_stack(topology, 'rec_0', 'receiver')
+        fnss.add_stack(topology, 1, 'router',
+                       {'cache_size': 2, 'storageSize': 100, 'computation_size': 1,
+                        'service_size': 1, 'contents': {0: cls.message(0, 10)}})
+        fnss.add_stack(topology, 2, 'router',
+                       {'cache_size': 2, 'storageSize': 100, 'computation_size': 1,
+                        'service_size': 1})
+        topology.node[1]['extra_types'] = ['source', 'router']
+        fnss.set_delays_constant(topology, 1, 'ms')
+        topology.graph['receiver_access_delay'] = 0.001
+        topology.graph['link_delay'] = 0.001
+        topology.graph['routers'] = [1, 2]
+        topology.graph['sources'] = []
+        return topology
+
+    def setUp(self):
+        model = NetworkModel(self.topology(), {'name': 'LRU'}, {'name': 'REPO_STORAGE'},
+                             'EDF', 2, 1.0)
+        model.strategy = 'HYBRIDS_REPO_APP'
+        self.model = model
+        self.view = NetworkView(model)
+        self.controller = NetworkController(model)
+        self.collector = collectors.RepoStatsLatencyCollector(self.view)
+        self.controller.attach_collector(self.collector)
+        self.files = {}
+        self.collector._report_file = \
+            lambda path: self.files.setdefault(os.path.basename(path), StringIO())
+
+    @staticmethod
+    def message(content, size):
+        return Message(content=content, labels=['x'], service_type='non-proc',
+                       msg_size=size, receiveTime=0.0)
+
+    def rows(self, name):
+        return self.files[name].getvalue().split('\n')
+
+    def values(self, name, row):
+        return self.rows(name)[row].split(', ')[:-1]
+
+    def test_snapshot_rows(self):
+        self.collector.snapshot(1.0)
+        overheads = self.values('gen_overheads.txt', 0)
+        self.assertEqual(1000, len(overheads))
+        self.assertEqual(['10', '0'], overheads[:2])
+        self.assertEqual(['10', '0'], self.values('repo_usage.txt', 0))
+        self.assertEqual(['0', '0'], self.values('gen_r_replicas.txt', 0))
+        self.assertEqual(['1'], self.values('gen_s_labels.txt', 0))
+        self.assertEqual(0, self.model.replication_hops[0])
+
+        # Unchanged state is written again, from the cached values
+        self.collector.snapshot(2.0)
+        for name in ('hybrid_repo.txt', 'gen_overheads.txt', 'gen_r_replicas.txt',
+                     'gen_s_replicas.txt', 'repo_usage.txt', 'repo_overtime.txt'):
+            self.assertEqual(self.rows(name)[0], self.rows(name)[1], name)
+
+        msg = self.message(1, 5)
+        self.collector.start_session(2.0, 'rec_0', msg, ['x'], flow_id=1, deadline=10.0)
+        self.collector.end_session(True, 3.0, 1)
+        self.controller.add_replication_hops(msg)
+        self.controller.add_replication_hops(msg)
+        self.controller.replicate(1, 2)
+        self.controller.add_message_to_storage(2, msg)
+        self.model.add_node_labels(2, ['y'])
+        self.collector.snapshot(3.0)
+        self.assertEqual(['100.0'], self.values('hybrid_repo.txt', 2))
+        self.assertEqual(['10', '10'], self.values('gen_overheads.txt', 2)[:2])
+        self.assertEqual(['1', '0'], self.values('gen_r_replicas.txt', 2))
+        self.assertEqual(['0', '1'], self.values('gen_s_replicas.txt', 2))
+        self.assertEqual(['10', '5'], self.values('repo_usage.txt', 2))
+        self.assertEqual(0, self.model.replication_hops[1])
+
+
 class TestCacheHitRatioCollector(unittest.TestCase):
 
     def test_base(self):
@@ -237,3 +325,47 @@ class TestCacheHitRatioCollector(unittest.TestCase):
 
         res = c.results()
         self.assertEqual({1: 0.5, 2: 0.25}, res['PER_CONTENT'])
+
+
+class TestCollectorProxy(unittest.TestCase):
+
+    def test_snapshot(self):
+
+        class SnapshotCollector(collectors.DataCollector):
+
+            def __init__(self, view):
+                self.view = view
+                self.snapshots = []
+
+            def snapshot(self, timestamp):
+                self.snapshots.append(timestamp)
+
+        class OtherCollector(collectors.DataCollector):
+            pass
+
+        snap = SnapshotCollector(None)
+        other = OtherCollector(None)
+        proxy = collectors.CollectorProxy(None, [snap, other])
+        self.assertEqual([snap], proxy.collectors['snapshot'])
+        proxy.snapshot(2.5)
+        proxy.snapshot(5.0)
+        self.assertEqual([2.5, 5.0], snap.snapshots)
+
+    def test_optimisation_solved(self):
+
+        class SolveTimeCollector(collectors.DataCollector):
+
+            def __init__(self, view):
+                self.view = view
+                self.solve_times = {}
+
+            def optimisation_solved(self, solve_time, timestamp):
+                self.solve_times[timestamp] = solve_time
+
+        solver = SolveTimeCollector(None)
+        proxy = collectors.CollectorProxy(None, [solver])
+        self.assertEqual([solver], proxy.collectors['optimisation_solved'])
+        self.assertEqual([], proxy.collectors['snapshot'])
+        proxy.optimisation_solved(0.25, 0.0)
+        proxy.optimisation_solved(0.1, 10.0)
+        self.assertEqual({0.0: 0.25, 10.0: 0.1}, solver.solve_times)
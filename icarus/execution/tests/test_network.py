@@ -7,6 +7,9 @@ import fnss
 
 from icarus.scenarios import IcnTopology
 from icarus.execution.collectors import DummyCollector
+from icarus.models import LruCache
+from icarus.models.repo import RepoStorage
+from icarus.util import Message
 
 import icarus.execution.network as network
 
@@ -21,6 +24,32 @@ class TestSymmetrifyPaths(unittest.TestCase):
         network.symmetrify_paths(path)
         self.assertEqual(list(path[1][5]), list(reversed(path[5][1])))
 
+
+class TestPathDelays(unittest.TestCase):
+
+    def test_path_delays(self):
+        topology = fnss.Topology()
+        topology.add_path([1, 2, 3])
+        topology.add_node(4)
+        link_delay = {(1, 2): 0.1, (2, 1): 0.1, (2, 3): 0.25, (3, 2): 0.25}
+        path = dict(nx.all_pairs_dijkstra_path(topology))
+        node_index, delays = network.path_delays(path, link_delay)
+        self.assertEqual(0.0, delays[node_index[2], node_index[2]])
+        self.assertEqual(0.1 + 0.25, delays[node_index[1], node_index[3]])
+        self.assertEqual(0.25 + 0.1, delays[node_index[3], node_index[1]])
+        self.assertTrue(all(d != d for d in delays[node_index[4]][:3]))
+
+    def test_unknown_link_delay(self):
+        topology = fnss.Topology()
+        topology.add_path([1, 2, 3])
+        link_delay = {(1, 2): 0.1, (2, 1): 0.1}
+        path = dict(nx.all_pairs_dijkstra_path(topology))
+        node_index, delays = network.path_delays(path, link_delay)
+        self.assertEqual(0.1, delays[node_index[1], node_index[2]])
+        self.assertNotEqual(delays[node_index[1], node_index[3]],
+                            delays[node_index[1], node_index[3]])
+
+
 class TestNetworkMvc(unittest.TestCase):
 
     @classmethod
@@ -94,3 +123,118 @@ class TestNetworkMvc(unittest.TestCase):
         self.controller.rewire_link(1, 8, 1, 5, recompute_paths=True)
         self.assertEqual([0, 1, 2, 3, 4], self.view.shortest_path(0, 4))
         self.assertEqual(1, self.topology.edge[2][3]['a'])
+
+
+class TestLabelIndex(unittest.TestCase):
+
+    def setUp(self):
+        model = network.NetworkModel.__new__(network.NetworkModel)
+        model.node_labels = {}
+        model.labels_sources = {}
+        model.label_index = {}
+        model.request_labels = {}
+        model.request_labels_nodes = {}
+        model.request_label_index = {}
+        model.label_watchers = []
+        model.compSpot = {}
+        self.model = model
+        self.view = network.NetworkView(model)
+        self.controller = network.NetworkController(model)
+
+    def test_labels_sources(self):
+        self.controller.add_storage_labels_to_node(1, {'labels': ['a', 'b']})
+        self.controller.add_storage_labels_to_node(2, {'labels': ['a']})
+        self.controller.add_storage_labels_to_node('src_0', {'labels': ['a', 'b']})
+        self.assertEqual({1: 2}, dict(self.view.labels_sources(['a', 'b'])))
+        self.assertEqual({1: 1, 2: 1}, dict(self.view.labels_sources(['a'])))
+        self.model.clear_node_labels(1)
+        self.assertEqual({}, dict(self.view.labels_sources(['a', 'b'])))
+        self.assertEqual(set([2, 'src_0']), self.model.label_index['a'])
+
+    def test_labels_requests(self):
+        self.controller.add_request_labels_to_node(1, {'labels': ['a', 'b']})
+        self.controller.add_request_labels_to_node(2, {'labels': ['a']})
+        self.assertEqual({1: 2}, dict(self.view.labels_requests(['a', 'b'])))
+        self.controller.add_request_labels_to_node(1, {'labels': ['b']})
+        self.assertEqual({2: 1}, dict(self.view.labels_requests(['a'])))
+        self.controller.add_request_labels_to_storage(2, ['a'], add=True)
+        self.assertEqual({}, dict(self.view.labels_requests(['a'])))
+        self.assertEqual({2: 1}, dict(self.view.labels_sources(['a'])))
+
+    def test_label_watchers(self):
+        changed = set()
+        self.model.label_watchers.append(changed)
+        self.controller.add_storage_labels_to_node(1, {'labels': ['a', 'b']})
+        self.assertEqual(set(['a', 'b']), changed)
+        changed.clear()
+        self.controller.add_request_labels_to_node(2, {'labels': ['c']})
+        self.assertEqual(set(['c']), changed)
+        changed.clear()
+        self.model.clear_node_labels(1)
+        self.assertEqual(set(['a', 'b']), changed)
+
+
+class TestClosestHolder(unittest.TestCase):
+
+    def setUp(self):
+        topology = fnss.Topology()
+        topology.add_path([0, 1, 2, 3, 4])
+        topology.add_edge(0, 5)
+        model = network.NetworkModel.__new__(network.NetworkModel)
+        model.shortest_path = dict(nx.all_pairs_shortest_path(topology))
+        model.content_source = {'c': [4, 3]}
+        model.closest_holders = {}
+        self.model = model
+
+    def test_nearest_source(self):
+        self.assertEqual(3, self.model.closest_holder(1, 'c'))
+        self.assertEqual(4, self.model.closest_holder(4, 'c'))
+        self.assertEqual(3, self.model.nearest_source(2, [3, 1]))
+        self.assertIsNone(self.model.nearest_source(2, []))
+
+    def test_holder_changes(self):
+        self.assertEqual(3, self.model.closest_holder(1, 'c'))
+        self.assertEqual(3, self.model.closest_holder(0, 'c'))
+        self.model.add_content_source('c', 5)
+        self.assertEqual(3, self.model.closest_holder(1, 'c'))
+        self.assertEqual(5, self.model.closest_holder(0, 'c'))
+        self.assertEqual([4, 3, 5], self.model.content_source['c'])
+        self.model.remove_content_source('c', 5)
+        self.model.remove_content_source('c', 3)
+        self.assertEqual(4, self.model.closest_holder(1, 'c'))
+        self.model.add_content_source('d', 0)
+        self.assertEqual(0, self.model.closest_holder(2, 'd'))
+
+    def test_replica_deleted(self):
+        model = self.model
+        model.compSpot = {}
+        model.comp_size = {3: None, 4: None}
+        model.cache = {3: LruCache(2)}
+        model.local_cache = {}
+        model.repoStorage = {}
+        for v in (3, 4):
+            message = Message(content='c', labels=['x'], service_type='non-proc',
+                              msg_size=1, receiveTime=0.0)
+            model.repoStorage[v] = RepoStorage(v, model, {'c': message}, 100)
+        view = network.NetworkView(model)
+        model.cache[3].put('c')
+        self.assertEqual((3, True), view.closest_source(1, 'c'))
+        self.assertTrue(model.repoStorage[3].deleteMessage('c'))
+        self.assertEqual([4], model.content_source['c'])
+        self.assertEqual((4, False), view.closest_source(1, 'c'))
+        self.assertTrue(model.repoStorage[4].deleteMessage('c'))
+        self.assertEqual((None, False), view.closest_source(1, 'c'))
+
+    def test_labels_source_without_message(self):
+        model = self.model
+        model.compSpot = {}
+        model.comp_size = {3: None}
+        model.cache = {3: LruCache(2)}
+        model.local_cache = {}
+        model.repoStorage = {3: RepoStorage(3, model, None, 100)}
+        model.labels_sources = {'x': {3: 1}}
+        model.label_index = {'x': set([3])}
+        model.node_labels = {3: {'x': 1}}
+        view = network.NetworkView(model)
+        request = Message(content='', labels=['x'])
+        self.assertEqual((3, False), view.closest_source(1, request))
@@ -12,18 +12,20 @@ from __future__ import division
 
 import time
 from collections import deque, defaultdict
+import heapq
 import random
 import abc
 import copy
 
 import numpy as np
 
-from icarus.util import inheritdoc, apportionment
+from icarus.util import inheritdoc, apportionment, Message
 from icarus.registry import register_cache_policy
 
 
 __all__ = [
         'LinkedSet',
+        'ArrayLinkedSet',
         'Cache',
         'NullCache',
         'BeladyMinCache',
@@ -34,6 +36,11 @@ __all__ = [
         'FifoCache',
         'ClimbCache',
         'RandEvictionCache',
+        'ArrayLruCache',
+        'ArraySegmentedLruCache',
+        'ArrayInCacheLfuCache',
+        'ArrayPerfectLfuCache',
+        'ArrayFifoCache',
         'insert_after_k_hits_cache',
         'rand_insert_cache',
         'keyval_cache',
@@ -460,6 +467,230 @@ class LinkedSet(object):
 
 
 
+class ArrayLinkedSet(object):
+    """A set of bounded size whose entries are ordered in one or more
+    doubly-linked lists stored in parallel integer arrays.
+
+    Differently from `LinkedSet`, which allocates a node object for each item,
+    this data structure stores items in a fixed number of preallocated slots
+    and links them through slot indices. Inserting and removing items
+    therefore never allocates objects, which keeps large caches clear of
+    memory allocation and garbage collection overhead.
+
+    Each list is delimited by a sentinel slot, whose next slot is the top of
+    the list and whose previous slot is the bottom. Several lists can share
+    the same slots, as needed to implement the segments of a Segmented LRU.
+
+    It provides O(1) time complexity for searching, removing from any
+    position, moving to top and popping the bottom of a list.
+    """
+
+    def __init__(self, capacity, lists=1):
+        """Constructor
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of items stored in all lists
+        lists : int, optional
+            The number of lists
+        """
+        self._capacity = capacity
+        self._lists = lists
+        self._map = {}
+        self._key = [None] * capacity
+        self._list = [0] * capacity
+        self._len = [0] * lists
+        self._up = list(range(capacity + lists))
+        self._down = list(range(capacity + lists))
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        """Return the number of elements in all lists
+
+        Returns
+        -------
+        len : int
+            The length of the set
+        """
+        return len(self._map)
+
+    def __contains__(self, k):
+        """Return whether the set contains a given item
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to search
+
+        Returns
+        -------
+        contained : bool
+            *True* if the set contains the item, *False* otherwise
+        """
+        return k in self._map
+
+    def __iter__(self):
+        """Return an iterator over all lists, from the top of the first list
+        to the bottom of the last one
+        """
+        for i in range(self._lists):
+            for k in self.iter_list(i):
+                yield k
+
+    def iter_list(self, i=0):
+        """Return an iterator over list *i*, from its top to its bottom
+
+        Parameters
+        ----------
+        i : int, optional
+            The list to iterate over
+        """
+        sentinel = self._capacity + i
+        slot = self._down[sentinel]
+        while slot != sentinel:
+            yield self._key[slot]
+            slot = self._down[slot]
+
+    def list_len(self, i=0):
+        """Return the number of elements in list *i*"""
+        return self._len[i]
+
+    def list_of(self, k):
+        """Return the list in which item *k* is stored"""
+        return self._list[self._map[k]]
+
+    def _link_top(self, slot, i):
+        sentinel = self._capacity + i
+        top = self._down[sentinel]
+        self._up[slot] = sentinel
+        self._down[slot] = top
+        self._up[top] = slot
+        self._down[sentinel] = slot
+        self._list[slot] = i
+        self._len[i] += 1
+
+    def _unlink(self, slot):
+        up = self._up[slot]
+        down = self._down[slot]
+        self._down[up] = down
+        self._up[down] = up
+        self._len[self._list[slot]] -= 1
+
+    def append_top(self, k, i=0):
+        """Append an item at the top of list *i*
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to append
+        i : int, optional
+            The list to which the item is appended
+        """
+        if k in self._map:
+            raise KeyError('The item %s is already in the set' % str(k))
+        if not self._free:
+            raise ValueError('The set is full')
+        slot = self._free.pop()
+        self._key[slot] = k
+        self._map[k] = slot
+        self._link_top(slot, i)
+
+    def move_to_top(self, k, i=None):
+        """Move an item to the top of a list
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to move
+        i : int, optional
+            The list to which the item is moved. If not specified, the item is
+            moved to the top of the list where it is currently stored
+        """
+        slot = self._map[k]
+        self._unlink(slot)
+        self._link_top(slot, self._list[slot] if i is None else i)
+
+    def pop_bottom(self, i=0):
+        """Pop the item at the bottom of list *i*
+
+        Parameters
+        ----------
+        i : int, optional
+            The list from which the item is popped
+
+        Returns
+        -------
+        k : any hashable type
+            The popped item or *None* if the list is empty
+        """
+        k = self.bottom(i)
+        if k is not None:
+            self.remove(k)
+        return k
+
+    def bottom(self, i=0):
+        """Return the item at the bottom of list *i*
+
+        Parameters
+        ----------
+        i : int, optional
+            The list whose bottom item is returned
+
+        Returns
+        -------
+        k : any hashable type
+            The bottom item or *None* if the list is empty
+        """
+        slot = self._up[self._capacity + i]
+        return self._key[slot] if slot < self._capacity else None
+
+    def index(self, k):
+        """Return the index of an item within the list in which it is stored.
+
+        This operation has a O(n) time complexity, with n being the length of
+        the list.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item whose index is queried
+
+        Returns
+        -------
+        index : int
+            The index of the item
+        """
+        if k not in self._map:
+            raise KeyError('The item %s is not in the set' % str(k))
+        slot = self._map[k]
+        sentinel = self._capacity + self._list[slot]
+        index = 0
+        while self._up[slot] != sentinel:
+            slot = self._up[slot]
+            index += 1
+        return index
+
+    def remove(self, k):
+        """Remove an item from the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to remove
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        slot = self._map.pop(k)
+        self._unlink(slot)
+        self._key[slot] = None
+        self._free.append(slot)
+
+    def clear(self):
+        """Empty the set"""
+        self.__init__(self._capacity, self._lists)
+
+
 
 class Cache(object):
     """Base implementation of a cache object"""
@@ -915,13 +1146,9 @@ class LruCache(Cache):
             The evicted object or *None* if no contents were evicted.
         """
         # if content in cache, push it on top, no eviction
-        if type(k) is dict:
-            if k['content'] in self._cache:
-                self._cache.move_to_top(k)
-                return None
-            self._cache.append_top(k['content'])
-            return self._cache.pop_bottom if len(self._cache) > self._maxlen else None
-        elif k in self._cache:
+        if isinstance(k, (dict, Message)):
+            k = k['content']
+        if k in self._cache:
             self._cache.move_to_top(k)
             return None
         # if content not in cache append it on top
@@ -1547,6 +1774,411 @@ class RandEvictionCache(Cache):
     def clear(self):
         self._cache.clear
 
+@register_cache_policy('ARRAY_LRU')
+class ArrayLruCache(Cache):
+    """Least Recently Used (LRU) cache eviction policy backed by arrays.
+
+    This cache behaves exactly as `LruCache` but stores its items in an
+    `ArrayLinkedSet` rather than in a `LinkedSet`, so that inserting and
+    evicting items does not allocate objects. It is meant for very large
+    caches, e.g. with integer content identifiers and millions of entries.
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        # One spare slot holds the item inserted before the eviction
+        self._cache = ArrayLinkedSet(self._maxlen + 1)
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    @inheritdoc(Cache)
+    def dump(self):
+        return list(iter(self._cache))
+
+    @inheritdoc(LruCache)
+    def position(self, k, *args, **kwargs):
+        if not k in self._cache:
+            raise ValueError('The item %s is not in the cache' % str(k))
+        return self._cache.index(k)
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._cache
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.move_to_top(k)
+        return True
+
+    @inheritdoc(LruCache)
+    def put(self, k, *args, **kwargs):
+        if isinstance(k, (dict, Message)):
+            k = k['content']
+        if k in self._cache:
+            self._cache.move_to_top(k)
+            return None
+        self._cache.append_top(k)
+        return self._cache.pop_bottom() if len(self._cache) > self._maxlen else None
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.remove(k)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._cache.clear()
+
+
+@register_cache_policy('ARRAY_SLRU')
+class ArraySegmentedLruCache(Cache):
+    """Segmented Least Recently Used (LRU) cache eviction policy backed by
+    arrays.
+
+    This cache behaves exactly as `SegmentedLruCache` but stores all its
+    segments as lists of a single `ArrayLinkedSet`, so that promoting,
+    demoting and evicting items does not allocate objects.
+    """
+
+    @inheritdoc(SegmentedLruCache)
+    def __init__(self, maxlen, segments=2, alloc=None, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        if not isinstance(segments, int) or segments <= 0 or segments > maxlen:
+            raise ValueError('segments must be an integer and 0 < segments <= maxlen')
+        if alloc:
+            if len(alloc) != segments:
+                raise ValueError('alloc must be an iterable with as many entries as segments')
+            if np.abs(np.sum(alloc) - 1) > 0.001:
+                raise ValueError('All alloc entries must sum up to 1')
+        else:
+            alloc = [1 / segments for _ in range(segments)]
+        self._segment_maxlen = apportionment(maxlen, alloc)
+        self._segments = segments
+        # Segment i is list i of the set, the probatory segment is the last
+        self._cache = ArrayLinkedSet(self._maxlen + 1, segments)
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._cache
+
+    def _promote(self, k):
+        seg = self._cache.list_of(k)
+        if seg == 0:
+            self._cache.move_to_top(k)
+            return
+        self._cache.move_to_top(k, seg - 1)
+        if self._cache.list_len(seg - 1) > self._segment_maxlen[seg - 1]:
+            self._cache.move_to_top(self._cache.bottom(seg - 1), seg)
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._promote(k)
+        return True
+
+    @inheritdoc(SegmentedLruCache)
+    def put(self, k, *args, **kwargs):
+        if k in self._cache:
+            self._promote(k)
+            return None
+        last = self._segments - 1
+        self._cache.append_top(k, last)
+        if self._cache.list_len(last) > self._segment_maxlen[last]:
+            return self._cache.pop_bottom(last)
+        return None
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.remove(k)
+        return True
+
+    @inheritdoc(SegmentedLruCache)
+    def position(self, k, *args, **kwargs):
+        if not k in self._cache:
+            raise ValueError('The item %s is not in the cache' % str(k))
+        seg = self._cache.list_of(k)
+        return sum(self._cache.list_len(i) for i in range(seg)) + self._cache.index(k)
+
+    @inheritdoc(Cache)
+    def dump(self, serialized=True):
+        dump = [list(self._cache.iter_list(i)) for i in range(self._segments)]
+        return sum(dump, []) if serialized else dump
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._cache.clear()
+
+
+class _ArrayLfuCache(Cache):
+    """Base class of the array-backed LFU caches.
+
+    Cached items are stored in preallocated slots, each with the frequency
+    and the insertion time of its item. The slots are ordered by a binary
+    heap of integers packing *(frequency, time, slot)*, so that the least
+    frequently used item, ties broken by insertion time as in `min` over the
+    counters of the object-based LFU caches, is found in O(log n) time
+    without allocating a tuple per request. Heap entries are invalidated
+    lazily: an entry is only valid if it equals the last one pushed for its
+    slot, and stale entries are discarded when popped or when the heap is
+    rebuilt.
+    """
+
+    _TIME_BITS = 64
+
+    def __init__(self, maxlen, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        n_slots = self._maxlen + 1
+        self._slot_bits = n_slots.bit_length()
+        self._map = {}
+        self._key = [None] * n_slots
+        self._freq = [0] * n_slots
+        self._time = [0] * n_slots
+        self._entry = [-1] * n_slots
+        self._free = list(range(n_slots - 1, -1, -1))
+        self._heap = []
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._map)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    @inheritdoc(Cache)
+    def dump(self):
+        return [self._key[slot] for slot in
+                sorted(self._map.values(), key=self._entry.__getitem__, reverse=True)]
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._map
+
+    def _push(self, slot):
+        entry = (((self._freq[slot] << self._TIME_BITS) | self._time[slot])
+                 << self._slot_bits) | slot
+        self._entry[slot] = entry
+        if len(self._heap) > 4 * len(self._map) + 64:
+            self._heap = [self._entry[s] for s in self._map.values()]
+            heapq.heapify(self._heap)
+        else:
+            heapq.heappush(self._heap, entry)
+
+    def _insert(self, k, freq, t):
+        """Insert item *k* with the given counter and return the evicted item,
+        if any"""
+        slot = self._free.pop()
+        self._key[slot] = k
+        self._freq[slot] = freq
+        self._time[slot] = t
+        self._map[k] = slot
+        self._push(slot)
+        if len(self._map) <= self._maxlen:
+            return None
+        mask = (1 << self._slot_bits) - 1
+        while True:
+            entry = heapq.heappop(self._heap)
+            slot = entry & mask
+            if self._entry[slot] == entry:
+                evicted = self._key[slot]
+                self.remove(evicted)
+                return evicted
+
+    def _hit(self, slot):
+        self._freq[slot] += 1
+        self._push(slot)
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._map:
+            return False
+        slot = self._map.pop(k)
+        self._key[slot] = None
+        self._entry[slot] = -1
+        self._free.append(slot)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._map.clear()
+        self._key = [None] * len(self._key)
+        self._entry = [-1] * len(self._entry)
+        self._free = list(range(len(self._key) - 1, -1, -1))
+        self._heap = []
+
+
+@register_cache_policy('ARRAY_IN_CACHE_LFU')
+class ArrayInCacheLfuCache(_ArrayLfuCache):
+    """In-cache Least Frequently Used (LFU) cache backed by arrays.
+
+    This cache behaves exactly as `InCacheLfuCache` but finds the item to
+    evict in O(log n) rather than O(n) time and does not allocate objects
+    per request.
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, *args, **kwargs):
+        super(ArrayInCacheLfuCache, self).__init__(maxlen)
+        self.t = 0
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k not in self._map:
+            return False
+        self._hit(self._map[k])
+        return True
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._map:
+            return None
+        self.t += 1
+        return self._insert(k, 1, self.t)
+
+
+@register_cache_policy('ARRAY_PERFECT_LFU')
+class ArrayPerfectLfuCache(_ArrayLfuCache):
+    """Perfect Least Frequently Used (LFU) cache backed by arrays.
+
+    This cache behaves exactly as `PerfectLfuCache` but finds the item to
+    evict in O(log n) rather than O(n) time. The counters of all contents,
+    including those not in cache, are stored in arrays indexed by content
+    identifier, which must therefore be non-negative integers.
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, *args, **kwargs):
+        super(ArrayPerfectLfuCache, self).__init__(maxlen)
+        # Counters of all contents, indexed by content identifier. A content
+        # whose frequency is 0 has never been requested.
+        self._counter_freq = []
+        self._counter_time = []
+        self.t = 0
+
+    def _count(self, k, t):
+        if k >= len(self._counter_freq):
+            grow = max(k + 1, 2 * len(self._counter_freq)) - len(self._counter_freq)
+            self._counter_freq.extend([0] * grow)
+            self._counter_time.extend([0] * grow)
+        if self._counter_freq[k] == 0:
+            self._counter_time[k] = t
+        self._counter_freq[k] += 1
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        self.t += 1
+        self._count(k, self.t)
+        if k not in self._map:
+            return False
+        self._hit(self._map[k])
+        return True
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._map:
+            return None
+        self._count(k, self.t)
+        return self._insert(k, self._counter_freq[k], self._counter_time[k])
+
+    @inheritdoc(Cache)
+    def clear(self):
+        super(ArrayPerfectLfuCache, self).clear()
+        self._counter_freq = []
+        self._counter_time = []
+
+
+@register_cache_policy('ARRAY_FIFO')
+class ArrayFifoCache(Cache):
+    """First In First Out (FIFO) cache backed by arrays.
+
+    This cache behaves exactly as `FifoCache` but stores its items in an
+    `ArrayLinkedSet`, so that inserting and evicting items does not allocate
+    objects and arbitrary items can be removed in constant time.
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._cache = ArrayLinkedSet(self._maxlen + 1)
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    @inheritdoc(Cache)
+    def dump(self):
+        return list(iter(self._cache))
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._cache
+
+    @inheritdoc(FifoCache)
+    def position(self, k, *args, **kwargs):
+        if not k in self._cache:
+            raise ValueError('The item %s is not in the cache' % str(k))
+        return self._cache.index(k)
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        return self.has(k)
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._cache:
+            return None
+        self._cache.append_top(k)
+        return self._cache.pop_bottom() if len(self._cache) > self._maxlen else None
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.remove(k)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._cache.clear()
+
 
 def insert_after_k_hits_cache(cache, k=2, memory=None):
     """Return a cache inserting items only after k requests.
@@ -2,10 +2,12 @@
 from __future__ import division
 import unittest
 import collections
+import random
 
 import numpy as np
 
 import icarus.models as cache
+from icarus.util import Message
 
 class TestLinkedSet(unittest.TestCase):
 
@@ -279,8 +281,20 @@ class TestMinCache(unittest.TestCase):
 
 class TestLruCache(unittest.TestCase):
 
+    cache_class = cache.LruCache
+
+    def test_put_message(self):
+        c = self.cache_class(4)
+        c.put(Message(content=1, labels=['x']))
+        c.put({'content': 2, 'labels': ['x']})
+        c.put(3)
+        self.assertEqual(c.dump(), [3, 2, 1])
+        self.assertIsNone(c.put({'content': 1}))
+        self.assertIsNone(c.put(Message(content=2)))
+        self.assertEqual(c.dump(), [2, 1, 3])
+
     def test_lru(self):
-        c = cache.LruCache(4)
+        c = self.cache_class(4)
         c.put(0)
         self.assertEquals(len(c), 1)
         c.put(2)
@@ -303,7 +317,7 @@ class TestLruCache(unittest.TestCase):
         self.assertEquals(c.dump(), [])
 
     def test_remove(self):
-        c = cache.LruCache(4)
+        c = self.cache_class(4)
         c.put(1)
         c.put(2)
         c.put(3)
@@ -321,7 +335,7 @@ class TestLruCache(unittest.TestCase):
         self.assertEqual(c.dump(), [4, 3])
 
     def test_position(self):
-        c = cache.LruCache(4)
+        c = self.cache_class(4)
         c.put(4)
         c.put(3)
         c.put(2)
@@ -334,18 +348,20 @@ class TestLruCache(unittest.TestCase):
 
 class TestSlruCache(unittest.TestCase):
 
+    cache_class = cache.SegmentedLruCache
+
     def test_alloc(self):
-        c = cache.SegmentedLruCache(100, 3, [0.4, 0.21, 0.39])
+        c = self.cache_class(100, 3, [0.4, 0.21, 0.39])
         self.assertEqual(list(c._segment_maxlen), [40, 21, 39])
         self.assertEqual(sum(c._segment_maxlen), c.maxlen)
 
     def test_alloc_rounding(self):
-        c = cache.SegmentedLruCache(100, 3, [0.402, 0.201, 0.397])
+        c = self.cache_class(100, 3, [0.402, 0.201, 0.397])
         self.assertEqual(list(c._segment_maxlen), [40, 20, 40])
         self.assertEqual(sum(c._segment_maxlen), c.maxlen)
 
     def test_put_get(self):
-        c = cache.SegmentedLruCache(9, 3)
+        c = self.cache_class(9, 3)
         self.assertEqual(c.maxlen, 9)
         c.put(1)
         self.assertEqual(c.dump(serialized=False), [[], [], [1]])
@@ -402,7 +418,7 @@ class TestSlruCache(unittest.TestCase):
         self.assertEqual(c.dump(serialized=False), [[6, 2, 3], [4], [5]])
 
     def test_remove(self):
-        c = cache.SegmentedLruCache(4, 2)
+        c = self.cache_class(4, 2)
         c.put(2)
         c.put(2)
         c.put(1)
@@ -424,7 +440,7 @@ class TestSlruCache(unittest.TestCase):
         self.assertEqual(c.dump(serialized=False), [[], []])
 
     def test_position(self):
-        c = cache.SegmentedLruCache(4, 2)
+        c = self.cache_class(4, 2)
         c.put(2)
         c.put(2)
         c.put(1)
@@ -438,7 +454,7 @@ class TestSlruCache(unittest.TestCase):
         self.assertEqual(c.position(4), 3)
 
     def test_has(self):
-        c = cache.SegmentedLruCache(4, 2)
+        c = self.cache_class(4, 2)
         c.put(2)
         c.put(2)
         c.put(1)
@@ -453,7 +469,7 @@ class TestSlruCache(unittest.TestCase):
         self.assertFalse(c.has(5))
 
     def test_dump(self):
-        c = cache.SegmentedLruCache(4, 2)
+        c = self.cache_class(4, 2)
         c.put(2)
         c.put(2)
         c.put(1)
@@ -466,8 +482,10 @@ class TestSlruCache(unittest.TestCase):
 
 class TestFifoCache(unittest.TestCase):
 
+    cache_class = cache.FifoCache
+
     def test_fifo(self):
-        c = cache.FifoCache(4)
+        c = self.cache_class(4)
         self.assertEquals(len(c), 0)
         c.put(1)
         self.assertEquals(len(c), 1)
@@ -492,7 +510,7 @@ class TestFifoCache(unittest.TestCase):
         self.assertEquals(c.dump(), [])
 
     def test_remove(self):
-        c = cache.FifoCache(4)
+        c = self.cache_class(4)
         c.put(1)
         c.put(2)
         c.put(3)
@@ -613,8 +631,10 @@ class TestRandCache(unittest.TestCase):
 
 class TestInCacheLfuCache(unittest.TestCase):
 
+    cache_class = cache.InCacheLfuCache
+
     def test_lfu(self):
-        c = cache.InCacheLfuCache(4)
+        c = self.cache_class(4)
         self.assertEquals(len(c), 0)
         c.put(1)
         self.assertEquals(len(c), 1)
@@ -644,8 +664,10 @@ class TestInCacheLfuCache(unittest.TestCase):
 
 class TestPerfectLfuCache(unittest.TestCase):
 
+    cache_class = cache.PerfectLfuCache
+
     def test_lfu(self):
-        c = cache.PerfectLfuCache(3)
+        c = self.cache_class(3)
         self.assertEquals(len(c), 0)
         c.put(1)
         self.assertEquals(len(c), 1)
@@ -695,6 +717,103 @@ class TestPerfectLfuCache(unittest.TestCase):
         self.assertEquals(c.dump(), [])
 
 
+class TestArrayLinkedSet(unittest.TestCase):
+
+    def test_lists(self):
+        s = cache.ArrayLinkedSet(4, lists=2)
+        s.append_top(1)
+        s.append_top(2)
+        s.append_top(3, 1)
+        self.assertEqual([2, 1], list(s.iter_list(0)))
+        self.assertEqual([3], list(s.iter_list(1)))
+        self.assertEqual([2, 1, 3], list(s))
+        s.move_to_top(1, 1)
+        self.assertEqual([2], list(s.iter_list(0)))
+        self.assertEqual([1, 3], list(s.iter_list(1)))
+        self.assertEqual(1, s.list_of(1))
+        self.assertEqual(1, s.index(3))
+        self.assertEqual(3, s.pop_bottom(1))
+        self.assertEqual(1, s.bottom(1))
+        s.remove(2)
+        self.assertIsNone(s.pop_bottom(0))
+        self.assertEqual((0, 1), (s.list_len(0), s.list_len(1)))
+        self.assertEqual(1, len(s))
+
+    def test_capacity(self):
+        s = cache.ArrayLinkedSet(2)
+        s.append_top(1)
+        s.append_top(2)
+        self.assertRaises(ValueError, s.append_top, 3)
+        self.assertRaises(KeyError, s.append_top, 1)
+        s.pop_bottom()
+        s.append_top(3)
+        self.assertEqual([3, 2], list(s))
+        s.clear()
+        self.assertEqual([], list(s))
+        self.assertNotIn(3, s)
+
+
+class TestArrayLruCache(TestLruCache):
+
+    cache_class = cache.ArrayLruCache
+
+    def test_random_trace(self):
+        rnd = random.Random(0)
+        c = self.cache_class(20)
+        reference = []
+        for _ in range(3000):
+            k = rnd.randint(0, 60)
+            if rnd.random() < 0.5:
+                hit = k in reference
+                self.assertEqual(hit, c.get(k))
+                if hit:
+                    reference.remove(k)
+                    reference.insert(0, k)
+            else:
+                evicted = None
+                if k in reference:
+                    reference.remove(k)
+                elif len(reference) == 20:
+                    evicted = reference.pop()
+                reference.insert(0, k)
+                self.assertEqual(evicted, c.put(k))
+            self.assertEqual(reference, c.dump())
+
+
+class TestArraySlruCache(TestSlruCache):
+
+    cache_class = cache.ArraySegmentedLruCache
+
+
+class TestArrayFifoCache(TestFifoCache):
+
+    cache_class = cache.ArrayFifoCache
+
+
+class TestArrayInCacheLfuCache(TestInCacheLfuCache):
+
+    cache_class = cache.ArrayInCacheLfuCache
+
+    def test_random_trace(self):
+        rnd = random.Random(0)
+        c = self.cache_class(20)
+        reference = cache.InCacheLfuCache(20)
+        for _ in range(5000):
+            k = rnd.randint(0, 60)
+            if rnd.random() < 0.6:
+                self.assertEqual(reference.get(k), c.get(k))
+            elif rnd.random() < 0.95:
+                self.assertEqual(reference.put(k), c.put(k))
+            else:
+                self.assertEqual(reference.remove(k), c.remove(k))
+            self.assertEqual(reference.dump(), c.dump())
+
+
+class TestArrayPerfectLfuCache(TestPerfectLfuCache):
+
+    cache_class = cache.ArrayPerfectLfuCache
+
+
 class TestInsertAfterKHits(unittest.TestCase):
 
     def test_put_get_no_memory(self):
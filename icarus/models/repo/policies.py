@@ -6,18 +6,29 @@ from collections import deque, defaultdict
 import random
 import abc
 import copy
+import heapq
+import numbers
 
 import numpy as np
 
-from icarus.util import inheritdoc, apportionment
+from icarus.util import inheritdoc, apportionment, label_mask, Message
 from icarus.registry import register_repo_policy
 
 __all__ = [
     'RepoStorage',
+    'IndexedRepoStorage',
     'RepoNull'
 ]
 
 
+def _label_mask(sm):
+    """Return the label bitmask of a stored message, which can also be a
+    plain dictionary"""
+    if isinstance(sm, Message):
+        return sm.label_mask
+    return label_mask(sm.get('labels') or ())
+
+
 # noinspection PyTypeChecker
 @register_repo_policy('REPO_STORAGE')
 class RepoStorage(object):
@@ -325,68 +336,36 @@ class RepoStorage(object):
 
     def hasMessage(self, MessageId, labels):
         answer = None
-        for i in range(0, len(self.processedMessages)):
-            if MessageId is not None and self.processedMessages[i]['content'] == MessageId:
-                answer = self.processedMessages[i]
-            elif labels:
-                j_labels = []
-                for label in self.processedMessages[i]['labels']:
-                    if label in labels:
-                        j_labels.append(label)
-                if (j_labels == labels):
-                    answer = self.processedMessages[i]
-        for i in range(0, len(self.Messages)):
-            if MessageId is not None and self.Messages[i]['content'] == MessageId:
-                answer = self.Messages[i]
-            elif labels:
-                j_labels = []
-                for label in self.Messages[i]['labels']:
-                    if label in labels:
-                        j_labels.append(label)
-                if (j_labels == labels):
-                    answer = self.Messages[i]
-        for i in range(0, len(self.processMessages)):
-            if MessageId is not None and self.processMessages[i]['content'] == MessageId:
-                answer = self.processMessages[i]
-            elif labels:
-                j_labels = []
-                for label in self.processMessages[i]['labels']:
-                    if label in labels:
-                        j_labels.append(label)
-                if (j_labels == labels):
-                    answer = self.processMessages[i]
+        mask = label_mask(labels) if labels else 0
+        for messages in (self.processedMessages, self.Messages, self.processMessages):
+            for sm in messages:
+                if MessageId is not None and sm['content'] == MessageId:
+                    answer = sm
+                elif mask and _label_mask(sm) & mask == mask:
+                    answer = sm
         return answer
 
     def getProcessedMessages(self, labels):
         answer = None
-        for i in range(0, len(self.processedMessages)):
-            j_labels = []
-            for label in self.processedMessages[i]['labels']:
-                if label in labels:
-                    j_labels.append(label)
-            if (j_labels == labels):
-                answer = self.processedMessages[i]
-        for i in range(0, len(self.Messages)):
-            j_labels = []
-            for label in self.Messages[i]['labels']:
-                if label in labels:
-                    j_labels.append(label)
-            if (j_labels == labels):
-                answer = self.Messages[i]
-        for i in range(0, len(self.processMessages)):
-            j_labels = []
-            for label in self.processMessages[i]['labels']:
-                if label in labels:
-                    j_labels.append(label)
-            if (j_labels == labels):
-                answer = self.processMessages[i]
+        mask = label_mask(labels)
+        for messages in (self.processedMessages, self.Messages, self.processMessages):
+            for sm in messages:
+                if _label_mask(sm) & mask == mask:
+                    answer = sm
         return answer
 
+    def _released(self, MessageId):
+        """Stop recording this node as a holder of a content in the model
+        once none of its messages has that content ID"""
+        if self.hasMessage(MessageId, []) is None:
+            self.model.remove_content_source(MessageId, self.node)
+
     def deleteMessage(self, MessageId):
-        for i in range(0, len(self.Messages)-1):
+        for i in range(0, len(self.Messages)):
             if (self.Messages[i]["content"] == MessageId):
                 self.Size -= self.Messages[i]['msg_size']
-                self.Messages.remove(i)
+                del self.Messages[i]
+                self._released(MessageId)
                 return True
         return False
 
@@ -401,10 +380,11 @@ class RepoStorage(object):
 	"""
 
     def deleteProcMessage(self, MessageId):
-        for i in (0, len(self.processMessages)-1):
+        for i in range(0, len(self.processMessages)):
             if (self.processMessages[i]['content'] == MessageId):
                 self.processSize -= self.processMessages[i]['msg_size']
-                self.processMessages.remove(self.processMessages[i])
+                del self.processMessages[i]
+                self._released(MessageId)
                 return True
 
         return False
@@ -460,7 +440,7 @@ class RepoStorage(object):
 		TODO: Check the ifs in original code - make code right. did not report every message.
 			Reporting is not done right.
 		"""
-        for i in range(0, len(self.processedMessages)-1):
+        for i in range(0, len(self.processedMessages)):
             if self.processedMessages[i]['content'] == MessageId:
                 self.depletedCloudProcMessages += 1
                 self.depletedCloudProcMessagesSize += self.processedMessages[i]['msg_size']
@@ -481,7 +461,8 @@ class RepoStorage(object):
                         elif (not self.processedMessages[i]['Fresh']):
                             self.mStale += 1
 
-                self.processedMessages.remove(i)
+                del self.processedMessages[i]
+                self._released(MessageId)
                 return True
         return False
 
@@ -1035,6 +1016,356 @@ class RepoStorage(object):
         return self.compressionRate
 
 
+@register_repo_policy('INDEXED_REPO_STORAGE')
+class IndexedRepoStorage(RepoStorage):
+    """Repo storage with constant-time message lookups.
+
+    This policy stores messages exactly as `RepoStorage` does, but also keeps,
+    for each of the three message buckets (`Messages`, `processMessages` and
+    `processedMessages`), a dict mapping content IDs to the stored messages and
+    an inverted index mapping each label to the messages of that bucket
+    carrying it. Lookups by content ID are therefore O(1) and lookups by
+    labels are computed as an intersection of the label sets, instead of
+    scanning every stored message.
+
+    Notes
+    -----
+    Messages are indexed on the labels they carry when they are stored. A
+    message matches a label query if it carries all the queried labels. If
+    more than one message of a bucket matches, the most recently stored one is
+    returned. As in `RepoStorage.hasMessage`, matches in `processMessages`
+    take precedence over matches in `Messages`, which take precedence over
+    matches in `processedMessages`.
+
+    The oldest/newest message queries are answered from lazy-deletion heaps
+    ordered by `receiveTime`, one per message class (e.g. fresh processed
+    messages), and from shelf-life expiry heaps for the stale/invalid
+    message queries. A message is classified when it is stored: if its
+    `receiveTime`, `Fresh` flag or type change, it has to be stored again
+    to be reclassified. Heap entries of deleted or re-stored messages are
+    discarded when they reach the top of a heap.
+    """
+
+    # Buckets, in increasing order of lookup precedence
+    _buckets = ('processedMessages', 'Messages', 'processMessages')
+
+    def __init__(self, node, model, contents, storageSize, compressionRate=0.5):
+        # Indexes need to exist before the parent constructor stores the
+        # initial contents
+        self._contentIndex = {bucket: {} for bucket in self._buckets}
+        self._labelIndex = {bucket: defaultdict(set) for bucket in self._buckets}
+        # Store order, size and labels of each stored message, as recorded
+        # when it was stored, keyed by (bucket, content ID)
+        self._stored = {}
+        self._storedOrders = set()
+        self._storeCounter = 0
+        self._processedUsed = 0
+        # Heaps of (receiveTime, store order, message), keyed by class. Max
+        # heaps store the negated receiveTime
+        self._heaps = {name: [] for name in ('process', 'validProcess', 'newestValidProcess',
+                                             'messages', 'unprocessed', 'processed',
+                                             'fresh', 'newestFresh', 'shelf', 'newestShelf',
+                                             'invalidProcess', 'staleMessages')}
+        # Heaps of (expiry time, store order, message) of messages with a
+        # shelf-life, feeding the 'invalidProcess' and 'staleMessages' heaps
+        # once expired
+        self._expiryHeaps = {'invalidProcess': [], 'staleMessages': []}
+        super(IndexedRepoStorage, self).__init__(node, model, contents, storageSize, compressionRate)
+
+    def _bucketOf(self, sm):
+        service_type = sm["service_type"].lower()
+        if service_type in ("non-proc", "unprocessed"):
+            return 'Messages'
+        elif service_type == "proc":
+            return 'processMessages'
+        elif service_type == "processed":
+            return 'processedMessages'
+        return None
+
+    def _index(self, bucket, sm):
+        cid = sm['content']
+        labels = tuple(sm['labels'])
+        self._contentIndex[bucket][cid] = sm
+        for label in labels:
+            self._labelIndex[bucket][label].add(cid)
+        self._storeCounter += 1
+        self._stored[(bucket, cid)] = (self._storeCounter, sm['msg_size'], labels)
+        self._storedOrders.add(self._storeCounter)
+        if bucket == 'processedMessages':
+            self._processedUsed += sm['msg_size']
+        self._classify(bucket, sm, self._storeCounter)
+
+    def _classify(self, bucket, sm, order):
+        """Push a newly stored message on the heaps of its classes"""
+        receiveTime = sm['receiveTime']
+        service_type = sm["service_type"].lower()
+        entry = (receiveTime, order, sm)
+        newestEntry = (-receiveTime, order, sm)
+        heaps = self._heaps
+        shelf_life = sm.get('shelf_life')
+        expires = isinstance(shelf_life, numbers.Real) and not isinstance(shelf_life, bool)
+        if bucket == 'processMessages':
+            heapq.heappush(heaps['process'], entry)
+            if sm.get('Fresh') is None and service_type not in ("unprocessed", "processed"):
+                heapq.heappush(heaps['validProcess'], entry)
+                heapq.heappush(heaps['newestValidProcess'], newestEntry)
+            if expires and service_type == "proc":
+                heapq.heappush(self._expiryHeaps['invalidProcess'], (receiveTime + shelf_life, order, sm))
+        elif bucket == 'Messages':
+            heapq.heappush(heaps['messages'], entry)
+            if service_type == "unprocessed":
+                heapq.heappush(heaps['unprocessed'], entry)
+            if expires:
+                heapq.heappush(self._expiryHeaps['staleMessages'], (receiveTime + shelf_life, order, sm))
+        elif bucket == 'processedMessages':
+            heapq.heappush(heaps['processed'], entry)
+            if sm.get('Fresh') is not None:
+                if sm['Fresh']:
+                    heapq.heappush(heaps['fresh'], entry)
+                    heapq.heappush(heaps['newestFresh'], newestEntry)
+                else:
+                    heapq.heappush(heaps['shelf'], entry)
+                    heapq.heappush(heaps['newestShelf'], newestEntry)
+
+    def _top(self, name):
+        """Return the message at the top of a heap, discarding the entries of
+        messages which are no longer stored"""
+        heap = self._heaps[name]
+        while heap:
+            key, order, sm = heap[0]
+            if order in self._storedOrders:
+                return sm
+            heapq.heappop(heap)
+        return None
+
+    def _expired(self, name, curTime):
+        """Move expired messages from an expiry heap to the heap of expired
+        messages ordered by receiveTime, and return the oldest of them"""
+        expiry = self._expiryHeaps[name]
+        while expiry and expiry[0][0] <= curTime:
+            _, order, sm = heapq.heappop(expiry)
+            if order in self._storedOrders:
+                heapq.heappush(self._heaps[name], (sm['receiveTime'], order, sm))
+        return self._top(name)
+
+    def _unindex(self, bucket, MessageId):
+        """Remove a message from the indexes and return it together with its
+        size as recorded when it was stored"""
+        sm = self._contentIndex[bucket].pop(MessageId, None)
+        if sm is None:
+            return None, 0
+        order, size, labels = self._stored.pop((bucket, MessageId))
+        self._storedOrders.discard(order)
+        if bucket == 'processedMessages':
+            self._processedUsed -= size
+        for label in labels:
+            holders = self._labelIndex[bucket][label]
+            holders.discard(MessageId)
+            if not holders:
+                del self._labelIndex[bucket][label]
+        return sm, size
+
+    def _lookup(self, bucket, MessageId, labels):
+        if MessageId is not None and MessageId in self._contentIndex[bucket]:
+            return self._contentIndex[bucket][MessageId]
+        if not labels:
+            return None
+        index = self._labelIndex[bucket]
+        holders = [index.get(label) for label in set(labels)]
+        if not all(holders):
+            return None
+        holders.sort(key=len)
+        candidates = holders[0].intersection(*holders[1:])
+        if not candidates:
+            return None
+        latest = max(candidates, key=lambda cid: self._stored[(bucket, cid)][0])
+        return self._contentIndex[bucket][latest]
+
+    @inheritdoc(RepoStorage)
+    def addToStoredMessages(self, sm):
+        bucket = self._bucketOf(sm) if sm is not None else None
+        if bucket is not None and sm['content'] in self._contentIndex[bucket]:
+            # A message with the same content ID replaces the stored one,
+            # so the node keeps holding the content
+            _, size = self._removeFromBucket(bucket, sm['content'])
+            if bucket == 'Messages':
+                self.Size -= size
+            elif bucket == 'processMessages':
+                self.processSize -= size
+        super(IndexedRepoStorage, self).addToStoredMessages(sm)
+        if bucket is not None:
+            self._index(bucket, sm)
+
+    @inheritdoc(RepoStorage)
+    def getMessage(self, MessageId):
+        return self._contentIndex['Messages'].get(MessageId)
+
+    @inheritdoc(RepoStorage)
+    def getProcessedMessage(self, MessageId):
+        return self._contentIndex['processedMessages'].get(MessageId)
+
+    @inheritdoc(RepoStorage)
+    def getProcessMessage(self, MessageId):
+        return self._contentIndex['processMessages'].get(MessageId)
+
+    def hasMessage(self, MessageId, labels):
+        """Return the stored message with the given content ID or, failing
+        that, the most recently stored message carrying all the given labels.
+
+        Parameters
+        ----------
+        MessageId : any hashable type
+            The content ID of the message, or *None* to look up by labels only
+        labels : list
+            The labels the message must carry
+
+        Returns
+        -------
+        message : dict
+            The message, or *None* if no stored message matches
+        """
+        for bucket in reversed(self._buckets):
+            answer = self._lookup(bucket, MessageId, labels)
+            if answer is not None:
+                return answer
+        return None
+
+    def getProcessedMessages(self, labels):
+        """Return the most recently stored message carrying all the given
+        labels.
+
+        Parameters
+        ----------
+        labels : list
+            The labels the message must carry
+
+        Returns
+        -------
+        message : dict
+            The message, or *None* if no stored message matches
+        """
+        for bucket in reversed(self._buckets):
+            if not labels:
+                # An empty label query matches any message
+                messages = getattr(self, bucket)
+                if messages:
+                    return messages[-1]
+                continue
+            answer = self._lookup(bucket, None, labels)
+            if answer is not None:
+                return answer
+        return None
+
+    def _removeFromBucket(self, bucket, MessageId):
+        sm, size = self._unindex(bucket, MessageId)
+        if sm is not None:
+            # Messages are appended as they are received, so the oldest ones,
+            # which are the ones normally depleted, are found first
+            getattr(self, bucket).remove(sm)
+        return sm, size
+
+    @inheritdoc(RepoStorage)
+    def deleteMessage(self, MessageId):
+        sm, size = self._removeFromBucket('Messages', MessageId)
+        if sm is None:
+            return False
+        self.Size -= size
+        self._released(MessageId)
+        return True
+
+    @inheritdoc(RepoStorage)
+    def deleteProcMessage(self, MessageId):
+        sm, size = self._removeFromBucket('processMessages', MessageId)
+        if sm is None:
+            return False
+        self.processSize -= size
+        self._released(MessageId)
+        return True
+
+    @inheritdoc(RepoStorage)
+    def deleteAnyMessage(self, MessageId):
+        if MessageId in self._contentIndex['processMessages']:
+            return self.deleteProcMessage(MessageId)
+        elif MessageId in self._contentIndex['Messages']:
+            return self.deleteMessage(MessageId)
+        return False
+
+    @inheritdoc(RepoStorage)
+    def deleteProcessedMessage(self, MessageId, report):
+        sm, size = self._removeFromBucket('processedMessages', MessageId)
+        if sm is None:
+            return False
+        self.depletedCloudProcMessages += 1
+        self.depletedCloudProcMessagesSize += size
+        if report:
+            if sm.get('overtime'):
+                self.mOvertime += 1
+            if sm.get('satisfied') is not None:
+                if sm['satisfied']:
+                    self.mSatisfied += 1
+                else:
+                    self.mUnSatisfied += 1
+            if sm.get('Fresh') is not None:
+                if sm['Fresh']:
+                    self.mFresh += 1
+                else:
+                    self.mStale += 1
+        self._released(MessageId)
+        return True
+
+    @inheritdoc(RepoStorage)
+    def getProcessedMessagesSize(self):
+        return self._processedUsed
+
+    @property
+    def getOldestProcessMessage(self):
+        return self._top('process')
+
+    @property
+    def getOldestValidProcessMessage(self):
+        return self._top('validProcess')
+
+    @property
+    def getOldestInvalidProcessMessage(self):
+        return self._expired('invalidProcess', time.time())
+
+    @property
+    def getOldestDeplUnProcMessage(self):
+        return self._top('unprocessed')
+
+    @property
+    def getNewestProcessMessage(self):
+        return self._top('newestValidProcess')
+
+    @property
+    def getOldestProcessedMessage(self):
+        return self._top('processed')
+
+    @property
+    def getOldestFreshMessage(self):
+        return self._top('fresh')
+
+    @property
+    def GetNewestFreshMessage(self):
+        return self._top('newestFresh')
+
+    @property
+    def getOldestShelfMessage(self):
+        return self._top('shelf')
+
+    @property
+    def getNewestShelfMessage(self):
+        return self._top('newestShelf')
+
+    @property
+    def getOldestMessage(self):
+        return self._top('messages')
+
+    @property
+    def getOldestStaleMessage(self):
+        return self._expired('staleMessages', time.time())
+
+
 # TODO: NEED TO REVIEW AND REVISE ALL OF THE CODE BELOWnot not not not not not not not not not not not
 #  \/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/
 
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+import unittest
+
+from icarus.models.repo import RepoStorage, IndexedRepoStorage
+from icarus.util import Message
+
+
+class MockModel(object):
+
+    def __init__(self, node):
+        self.comp_size = {node: 1}
+        self.repoStorage = {}
+        self.removed_sources = []
+
+    def remove_content_source(self, content, node):
+        self.removed_sources.append((content, node))
+
+
+def message(content, labels, service_type="non-proc", receiveTime=0.0):
+    return Message(content=content, labels=labels, service_type=service_type,
+                   msg_size=10, receiveTime=receiveTime, shelf_life=None,
+                   Fresh=None, overtime=False, satisfied=False)
+
+
+class TestIndexedRepoStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MockModel(0)
+        contents = {
+            1: message(1, ['a', 'b']),
+            2: message(2, ['b', 'c']),
+            3: message(3, ['a'], 'proc'),
+            4: message(4, ['c'], 'processed'),
+        }
+        self.plain = RepoStorage(0, self.model, contents, 1000)
+        self.indexed = IndexedRepoStorage(0, self.model, contents, 1000)
+
+    def test_registered(self):
+        from icarus.registry import REPO_POLICY
+        self.assertIs(REPO_POLICY['INDEXED_REPO_STORAGE'], IndexedRepoStorage)
+
+    def test_has_message_by_id(self):
+        for cid in (1, 2, 3, 4):
+            self.assertIs(self.plain.hasMessage(cid, []),
+                          self.indexed.hasMessage(cid, []))
+        self.assertIsNone(self.indexed.hasMessage(5, []))
+
+    def test_has_message_by_labels(self):
+        self.assertEqual(self.indexed.hasMessage(None, ['a'])['content'], 3)
+        self.assertEqual(self.indexed.hasMessage(None, ['b', 'c'])['content'], 2)
+        self.assertEqual(self.indexed.hasMessage(None, ['c'])['content'], 2)
+        self.assertEqual(self.indexed.hasMessage(5, ['a', 'b'])['content'], 1)
+        self.assertIsNone(self.indexed.hasMessage(None, ['a', 'c']))
+        self.assertIsNone(self.indexed.hasMessage(None, ['d']))
+
+    def test_has_message_by_labels_matches_indexed(self):
+        for labels in (['a'], ['b', 'c'], ['c', 'b'], ['c'], ['a', 'c'], ['d']):
+            self.assertIs(self.plain.hasMessage(None, labels),
+                          self.indexed.hasMessage(None, labels))
+
+    def test_plain_dict_messages(self):
+        sm = dict(message(5, ['d', 'e']))
+        self.plain.addToStoredMessages(sm)
+        self.assertIs(sm, self.plain.hasMessage(None, ['e', 'd']))
+        self.assertIs(sm, self.plain.getProcessedMessages(['d']))
+        sm['labels'].append('f')
+        self.assertIs(sm, self.plain.hasMessage(None, ['f']))
+
+    def test_get_processed_messages(self):
+        self.assertEqual(self.indexed.getProcessedMessages(['a', 'b'])['content'],
+                         self.plain.getProcessedMessages(['a', 'b'])['content'])
+        self.assertEqual(self.indexed.getProcessedMessages(['c'])['content'], 2)
+
+    def test_delete(self):
+        self.assertTrue(self.indexed.deleteAnyMessage(1))
+        self.assertIsNone(self.indexed.hasMessage(1, []))
+        self.assertIsNone(self.indexed.hasMessage(None, ['a', 'b']))
+        self.assertEqual(self.indexed.getMessagesSize(), 10)
+        self.assertEqual(len(self.indexed.Messages), 1)
+        self.assertTrue(self.indexed.deleteAnyMessage(3))
+        self.assertEqual(self.indexed.getProcMessagesSize(), 0)
+        self.assertFalse(self.indexed.deleteAnyMessage(3))
+        self.assertTrue(self.indexed.deleteProcessedMessage(4, True))
+        self.assertEqual(self.indexed.getNrofProcessedMessages(), 0)
+        self.assertEqual(self.indexed.getNrofDepletedCloudProcMessages(), 1)
+
+    def test_replace(self):
+        self.indexed.addToStoredMessages(message(2, ['d']))
+        self.assertEqual(self.indexed.hasMessage(None, ['d'])['content'], 2)
+        self.assertIsNone(self.indexed.hasMessage(None, ['b', 'c']))
+
+    def test_delete_releases_content_source(self):
+        for repo in (self.plain, self.indexed):
+            del self.model.removed_sources[:]
+            self.assertTrue(repo.deleteMessage(1))
+            self.assertTrue(repo.deleteProcMessage(3))
+            self.assertTrue(repo.deleteProcessedMessage(4, False))
+            self.assertFalse(repo.deleteMessage(1))
+            self.assertEqual([(1, 0), (3, 0), (4, 0)], self.model.removed_sources)
+        del self.model.removed_sources[:]
+        self.indexed.addToStoredMessages(message(2, ['d']))
+        self.assertEqual([], self.model.removed_sources)
+
+
+class TestIndexedRepoStorageAge(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MockModel(0)
+        self.repo = IndexedRepoStorage(0, self.model, None, 1000)
+
+    def store(self, content, service_type, receiveTime, **kwargs):
+        sm = message(content, [], service_type, receiveTime)
+        sm.update(kwargs)
+        self.repo.addToStoredMessages(sm)
+        return sm
+
+    def test_oldest_message(self):
+        self.assertIsNone(self.repo.getOldestMessage)
+        self.store(1, 'non-proc', 5.0)
+        self.store(2, 'unprocessed', 3.0)
+        self.store(3, 'non-proc', 4.0)
+        self.assertEqual(self.repo.getOldestMessage['content'], 2)
+        self.assertEqual(self.repo.getOldestDeplUnProcMessage['content'], 2)
+        self.repo.deleteAnyMessage(2)
+        self.assertEqual(self.repo.getOldestMessage['content'], 3)
+        self.assertIsNone(self.repo.getOldestDeplUnProcMessage)
+
+    def test_process_messages(self):
+        self.store(1, 'proc', 5.0)
+        self.store(2, 'proc', 3.0, Fresh=True)
+        self.store(3, 'proc', 4.0)
+        self.store(4, 'proc', 6.0)
+        self.assertEqual(self.repo.getOldestProcessMessage['content'], 2)
+        self.assertEqual(self.repo.getOldestValidProcessMessage['content'], 3)
+        self.assertEqual(self.repo.getNewestProcessMessage['content'], 4)
+        self.repo.deleteAnyMessage(4)
+        self.assertEqual(self.repo.getNewestProcessMessage['content'], 1)
+
+    def test_processed_messages(self):
+        self.store(1, 'processed', 5.0, Fresh=True)
+        self.store(2, 'processed', 3.0, Fresh=True)
+        self.store(3, 'processed', 4.0, Fresh=False)
+        self.store(4, 'processed', 1.0, Fresh=False)
+        self.assertEqual(self.repo.getOldestProcessedMessage['content'], 4)
+        self.assertEqual(self.repo.getOldestFreshMessage['content'], 2)
+        self.assertEqual(self.repo.GetNewestFreshMessage['content'], 1)
+        self.assertEqual(self.repo.getOldestShelfMessage['content'], 4)
+        self.assertEqual(self.repo.getNewestShelfMessage['content'], 3)
+        self.assertEqual(self.repo.getProcessedMessagesSize(), 40)
+        self.repo.deleteProcessedMessage(2, False)
+        self.assertEqual(self.repo.getOldestFreshMessage['content'], 1)
+        self.assertEqual(self.repo.getProcessedMessagesSize(), 30)
+
+    def test_restored_message_is_reclassified(self):
+        sm = self.store(1, 'processed', 5.0, Fresh=True)
+        sm['Fresh'] = False
+        self.repo.addToStoredMessages(sm)
+        self.assertIsNone(self.repo.getOldestFreshMessage)
+        self.assertIs(self.repo.getOldestShelfMessage, sm)
+        self.assertEqual(len(self.repo.processedMessages), 1)
+
+    def test_stale_messages(self):
+        self.store(1, 'non-proc', 0.0, shelf_life=10 ** 12)
+        self.store(2, 'non-proc', 2.0, shelf_life=1.0)
+        self.store(3, 'non-proc', 1.0, shelf_life=5.0)
+        self.store(4, 'proc', 1.0, shelf_life=2.0)
+        self.assertEqual(self.repo.getOldestStaleMessage['content'], 3)
+        self.assertEqual(self.repo.getOldestInvalidProcessMessage['content'], 4)
+        self.repo.deleteAnyMessage(3)
+        self.assertEqual(self.repo.getOldestStaleMessage['content'], 2)
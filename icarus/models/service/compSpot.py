@@ -16,6 +16,8 @@ import random
 import abc
 import copy
 import heapq 
+import bisect
+from operator import attrgetter
 
 import numpy as np
 
@@ -24,6 +26,7 @@ from icarus.util import inheritdoc
 __all__ = [
         'ComputationSpot',
         'Task',
+        'TaskQueue',
         'VM'
            ]
 
@@ -150,6 +153,114 @@ class Task(object):
         
         return self.completionTime < other.completionTime
 
+class TaskQueue(object):
+    """
+    Ordered task queue used by the Scheduler.
+
+    Tasks are kept sorted by a key (expiry for EDF, arrival time for FIFO)
+    recorded when they are inserted, with ties broken by insertion order
+    exactly as a stable sort would. Insertion and removal locate the
+    position with a binary search instead of re-sorting the whole queue, and
+    iteration walks the tasks in scheduling order.
+
+    The queue behaves like the list it replaces as far as the strategies
+    are concerned: it supports len(), indexing, slicing (which returns a
+    plain list), iteration, membership tests and concatenation with lists.
+    """
+
+    def __init__(self, key, tasks=()):
+        """Constructor
+
+        Parameters
+        ----------
+        key : callable
+            Function returning the ordering key of a task, or None if the
+            scheduling policy is invalid
+        tasks : iterable, optional
+            Tasks to insert initially
+        """
+        self._key = key
+        self._seq = 0
+        # Sorted (key, seq) entries and the tasks in the same positions
+        self._entries = []
+        self._tasks = []
+        # id(task) -> (key, seq) of the queued task
+        self._position = {}
+        for task in tasks:
+            self.append(task)
+
+    def append(self, task):
+        """Insert a task at its position in scheduling order
+
+        Parameters
+        ----------
+        task : Task
+            The task to insert
+        """
+        if self._key is None:
+            raise ValueError("Invalid scheduling policy")
+        entry = (self._key(task), self._seq)
+        self._seq += 1
+        indx = bisect.bisect_right(self._entries, entry)
+        self._entries.insert(indx, entry)
+        self._tasks.insert(indx, task)
+        self._position[id(task)] = entry
+
+    def remove(self, task):
+        """Remove a task from the queue
+
+        Parameters
+        ----------
+        task : Task
+            The task to remove
+
+        Raises
+        ------
+        ValueError
+            If the task is not in the queue
+        """
+        entry = self._position.pop(id(task), None)
+        if entry is None:
+            raise ValueError("TaskQueue.remove(x): x not in queue")
+        indx = bisect.bisect_left(self._entries, entry)
+        del self._entries[indx]
+        del self._tasks[indx]
+
+    def items(self):
+        """Return the (key, task) pairs of the queue in scheduling order"""
+        return [(entry[0], task) for entry, task in zip(self._entries, self._tasks)]
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def __getitem__(self, indx):
+        return self._tasks[indx]
+
+    def __contains__(self, task):
+        return id(task) in self._position
+
+    def __add__(self, other):
+        return self._tasks + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self._tasks
+
+    def __copy__(self):
+        clone = TaskQueue.__new__(TaskQueue)
+        clone._key = self._key
+        clone._seq = self._seq
+        clone._entries = self._entries[:]
+        clone._tasks = self._tasks[:]
+        clone._position = dict(self._position)
+        return clone
+
+    def __repr__(self):
+        return "TaskQueue(" + repr(self._tasks) + ")"
+
+
 class Scheduler(object):
     """
     Information on running tasks, their finish times, etc. on each core of the CPU.
@@ -172,8 +283,8 @@ class Scheduler(object):
         self.queuedServicesPerReceiver = [[0]*cs.service_population_size for x in cs.model.topology.receivers()]
         ### Idle curTime of the cs #
         self.idleTime = 0.0
-        ### Task queue #
-        self._taskQueue = []
+        ### Task queue, kept in scheduling order #
+        self._taskQueue = TaskQueue(self.queue_key(sched_policy))
         ### Task queue for upcoming tasks that will arrive in the future (i.e., for coordinated strategy) #
         self.upcomingTaskQueue = []
         ### Schedule policy #
@@ -187,6 +298,17 @@ class Scheduler(object):
         self.idleVMs = {x:[] for x in range(len(self.cs.services))}
         self.startingVMs = {x:[] for x in range(len(self.cs.services))}
 
+    @staticmethod
+    def queue_key(sched_policy):
+        """Return the task ordering key of a scheduling policy, or None if
+        the policy is not supported
+        """
+        if sched_policy == 'EDF':
+            return attrgetter('expiry')
+        elif sched_policy == 'FIFO':
+            return attrgetter('arrivalTime')
+        return None
+
     def get_idleTime(self, curTime):
         
         # update the idle times
@@ -251,17 +373,10 @@ class Scheduler(object):
 
     def addToTaskQueue(self, aTask, curTime,  update_arrival_time = True):
 
-        self._taskQueue.append(aTask)
-
         if update_arrival_time is True:
             aTask.arrivalTime = curTime
 
-        if self.sched_policy == 'EDF':
-            self._taskQueue = sorted(self._taskQueue, key=lambda x: x.expiry)
-        elif self.sched_policy == 'FIFO':
-            self._taskQueue = sorted(self._taskQueue, key=lambda x: x.arrivalTime)
-        else:
-            raise ValueError("Invalid scheduling policy")
+        self._taskQueue.append(aTask)
 
         if aTask.taskType == Task.TASK_TYPE_SERVICE:
             self.queuedServicesPerReceiver[int(aTask.receiver[4:])][aTask.service] += 1
@@ -528,6 +643,9 @@ class ComputationSpot(object):
     """
     #services     : list of all the services (service population) with their attributes.
     services = None
+    # Whether compute_completion_times may use the analytical list schedule
+    # instead of replaying the queue through a copy of the scheduler
+    analytical_admission = True
     def __init__(self, model, numOfCores, numOfVMs, services, node, sched_policy = "EDF", dist=None):
         """Constructor
 
@@ -727,6 +845,9 @@ class ComputationSpot(object):
         """
         if debug:
             print("\tComputing completion times for node: " + str(self.node))
+        if self.analytical_admission and not debug:
+            if self.list_schedule_completion_times(curTime):
+                return
         self.schedulerCopy = copy.copy(self.scheduler)
         # The below copy operations are necessary as copy.copy only makes
         # a shallow copy, which simply copies references of the following two
@@ -805,6 +926,127 @@ class ComputationSpot(object):
             if debug:
                 print ("NumRunning: " + str(numRunning))
 
+    def list_schedule_completion_times(self, curTime):
+        """
+        Compute the completion time of every queued and upcoming task
+        without replaying the queue through a copy of the scheduler.
+
+        When only service tasks are queued, no VM is starting up and every
+        service has at least as many VM instances as it has running, queued
+        and upcoming tasks, VM availability never delays a task. The replay
+        performed by compute_completion_times then reduces to a
+        non-preemptive list schedule: whenever a core is free, the
+        highest-priority task that has arrived starts on the lowest indexed
+        of the earliest free cores. This method evaluates that schedule
+        directly, in O(n * numOfCores) rather than O(n^2) time and without
+        copying the scheduler.
+
+        The replay shares runningTasks and the queued service counters with
+        the real scheduler (the scheduler copy is shallow), so the updates it
+        makes to them are applied here as well and admission decisions are
+        exactly those of the replay.
+
+        Parameters
+        ----------
+        curTime : float
+            The current time
+
+        Return
+        ------
+        computed : bool
+            True if the completion times were computed, False if the state of
+            the scheduler requires the full replay. Nothing is modified when
+            False is returned.
+        """
+        scheduler = self.scheduler
+        taskQueue = scheduler._taskQueue
+        upcomingTaskQueue = scheduler.upcomingTaskQueue
+        coreFinishTime = scheduler.coreFinishTime
+        numOfCores = scheduler.numOfCores
+
+        demand = {}
+        for indx in range(numOfCores):
+            service = scheduler.runningServices[indx]
+            if coreFinishTime[indx] > curTime and service is not None:
+                demand[service] = demand.get(service, 0) + 1
+        for aTask in taskQueue + upcomingTaskQueue:
+            if aTask.taskType != Task.TASK_TYPE_SERVICE or len(aTask.nextTask) > 0:
+                return False
+            if aTask.exec_time == float('inf'):
+                return False
+            demand[aTask.service] = demand.get(aTask.service, 0) + 1
+        for service, count in demand.items():
+            if count > len(scheduler.idleVMs[service]) + len(scheduler.busyVMs[service]):
+                return False
+        for startingVMs in scheduler.startingVMs.values():
+            if len(startingVMs) > 0:
+                return False
+
+        key = scheduler.queue_key(scheduler.sched_policy)
+        if key is None:
+            return False
+        # (key, insertion order, task) heap of the tasks that have arrived
+        ready = []
+        for key_value, aTask in taskQueue.items():
+            ready.append((key_value, len(ready), aTask))
+        seq = len(ready)
+        # The first update_state() moves arrived tasks in list order, later
+        # ones move them in arrival order
+        pending = []
+        for aTask in upcomingTaskQueue:
+            if aTask.arrivalTime <= curTime:
+                heapq.heappush(ready, (key(aTask), seq, aTask))
+                seq += 1
+            else:
+                pending.append(aTask)
+        pending = sorted(pending, key=attrgetter('arrivalTime'))
+
+        finishTime = list(coreFinishTime)
+        runningTasks = {}
+        completionTimes = []
+        pending_indx = 0
+        t = curTime
+        while True:
+            # update_state()
+            while pending_indx < len(pending) and pending[pending_indx].arrivalTime <= t:
+                aTask = pending[pending_indx]
+                heapq.heappush(ready, (key(aTask), seq, aTask))
+                seq += 1
+                pending_indx += 1
+            for indx in range(numOfCores):
+                if finishTime[indx] <= t:
+                    finishTime[indx] = t
+                    runningTasks[indx] = None
+            earliest = min(finishTime)
+            if len(ready) > 0:
+                if earliest <= t:
+                    aTask = heapq.heappop(ready)[2]
+                    indx = finishTime.index(earliest)
+                    finishTime[indx] = t + aTask.exec_time
+                    runningTasks[indx] = aTask
+                    completionTimes.append((aTask, finishTime[indx]))
+                    t = max(min(finishTime), t)
+                else:
+                    t = earliest
+            elif pending_indx < len(pending):
+                if earliest <= t:
+                    t = pending[pending_indx].arrivalTime
+                else:
+                    t = earliest
+            else:
+                break
+            if t == float('inf'):
+                return False
+
+        for aTask, completionTime in completionTimes:
+            aTask.completionTime = completionTime
+        for indx, aTask in runningTasks.items():
+            scheduler.runningTasks[indx] = aTask
+        for aTask in taskQueue:
+            scheduler.queuedServices[aTask.service] -= 1
+            scheduler.queuedServicesPerReceiver[int(aTask.receiver[4:])][aTask.service] -= 1
+        return True
+
     def admit_task_FIFO(self, service, labels, curTime,  flow_id, deadline, receiver, rtt_delay, controller, debug):
         """
         Parameters
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+import copy
+import random
+import unittest
+
+from icarus.models.service import Task, TaskQueue
+from icarus.models.service.compSpot import ComputationSpot, Scheduler
+
+
+def task(expiry, arrivalTime):
+    return Task(arrivalTime, Task.TASK_TYPE_SERVICE, expiry, 0.0, 0, 0, [],
+                1.0, 0, 'rec_0', arrivalTime=arrivalTime)
+
+
+class TestTaskQueue(unittest.TestCase):
+
+    def test_matches_stable_sort(self):
+        for policy, attr in (('EDF', 'expiry'), ('FIFO', 'arrivalTime')):
+            rnd = random.Random(policy)
+            queue = TaskQueue(Scheduler.queue_key(policy))
+            reference = []
+            for _ in range(300):
+                if reference and rnd.random() < 0.3:
+                    aTask = rnd.choice(reference)
+                    reference.remove(aTask)
+                    queue.remove(aTask)
+                else:
+                    aTask = task(rnd.randint(0, 20), rnd.randint(0, 20))
+                    reference.append(aTask)
+                    reference = sorted(reference,
+                                       key=lambda x: getattr(x, attr))
+                    queue.append(aTask)
+                self.assertEqual(reference, list(queue))
+                self.assertEqual(reference, queue[:])
+
+    def test_list_behaviour(self):
+        queue = TaskQueue(Scheduler.queue_key('EDF'))
+        a, b, c = task(3, 0), task(1, 0), task(2, 0)
+        for aTask in (a, b, c):
+            queue.append(aTask)
+        self.assertEqual(3, len(queue))
+        self.assertIs(b, queue[0])
+        self.assertIs(a, queue[-1])
+        self.assertIn(c, queue)
+        self.assertEqual([b, c, a, c], queue + [c])
+        self.assertEqual([c, b, c, a], [c] + queue)
+        queue.remove(c)
+        self.assertNotIn(c, queue)
+        self.assertRaises(ValueError, queue.remove, c)
+
+    def test_copy_is_independent(self):
+        queue = TaskQueue(Scheduler.queue_key('FIFO'))
+        a, b = task(0, 1), task(0, 2)
+        queue.append(a)
+        queue_copy = copy.copy(queue)
+        queue_copy.append(b)
+        queue_copy.remove(a)
+        self.assertEqual([a], list(queue))
+        self.assertEqual([b], list(queue_copy))
+
+    def test_invalid_policy(self):
+        queue = TaskQueue(Scheduler.queue_key('LIFO'))
+        self.assertRaises(ValueError, queue.append, task(0, 0))
+
+
+class MockCache(object):
+
+    def put(self, k):
+        return None
+
+
+class MockTopology(object):
+
+    def __init__(self, n_receivers):
+        self._receivers = ['rec_%d' % i for i in range(n_receivers)]
+
+    def receivers(self):
+        return self._receivers
+
+
+class MockModel(object):
+
+    def __init__(self, node, n_receivers):
+        self.cache = {node: MockCache()}
+        self.topology = MockTopology(n_receivers)
+
+
+class MockService(object):
+
+    def __init__(self, service_time):
+        self.service_time = service_time
+
+
+class TestListScheduleCompletionTimes(unittest.TestCase):
+
+    n_services = 4
+    n_receivers = 3
+
+    def setUp(self):
+        self.services = [MockService(0.5 + 0.5 * i)
+                         for i in range(self.n_services)]
+        self._services = ComputationSpot.services
+        ComputationSpot.services = self.services
+
+    def tearDown(self):
+        ComputationSpot.services = self._services
+
+    def state(self, seed, policy):
+        rnd = random.Random(seed)
+        random.seed(seed)
+        cs = ComputationSpot(MockModel(0, self.n_receivers), rnd.randint(1, 3),
+                             12, self.services, 0, policy)
+        scheduler = cs.scheduler
+        curTime = 10.0
+        for indx in range(scheduler.numOfCores):
+            if rnd.random() < 0.5:
+                scheduler.coreFinishTime[indx] = curTime + rnd.choice([0.5, 1, 2])
+                scheduler.runningServices[indx] = rnd.randrange(self.n_services)
+        flow_id = 0
+        for _ in range(rnd.randint(0, 8)):
+            service = rnd.randrange(self.n_services)
+            receiver = 'rec_%d' % rnd.randrange(self.n_receivers)
+            aTask = Task(curTime, Task.TASK_TYPE_SERVICE,
+                         curTime + rnd.choice([1, 2, 3, 5, 8]), 0.1, 0,
+                         service, [], self.services[service].service_time,
+                         flow_id, receiver, curTime - rnd.choice([0, 1, 2]))
+            scheduler.addToTaskQueue(aTask, curTime, rnd.random() < 0.5)
+            flow_id += 1
+        for _ in range(rnd.randint(0, 4)):
+            service = rnd.randrange(self.n_services)
+            receiver = 'rec_%d' % rnd.randrange(self.n_receivers)
+            arrival = curTime + rnd.choice([0, 0.5, 1, 3])
+            aTask = Task(curTime, Task.TASK_TYPE_SERVICE, arrival + 4, 0.1, 0,
+                         service, [], self.services[service].service_time,
+                         flow_id, receiver, arrival)
+            scheduler.addToUpcomingTaskQueue(aTask, curTime)
+            flow_id += 1
+        return cs, curTime
+
+    def outcome(self, cs):
+        scheduler = cs.scheduler
+        tasks = sorted(scheduler._taskQueue + scheduler.upcomingTaskQueue,
+                       key=lambda x: x.flow_id)
+        return ([(x.flow_id, x.completionTime) for x in tasks],
+                [x.flow_id if x is not None else None
+                 for x in scheduler.runningTasks],
+                list(scheduler.queuedServices),
+                [list(x) for x in scheduler.queuedServicesPerReceiver])
+
+    def test_matches_replay(self):
+        computed = 0
+        for policy in ('EDF', 'FIFO'):
+            for seed in range(200):
+                cs, curTime = self.state(seed, policy)
+                cs.analytical_admission = False
+                cs.compute_completion_times(curTime, True)
+                expected = self.outcome(cs)
+                cs, curTime = self.state(seed, policy)
+                if cs.list_schedule_completion_times(curTime):
+                    computed += 1
+                else:
+                    cs.compute_completion_times(curTime, True)
+                self.assertEqual(expected, self.outcome(cs))
+        self.assertGreater(computed, 100)
@@ -4,11 +4,14 @@ from __future__ import division
 from __future__ import print_function
 
 import networkx as nx
+import bisect
 import random
 import sys
+import time as walltime
 # for the optimizer
-#import cvxpy as cp
+import cvxpy as cp
 import numpy as np
+import scipy.sparse as sp
 import optparse
 
 from icarus.registry import register_strategy
@@ -17,6 +20,8 @@ from .base import Strategy
 from icarus.models.service import Task
 
 __all__ = [
+        'ForwardingProblem',
+        'routing_tables',
         'OptimalScheduling'
            ]
 
@@ -24,6 +29,117 @@ __all__ = [
 REQUEST = 0
 RESPONSE = 1
 TASK_COMPLETE = 2
+
+
+class ForwardingProblem(object):
+    """Maximum request forwarding LP of the optimal strategies, compiled once.
+
+    The problem maximises the rate of requests of each (service, group) pair
+    forwarded to the computation spots able to serve them within the deadline,
+    subject to the number of cores of each spot and to the demand of each
+    pair. Only the accessible (service, group, node) triples are variables, so
+    the problem is a single sparse LP whose only parameter is the demand:
+    successive solves just update it and warm-start the solver.
+    """
+
+    def __init__(self, A, C):
+        """Constructor
+
+        Parameters
+        ----------
+        A : array
+            Array of shape (S, H, G) equal to 1 where node h can serve the
+            requests of group g for service s within the deadline
+        C : array
+            Capacity (number of cores) of each of the H nodes
+        """
+        S, H, G = np.shape(A)
+        self.shape = (S, G, H)
+        s, h, g = np.nonzero(A)
+        self.triples = (s, g, h)
+        n_vars = len(s)
+        self.demand = cp.Parameter(S*G, value=np.zeros(S*G))
+        self.x = cp.Variable(n_vars) if n_vars > 0 else None
+        if self.x is None:
+            self.problem = None
+            return
+        cols = np.arange(n_vars)
+        self.capacity = sp.csr_matrix((np.ones(n_vars), (h, cols)), shape=(H, n_vars))
+        self.coverage = sp.csr_matrix((np.ones(n_vars), (s*G + g, cols)), shape=(S*G, n_vars))
+        constraints = [self.capacity*self.x <= np.asarray(C, dtype=float),
+                       self.coverage*self.x <= self.demand,
+                       self.x >= 0.0]
+        self.problem = cp.Problem(cp.Maximize(cp.sum_entries(self.x)), constraints)
+
+    def solve(self, D):
+        """Solve the problem for demand *D*
+
+        Parameters
+        ----------
+        D : array
+            Request rate of each (service, group) pair, of shape (S, G)
+
+        Returns
+        -------
+        x_bar : array
+            Rate forwarded per (service, group, node), of shape (S, G, H)
+        solve_time : float
+            Wall-clock time spent in the solver, in seconds
+        """
+        x_bar = np.zeros(self.shape)
+        if self.problem is None:
+            return x_bar, 0.0
+        self.demand.value = np.asarray(D, dtype=float).ravel()
+        start = walltime.time()
+        self.problem.solve(warm_start=True)
+        solve_time = walltime.time() - start
+        x_bar[self.triples] = np.asarray(self.x.value).ravel()
+        return x_bar, solve_time
+
+
+def routing_tables(probability, access_nodes, check=True, tolerance=0.01):
+    """Build the cumulative routing tables sampled by the optimal strategies
+
+    Parameters
+    ----------
+    probability : array
+        Probability of executing the requests of each (service, group) pair
+        at each node, of shape (S, G, H)
+    access_nodes : dict
+        Dictionary keyed by group of the nodes on the path from the group to
+        the cloud, in the order they are traversed
+    check : bool, optional
+        If True, check that the probabilities along each path add up to at
+        most 1. Pass False for weights that are not probabilities, such as
+        fractional rates, which are accumulated as they are
+    tolerance : float, optional
+        Amount by which a cumulative probability may exceed 1 because of
+        numerical errors of the solver
+
+    Returns
+    -------
+    tables : dict
+        Dictionary keyed by group of the list of cumulative probabilities
+        along *access_nodes* of each service. A request is executed at the
+        node of the first cumulative probability not lower than a uniform
+        draw, or in the cloud if there is none.
+
+    Raises
+    ------
+    ValueError
+        If *check* is True and the probabilities along the path of a group
+        exceed 1
+    """
+    tables = {}
+    for ap, nodes in access_nodes.items():
+        cum = np.cumsum(probability[:, ap, [int(v) for v in nodes]], axis=1)
+        if check and cum.size > 0 and cum[:, -1].max() > 1.0 + tolerance:
+            raise ValueError("Cumulative probability exceeded 1.0 in Optimal Strategy: "
+                             + str(cum[:, -1].max()))
+        tables[ap] = cum.tolist()
+    return tables
+
+
 @register_strategy('OPTIMAL_SCHED')
 class OptimalScheduling(Strategy):
     """
@@ -35,9 +151,6 @@ class OptimalScheduling(Strategy):
         super(OptimalScheduling, self).__init__(view,controller)
         self.last_replacement = 0
         self.replacement_interval = replacement_interval
-        ### Count of requests for each service
-        self.perServiceReceiverRequestCounts = {} 
-        self.perAccessPerNodePerServiceProbability = {}
         self.receivers = view.topology().receivers()
         self.compSpots = self.view.service_nodes()
         self.num_nodes = len(self.compSpots.keys())
@@ -49,38 +162,34 @@ class OptimalScheduling(Strategy):
         self.S      = self.view.num_services()
         self.G      = len(self.receivers) #number of groups 
         self.H      = len(self.compSpots) #number of nodes
-        self.C      = cp.Parameter(self.H, value=np.zeros(self.H)) 
-        self.x_bar  = {} # #variable: maximum number of group-node requests forwarded per services
-        self.A      = {} #nodes accessible for each group per service, i.e., nodes that can serve a request from a group with size (Sx)HxG 
-        self.x      = {} #number of requests for each group per service and node with size (GxS)xH
-        self.std_D  = {} #standing deviation of arriving requests rate per service
-        self.avg_D  = {} #average arriving requests rate per service with size (Sx)G 
-
-        ### initialise optimizer input 
-        for i in range(self.S):
-            self.x_bar[i]  = cp.Variable(self.G,self.H)
-            self.avg_D[i]  = cp.Parameter(self.G,value=np.zeros(self.G))
-            self.std_D[i]  = cp.Parameter(self.G,value=np.zeros(self.G))
-            self.A[i]      = cp.Parameter((self.H,self.G))
-            self.A[i]     = np.zeros((self.H,self.G))
-            for g in range(self.G):
-                self.x[g,i]  = cp.Variable(self.H)
+        self.C      = np.zeros(self.H) #number of cores per node
+        self.x_bar  = np.zeros((self.S,self.G,self.H)) #maximum number of group-node requests forwarded per service
+        self.A      = np.zeros((self.S,self.H,self.G)) #nodes accessible for each group per service, i.e., nodes that can serve a request from a group
+        self.x      = np.zeros((self.S,self.G,self.H)) #number of requests for each group per service and node
+        self.std_D  = np.zeros((self.S,self.G)) #standing deviation of arriving requests rate per service
+        self.avg_D  = np.zeros((self.S,self.G)) #average arriving requests rate per service
+        ### outputs of the optimizer
+        self.perAccessPerNodePerServiceProbability = np.zeros((self.G,self.H,self.S))
+        self.access_nodes   = {} #computation spots on the path from each AP to the cloud
+        self.routing_tables = {} #cumulative probabilities along the access nodes per AP and service
 
         for node in self.compSpots.keys():
             cs = self.compSpots[node]
             if cs.is_cloud:
                 continue
             node = int(node)
-            self.C.value[node]  = cs.numOfCores
+            self.C[node]  = cs.numOfCores
 
         for ap in self.receivers:
             ap_int = int(ap[4:])
+            self.access_nodes[ap_int] = []
             parent = view.topology().graph['edge_routers'][ap_int]
             while parent is not None:
                 cs = self.compSpots[parent]
                 if cs.is_cloud:
                     continue
                 node = int(parent)
+                self.access_nodes[ap_int].append(parent)
                 rtt_delay = 2*view.path_delay(ap, parent)
                 if self.debug:
                     print ("RTT delay from " + str(ap) + " to " + str(parent) + " is: " + str(rtt_delay))
@@ -92,32 +201,16 @@ class OptimalScheduling(Strategy):
                         self.A[service_indx][node][ap_int] = 0.0
                     service_indx += 1
                 parent = view.topology().graph['parent'][parent]
+        ### The LP is compiled once, later intervals only update the demand
+        self.problem = ForwardingProblem(self.A, self.C)
                     
         # initially assign equal rates for each service at each AP
         rate = view.getRequestRate()
-        for service in range(0, view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.avg_D[service].value[ap] = rate/(len(self.receivers)*view.num_services())
-                self.std_D[service].value[ap] = self.avg_D[service].value[ap]
-
-        for service in range(0, view.num_services()):
-            self.perServiceReceiverRequestCounts[service] = {}
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.perServiceReceiverRequestCounts[service][ap] = self.replacement_interval * (rate/(len(self.receivers)*view.num_services()))
+        self.avg_D.fill(rate/(len(self.receivers)*view.num_services()))
+        self.std_D[:] = self.avg_D
 
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            self.perAccessPerNodePerServiceProbability[ap] = {}
-            for node in self.compSpots.keys():
-                cs = self.compSpots[node]
-                if cs.is_cloud:
-                    continue
-                node = int(node)
-                self.perAccessPerNodePerServiceProbability[ap][node] = {}
-                for service in range(0, view.num_services()):
-                    self.perAccessPerNodePerServiceProbability[ap][node][service] = 0.0
+        ### Count of requests per service (row) and receiver (column)
+        self.perServiceReceiverRequestCounts = self.replacement_interval*self.avg_D
 
         #self.parser = optparse.OptionParser()
         #self.parser.add_option('--riskAversionParameter',action="store",type="float",default=0.0)
@@ -144,86 +237,57 @@ class OptimalScheduling(Strategy):
         self.compute_optimal_schedule()
 
     def max_request_forwarded(self):
-        objective  = cp.Maximize(cp.sum_entries(cp.sum_entries(np.sum(map(lambda i:cp.mul_elemwise(self.A[i].T,self.x_bar[i]),range(self.S))), axis=0),axis=1))
-
-        capacityConstrain  = cp.sum_entries(np.sum(map(lambda i:cp.mul_elemwise(self.A[i],self.x_bar[i].T),range(self.S))), axis=1)<=self.C #row_sums, if axis=0 it would be a column sum
-        constraints  = [capacityConstrain]
-        for i in range(self.S):
-            r1          = cp.sum_entries(self.x_bar[i],axis=1)<= self.avg_D[i]
-            constraints.append(r1)
-            r2          = self.x_bar[i]>=0.0
-            constraints.append(r2)
-        lp1 = cp.Problem(objective,constraints)
-        result = lp1.solve()
+        """Solve the request forwarding LP for the current demand and return
+        the solver time
+        """
+        self.x_bar, solve_time = self.problem.solve(self.avg_D)
+        return solve_time
 
     def groupSpecificExecution(self):
-        for g in xrange(self.G):
-            for s in xrange(self.S):
-                objective = cp.Maximize(cp.sum_entries(self.x[g,s]))
-                r1 = cp.sum_entries(self.x[g,s]) <= self.avg_D[s][g]-self.riskAversionParameter*self.std_D[s][g]
-                r2 = self.x[g,s] <= self.x_bar[s].value[g].T
-                r3 = self.x[g,s] >= 0.0
-                constraints = [r1,r2,r3]
-                lp1 = cp.Problem(objective,constraints)
-                result = lp1.solve()
+        """Split the forwarded rates among the requests of each group.
+
+        Each (group, service) LP maximises the rate executed subject to
+        ``x <= x_bar`` and to the risk-adjusted demand, so it is solved in
+        closed form by scaling ``x_bar`` down where it exceeds the demand.
+        """
+        cap = np.maximum(self.avg_D - self.riskAversionParameter*self.std_D, 0.0)
+        total = self.x_bar.sum(axis=2)
+        scale = np.ones_like(total)
+        over = total > cap
+        scale[over] = cap[over]/total[over]
+        self.x = self.x_bar*scale[:, :, np.newaxis]
         
     def noiseFilter(self):
-        for group in xrange(self.G):
-            for service in xrange(self.S):
-                for node in xrange(self.H):
-                    if self.x[group,service].value[node]<0.1e-9:
-                        self.x[group,service].value[node]=0.0
+        self.x[self.x<0.1e-9] = 0.0
+
     def finalizeResults(self):
         for group in xrange(self.G):
             print ('Group '+str(group))
             for service in xrange(self.S):
                 print ('\tService: '+str(service))
                 for node in xrange(self.H):
-                    print ('\t\t\tnode: '+str(node)+', rate: '+str(self.x[group,service].value[node]))
+                    print ('\t\t\tnode: '+str(node)+', rate: '+str(self.x[service,group,node]))
     
-    def compute_optimal_schedule(self):
+    def compute_optimal_schedule(self, time=0.0):
         """
         Compute an optimal scheduling based on the service demand
         """
         if self.debug:
             print ("Computing optimal schedule: ")
-        # initialise the probability array here (not in initialise because it is to be used during the next replacement interval)
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            for node in self.compSpots.keys():
-                cs = self.compSpots[node]
-                if cs.is_cloud:
-                    continue
-                node = int(node)
-                for service in range(0, self.view.num_services()):
-                    self.perAccessPerNodePerServiceProbability[ap][node][service] = 0.0
-        for service in range(0, self.view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.avg_D[service].value[ap] = (1.0*self.perServiceReceiverRequestCounts[service][ap])/self.replacement_interval
-                self.std_D[service].value[ap] = self.avg_D[service].value[ap]
-        self.max_request_forwarded()
+        self.avg_D = (1.0*self.perServiceReceiverRequestCounts)/self.replacement_interval
+        self.std_D = self.avg_D.copy()
+        solve_time = self.max_request_forwarded()
+        self.controller.optimisation_solved(solve_time, time)
         self.groupSpecificExecution()
         self.noiseFilter()#the optimisers essentially they are using interior point methods so they migh assign negligible values to variables
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            for node in self.compSpots.keys():
-                cs = self.compSpots[node]
-                if cs.is_cloud:
-                    continue
-                node = int(node)
-                for service in range(0, self.view.num_services()):
-                    if self.debug:
-                        print("Count for ap: " + str(ap) + " service: " + str(service) + " is: " + str( self.perServiceReceiverRequestCounts[service][ap])) 
-                    if self.perServiceReceiverRequestCounts[service][ap] > 0:
-                        rate = self.perServiceReceiverRequestCounts[service][ap]/self.replacement_interval 
-                        if self.debug:
-                            print ("Type: " + str(type(self.x[ap, service].value[node])))
-                            print ("x[ap, service].value[node] = " + str(self.x[ap, service].value[node].item(0,0)))
-                        self.perAccessPerNodePerServiceProbability[ap][node][service] = (self.x[ap, service].value[node].item(0,0))/ rate
-                        if self.perAccessPerNodePerServiceProbability[ap][node][service] > 1.01:
-                            raise ValueError("Invalid probability: " + str(self.perAccessPerNodePerServiceProbability[ap][node][service]))
-                            
+        # initialise the probability array here (not in initialise because it is to be used during the next replacement interval)
+        rate = self.avg_D[:, :, np.newaxis]
+        probability = np.zeros_like(self.x)
+        np.divide(self.x, rate, out=probability, where=rate > 0)
+        if np.any(probability > 1.01):
+            raise ValueError("Invalid probability: " + str(probability.max()))
+        self.perAccessPerNodePerServiceProbability = probability.transpose(1, 2, 0)
+        self.routing_tables = routing_tables(probability, self.access_nodes)
 
         if self.debug:
             for service in range(0, self.view.num_services()):
@@ -240,32 +304,16 @@ class OptimalScheduling(Strategy):
     def initialise_metrics(self):
         """Initialise counts and metrics between periods of optimized solution computations
         """
-        for service in range(0, self.view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.perServiceReceiverRequestCounts[service][ap] = 0
+        self.perServiceReceiverRequestCounts.fill(0)
 
     def pickExecutionNode(self, receiver, service, cloud):
         """
         Pick the execution node for a given request according to the optimizer output.
         """
-        r = random.random()
-        cum = 0.0
-        parent = self.view.topology().graph['edge_routers'][receiver]
         receiver = int(receiver[4:])
-        while parent is not None:
-            cs = self.compSpots[parent]
-            if cs.is_cloud:
-                continue
-            node = int(parent)
-            cum += self.perAccessPerNodePerServiceProbability[receiver][node][service]
-            if r <= cum:
-                return parent
-            if cum >= 1.0:
-                raise ValueError("Cumulative probability exceeded 1.0 in Optimal Strategy.")
-            parent = self.view.topology().graph['parent'][parent]
-        
-        return cloud
+        nodes = self.access_nodes[receiver]
+        indx = bisect.bisect_left(self.routing_tables[receiver][service], random.random())
+        return nodes[indx] if indx < len(nodes) else cloud
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log, node, flow_id, deadline, rtt_delay, status):
@@ -283,7 +331,7 @@ class OptimalScheduling(Strategy):
         
         if time - self.last_replacement > self.replacement_interval:
             self.controller.replacement_interval_over(flow_id, self.replacement_interval, time)
-            self.compute_optimal_schedule()
+            self.compute_optimal_schedule(time)
             self.last_replacement = time
             self.initialise_metrics()
 
@@ -4,10 +4,9 @@ from __future__ import division
 from __future__ import print_function
 
 import networkx as nx
+import bisect
 import random
 import sys
-# for the optimizer
-import cvxpy as cp
 import numpy as np
 import optparse
 import math # for ceil()
@@ -15,6 +14,7 @@ import math # for ceil()
 from icarus.registry import register_strategy
 from icarus.util import inheritdoc, path_links
 from .base import Strategy
+from .optimal import ForwardingProblem, routing_tables
 from icarus.models.service import Task
 
 __all__ = [
@@ -42,9 +42,6 @@ class OptimalPlacementAndScheduling(Strategy):
         super(OptimalPlacementAndScheduling, self).__init__(view,controller)
         self.last_replacement = 0
         self.replacement_interval = replacement_interval
-        ### Count of requests for each service
-        self.perServiceReceiverRequestCounts = {} 
-        self.perAccessPerNodePerServiceProbability = {}
         self.receivers = view.topology().receivers()
         self.compSpots = self.view.service_nodes()
         self.num_nodes = len(self.compSpots.keys())
@@ -56,40 +53,33 @@ class OptimalPlacementAndScheduling(Strategy):
         self.S      = self.view.num_services()
         self.G      = len(self.receivers) #number of groups ehhhh....what?!
         self.H      = len(self.compSpots) - 1 #number of nodes
-        self.C      = cp.Parameter(self.H, value=np.zeros(self.H)) 
-        self.x_bar  = {} # #variable: maximum number of group-node requests forwarded per services with size (Sx)GxH
-        self.A      = {} #nodes accessible for each group per service, i.e., nodes that can serve a request from a group with size (Sx)HxG 
-        self.x      = {} #number of requests for each group per service and node with size (GxS)xH
-        self.std_D  = {} #standing deviation of arriving requests rate per service
-        self.avg_D  = {} #average arriving requests rate per service with size (Sx)G 
-
-        ### initialise optimizer input 
-        for i in range(self.S):
-            self.x_bar[i]  = cp.Variable(self.G,self.H)
-            self.avg_D[i]  = cp.Parameter(self.G,value=np.zeros(self.G))
-            self.std_D[i]  = cp.Parameter(self.G,value=np.zeros(self.G))
-            self.A[i]      = cp.Parameter((self.H,self.G))
-            self.A[i]     = np.zeros((self.H,self.G))
-            for g in range(self.G):
-                self.x[g,i]  = cp.Variable(self.H)
+        self.C      = np.zeros(self.H) #number of cores per node
+        self.x_bar  = np.zeros((self.S,self.G,self.H)) #maximum number of group-node requests forwarded per service
+        self.A      = np.zeros((self.S,self.H,self.G)) #nodes accessible for each group per service, i.e., nodes that can serve a request from a group
+        self.std_D  = np.zeros((self.S,self.G)) #standing deviation of arriving requests rate per service
+        self.avg_D  = np.zeros((self.S,self.G)) #average arriving requests rate per service
+        ### outputs of the optimizer
+        self.perAccessPerNodePerServiceProbability = np.zeros((self.G,self.H,self.S))
+        self.access_nodes   = {} #computation spots on the path from each AP to the cloud
+        self.routing_tables = {} #cumulative probabilities along the access nodes per AP and service
 
         for node in self.compSpots.keys():
             cs = self.compSpots[node]
             if cs.is_cloud:
                 continue
             node = int(node)
-            self.C.value[node]  = cs.numOfCores
-            #print ("Node: " + str(node) + " has " + str(self.C.value[node]) + " cores.")
-        #print ("Lenght of compSpots: " + str(len(self.compSpots)))
+            self.C[node]  = cs.numOfCores
 
         for ap in self.receivers:
             ap_int = int(ap[4:])
+            self.access_nodes[ap_int] = []
             parent = view.topology().graph['edge_routers'][ap_int]
             while parent is not None:
                 cs = self.compSpots[parent]
                 if cs.is_cloud:
                     continue
                 node = int(parent)
+                self.access_nodes[ap_int].append(parent)
                 rtt_delay = 2*view.path_delay(ap, parent)
                 if self.debug:
                     print ("RTT delay from " + str(ap) + " to " + str(parent) + " is: " + str(rtt_delay))
@@ -97,38 +87,20 @@ class OptimalPlacementAndScheduling(Strategy):
                 for s in view.services():
                     if s.deadline > rtt_delay + s.service_time:
                         self.A[service_indx][node][ap_int] = 1.0
-                        #if node == 0:
-                        #    print ("\t\tService executed for 0")
                     else: # XXX I added this
                         self.A[service_indx][node][ap_int] = 0.0
                     service_indx += 1
                 parent = view.topology().graph['parent'][parent]
+        ### The LP is compiled once, later intervals only update the demand
+        self.problem = ForwardingProblem(self.A, self.C)
                     
         # initially assign equal rates for each service at each AP
         rate = view.getRequestRate()
-        for service in range(0, view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.avg_D[service].value[ap] = rate/(len(self.receivers)*view.num_services())
-                self.std_D[service].value[ap] = self.avg_D[service].value[ap]
-
-        for service in range(0, view.num_services()):
-            self.perServiceReceiverRequestCounts[service] = {}
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.perServiceReceiverRequestCounts[service][ap] = self.replacement_interval * (rate/(len(self.receivers)*view.num_services()))
+        self.avg_D.fill(rate/(len(self.receivers)*view.num_services()))
+        self.std_D[:] = self.avg_D
 
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            self.perAccessPerNodePerServiceProbability[ap] = {}
-            for node in self.compSpots.keys():
-                cs = self.compSpots[node]
-                if cs.is_cloud:
-                    continue
-                node = int(node)
-                self.perAccessPerNodePerServiceProbability[ap][node] = {}
-                for service in range(0, view.num_services()):
-                    self.perAccessPerNodePerServiceProbability[ap][node][service] = 0.0
+        ### Count of requests per service (row) and receiver (column)
+        self.perServiceReceiverRequestCounts = self.replacement_interval*self.avg_D
 
         #self.parser = optparse.OptionParser()
         #self.parser.add_option('--riskAversionParameter',action="store",type="float",default=0.0)
@@ -155,39 +127,14 @@ class OptimalPlacementAndScheduling(Strategy):
         self.compute_optimal_placement_schedule()
 
     def max_request_forwarded(self):
-        objective  = cp.Maximize(cp.sum_entries(cp.sum_entries(np.sum(map(lambda i:cp.mul_elemwise(self.A[i].T,self.x_bar[i]),range(self.S))), axis=0),axis=1))
-        capacityConstrain  = cp.sum_entries(np.sum(map(lambda i:cp.mul_elemwise(self.A[i],self.x_bar[i].T),range(self.S))), axis=1)<=self.C #row_sums, if axis=0 it would be a column sum
-        constraints  = [capacityConstrain]
-        for i in range(self.S):
-            r1          = cp.sum_entries(self.x_bar[i],axis=1)<= self.avg_D[i]
-            constraints.append(r1)
-            r2          = self.x_bar[i]>=0.0
-            constraints.append(r2)
-        lp1 = cp.Problem(objective,constraints)
-        result = lp1.solve()
+        """Solve the request forwarding LP for the current demand and return
+        the solver time
+        """
+        self.x_bar, solve_time = self.problem.solve(self.avg_D)
+        return solve_time
 
-    def groupSpecificExecution(self):
-        for g in xrange(self.G):
-            for s in xrange(self.S):
-                objective = cp.Maximize(cp.sum_entries(self.x[g,s]))
-                r1 = cp.sum_entries(self.x[g,s]) <= self.avg_D[s][g]-self.riskAversionParameter*self.std_D[s][g]
-                r2 = self.x[g,s] <= self.x_bar[s].value[g].T
-                r3 = self.x[g,s] >= 0.0
-                constraints = [r1,r2,r3]
-                lp1 = cp.Problem(objective,constraints)
-                result = lp1.solve()
-        
     def noiseFilter(self):
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            for service in range(0, self.view.num_services()):
-                for node in self.compSpots.keys():
-                    cs = self.compSpots[node]
-                    if cs.is_cloud:
-                        continue
-                    self.x_bar[service].value[ap, node] = self.x_bar[service].value[ap, node]*self.A[service][node][ap]
-                    if self.x_bar[service].value[ap, node]<0.1e-9:
-                        self.x_bar[service].value[ap, node] = 0.0
+        self.x_bar[self.x_bar<0.1e-9] = 0.0
 
     def finalizeResults(self):
         for group in xrange(self.G):
@@ -195,63 +142,36 @@ class OptimalPlacementAndScheduling(Strategy):
             for service in xrange(self.S):
                 print ('\tService: '+str(service))
                 for node in xrange(self.H):
-                    print ('\t\t\tnode: '+str(node)+', rate: '+str(self.x[group,service].value[node]))
+                    print ('\t\t\tnode: '+str(node)+', rate: '+str(self.x_bar[service,group,node]))
     
-    def compute_optimal_placement_schedule(self):
+    def compute_optimal_placement_schedule(self, time=0.0):
         """
         Compute an optimal scheduling based on the service demand
         """
         if self.debug:
             print ("Computing optimal schedule: ")
-        # initialise the probability array here (not in initialise because it is to be used during the next replacement interval)
-        for ap in self.receivers:
-            ap = int(ap[4:])
-            for node in self.compSpots.keys():
-                cs = self.compSpots[node]
-                if cs.is_cloud:
-                    continue
-                node = int(node)
-                for service in range(0, self.view.num_services()):
-                    self.perAccessPerNodePerServiceProbability[ap][node][service] = 0.0
-        for service in range(0, self.view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.avg_D[service].value[ap] = (1.0*self.perServiceReceiverRequestCounts[service][ap])/self.replacement_interval
-                self.std_D[service].value[ap] = self.avg_D[service].value[ap]
-        self.max_request_forwarded()
-        #self.groupSpecificExecution()
+        self.avg_D = (1.0*self.perServiceReceiverRequestCounts)/self.replacement_interval
+        self.std_D = self.avg_D.copy()
+        solve_time = self.max_request_forwarded()
+        self.controller.optimisation_solved(solve_time, time)
         self.noiseFilter()#the optimisers essentially they are using interior point methods so they migh assign negligible values to variables
         
-        # Do the placement now
-        for node in self.compSpots.keys():
-            cs = self.compSpots[node]
-            if cs.is_cloud:
-                continue
-            for service in range(0, self.view.num_services()):
-                cs.numberOfVMInstances[service] = 0
-
-        for service in range(0, self.view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                for node in self.compSpots.keys():
-                    cs = self.compSpots[node]
-                    if cs.is_cloud:
-                        continue
-                    node = int(node)
-                    #print (str((cp.sum_entries(np.sum(map(lambda ap:cp.mul_elemwise(self.A[ap],self.x_bar[ap].T),range(self.S))), axis=1)).value))
-                    #if node == 3:
-                    #    print("Service: " + str(service) + " ap: " + str(ap) + " node: " + str(node) + " x_bar = " + str(self.x_bar[service].value[ap,node]))
-                    cs.serviceProbabilities[service] += self.x_bar[service].value[ap, node]
-                    #cs.numberOfVMInstances[service] += int(math.ceil(self.x_bar[service].value[ap, node]))
-                    self.perAccessPerNodePerServiceProbability[ap][node][service] = self.x_bar[service].value[ap, node] - math.floor(self.x_bar[service].value[ap, node])
-
+        # Do the placement now
+        # initialise the probability array here (not in initialise because it is to be used during the next replacement interval)
+        per_node_rate = self.x_bar.sum(axis=1)
+        fraction = self.x_bar - np.floor(self.x_bar)
         for node in self.compSpots.keys():
             cs = self.compSpots[node]
             if cs.is_cloud:
                 continue
+            node = int(node)
             for service in range(0, self.view.num_services()):
-                node = int(node)
+                cs.serviceProbabilities[service] += per_node_rate[service, node]
                 cs.numberOfVMInstances[service] = int(math.ceil(cs.serviceProbabilities[service]))
+        self.perAccessPerNodePerServiceProbability = fraction.transpose(1, 2, 0)
+        # The fractional rates along a path may add up to more than 1, in
+        # which case requests are never forwarded past the node reaching it
+        self.routing_tables = routing_tables(fraction, self.access_nodes, check=False)
 
         if True:
             for node in self.compSpots.keys():
@@ -267,10 +187,7 @@ class OptimalPlacementAndScheduling(Strategy):
     def initialise_metrics(self):
         """Initialise counts and metrics between periods of optimized solution computations
         """
-        for service in range(0, self.view.num_services()):
-            for ap in self.receivers:
-                ap = int(ap[4:])
-                self.perServiceReceiverRequestCounts[service][ap] = 0
+        self.perServiceReceiverRequestCounts.fill(0)
 
         for node in self.compSpots.keys():
             cs = self.compSpots[node]
@@ -282,23 +199,10 @@ class OptimalPlacementAndScheduling(Strategy):
         """
         Pick the execution node for a given request according to the optimizer output.
         """
-        r = random.random()
-        cum = 0.0
-        parent = self.view.topology().graph['edge_routers'][receiver]
         receiver = int(receiver[4:])
-        while parent is not None:
-            cs = self.compSpots[parent]
-            if cs.is_cloud:
-                continue
-            node = int(parent)
-            cum += self.perAccessPerNodePerServiceProbability[receiver][node][service]
-            if r <= cum:
-                return parent
-            if cum >= 1.0:
-                raise ValueError("Cumulative probability exceeded 1.0 in Optimal Strategy.")
-            parent = self.view.topology().graph['parent'][parent]
-        
-        return cloud
+        nodes = self.access_nodes[receiver]
+        indx = bisect.bisect_left(self.routing_tables[receiver][service], random.random())
+        return nodes[indx] if indx < len(nodes) else cloud
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log, node, flow_id, deadline, rtt_delay, status):
@@ -316,7 +220,7 @@ class OptimalPlacementAndScheduling(Strategy):
         
         if time - self.last_replacement > self.replacement_interval:
             self.controller.replacement_interval_over(flow_id, self.replacement_interval, time)
-            self.compute_optimal_placement_schedule()
+            self.compute_optimal_placement_schedule(time)
             self.last_replacement = time
             self.initialise_metrics()
 
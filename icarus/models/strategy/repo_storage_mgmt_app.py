@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
-import time
 from collections import deque, defaultdict
 import random
 import abc
@@ -9,7 +8,7 @@ import copy
 
 import numpy as np
 
-from icarus.util import inheritdoc, apportionment
+from icarus.util import inheritdoc, apportionment, Message
 from icarus.registry import register_repo_policy
 
 import networkx as nx
@@ -57,12 +56,14 @@ class GenRepoStorApp(Strategy):
     """
 
     def __init__(self, view, controller, replacement_interval=10, debug=False, n_replacements=1,
-                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,**kwargs):
+                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,
+                 depl_period=1, **kwargs):
         super(GenRepoStorApp, self).__init__(view, controller)
 
         self.lastDepl = 0
         
         self.last_period = 0
+        self.depl_period = depl_period
         
         self.last_period = 0
 
@@ -112,7 +113,6 @@ class GenRepoStorApp(Strategy):
 
         elif not self.view.hasStorageCapability(node) and node.hasProcessingCapability and (
         msg['type']).equalsIgnoreCase("nonproc"):
-            curTime = time.time()
             self.view.model.repoStorage[node].deleteAnyMessage(msg['content'])
             storTime = curTime - msg['receiveTime']
             msg['storTime'] = storTime
@@ -140,7 +140,8 @@ class GenRepoStorApp(Strategy):
 
 
     @inheritdoc(Strategy)
-    def process_event(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay):
+    def process_event(self, curTime, receiver, content, log, labels, node, flow_id, deadline, rtt_delay, status,
+                      task=None):
 
         # System.out.prln("processor update is accessed")
 
@@ -166,8 +167,8 @@ class GenRepoStorApp(Strategy):
         else:
             feedback = False
 
-        if time.time() - self.last_period >= 1:
-            self.last_period = time.time()
+        if curTime - self.last_period >= self.depl_period:
+            self.last_period = curTime
             period = True
         else:
             period = False
@@ -175,13 +176,13 @@ class GenRepoStorApp(Strategy):
         if self.view.hasStorageCapability(node):
 
             self.updateCloudBW(node, period)
-            self.deplCloud(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplCloud(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
             self.updateDeplBW(node, period)
-            self.deplStorage(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplStorage(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         elif not self.view.hasStorageCapability(node) and self.view.has_computationalSpot(node):
             self.updateUpBW(node, period)
-            self.deplUp(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplUp(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
     def updateCloudBW(self, node, period):
         self.cloudBW = self.view.model.repoStorage[node].getDepletedCloudProcMessagesBW(period) + \
@@ -198,8 +199,7 @@ class GenRepoStorApp(Strategy):
                       self.view.model.repoStorage[node].getDepletedUnProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedMessagesBW(period)
 
-    def deplCloud(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplCloud(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() +
                 self.view.model.repoStorage[node].getStaleMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
@@ -224,7 +224,7 @@ class GenRepoStorApp(Strategy):
                 """
 
                 if not self.view.model.repoStorage[node].isProcessedEmpty():
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -240,7 +240,7 @@ class GenRepoStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage()() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -259,7 +259,7 @@ class GenRepoStorApp(Strategy):
 
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage()() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -302,7 +302,7 @@ class GenRepoStorApp(Strategy):
 
                 if (self.view.model.repoStorage[node].getOldestStaleMessage() is not None and
                         self.cloudBW < self.cloud_lim):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -324,7 +324,7 @@ class GenRepoStorApp(Strategy):
                     """
 
                 elif (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -345,7 +345,7 @@ class GenRepoStorApp(Strategy):
                 * and a  message for processing is processed
                     """
                 elif (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -378,8 +378,7 @@ class GenRepoStorApp(Strategy):
                       " Total space is " + self.view.model.repoStorage[node].getTotalStorageSpace()) """
                 # System.out.prln("Depleted  messages: " + sdepleted)
 
-    def deplUp(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplUp(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
 
@@ -395,7 +394,7 @@ class GenRepoStorApp(Strategy):
                 """
                 # TODO: NEED TO add COMPRESSED PROCESSED messages to storage AFTER normal servicing
                 if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -413,7 +412,7 @@ class GenRepoStorApp(Strategy):
 
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -430,7 +429,7 @@ class GenRepoStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -468,7 +467,7 @@ class GenRepoStorApp(Strategy):
         for i in range(0, 50) and self.cloudBW > self.cloud_lim and \
                  not self.view.model.repoStorage[node].isProcessingEmpty() and self.upEmptyLoop:
             if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                self.processedDepletion(node)
+                self.processedDepletion(curTime, node)
 
             elif (not self.view.model.repoStorage[node].isProcessingEmpty):
                 self.view.model.repoStorage[node].deleteAnyMessage(
@@ -478,15 +477,14 @@ class GenRepoStorApp(Strategy):
 
     # System.out.prln("Depletion is at: "+ self.cloudBW)
 
-    def deplStorage(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplStorage(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcMessagesSize() +
                 self.view.model.repoStorage[node].getMessagesSize() >
                 self.view.model.repoStorage[node].getTotalStorageSpace() * self.max_stor):
             self.deplEmptyLoop = True
             for i in range(0, 50) and self.deplBW < self.depl_rate and self.deplEmptyLoop:
                 if (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -506,7 +504,7 @@ class GenRepoStorApp(Strategy):
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
 
                 elif (self.view.model.repoStorage[node].getOldestStaleMessage() is not None):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -526,7 +524,7 @@ class GenRepoStorApp(Strategy):
 
 
                 elif (self.view.model.repoStorage[node].getOldestInvalidProcessMessage() is not None):
-                    msg = self.oldestInvalidProcDepletion(node)
+                    msg = self.oldestInvalidProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -640,8 +638,7 @@ class GenRepoStorApp(Strategy):
             # Revise:
             self.lastDepl = curTime
 
-    def processedDepletion(self, node):
-        curTime = time.time()
+    def processedDepletion(self, curTime, node):
         if (self.view.model.repoStorage[node].getOldestFreshMessage() is not None):
             if (self.view.model.repoStorage[node].getOldestFreshMessage().getProperty("procTime") is None):
                 temp = self.view.model.repoStorage[node].getOldestFreshMessage()
@@ -679,8 +676,7 @@ class GenRepoStorApp(Strategy):
                     self.view.model.repoStorage[node].addToStoredMessages(temp)
                     self.view.model.repoStorage[node].deleteProcessedMessage(temp['content'], report)
 
-    def oldestSatisfiedDepletion(self, node):
-        curTime = time.time()
+    def oldestSatisfiedDepletion(self, curTime, node):
         ctemp = self.view.model.repoStorage[node].getOldestStaleMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(ctemp['content'])
         storTime = curTime - ctemp['receiveTime']
@@ -705,8 +701,7 @@ class GenRepoStorApp(Strategy):
 
         self.lastCloudUpload = curTime
 
-    def oldestInvalidProcDepletion(self, node):
-        curTime = time.time()
+    def oldestInvalidProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestInvalidProcessMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         if (temp['comp'] is not None):
@@ -736,8 +731,7 @@ class GenRepoStorApp(Strategy):
                 self.view.model.repoStorage[node].addToDeplProcMessages(temp)
         return temp
 
-    def oldestUnProcDepletion(self, node):
-        curTime = time.time()
+    def oldestUnProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestDeplUnProcMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         self.view.model.repoStorage[node].addToDepletedUnProcMessages(temp)
@@ -854,7 +848,8 @@ class HServRepoStorApp(Strategy):
     """
 
     def __init__(self, view, controller, replacement_interval=10, debug=False, n_replacements=1,
-                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,**kwargs):
+                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,
+                 depl_period=1, **kwargs):
         super(HServRepoStorApp, self).__init__(view, controller)
 
         self.view.model.strategy = 'HYBRIDS_REPO_APP'
@@ -872,6 +867,7 @@ class HServRepoStorApp(Strategy):
         self.replacements_so_far = 0
         self.serviceNodeUtil = [None]*len(self.receivers)
         self.last_period = 0
+        self.depl_period = depl_period
         for node in self.compSpots.keys():
             cs = self.compSpots[node]
             if cs.is_cloud:
@@ -1080,7 +1076,7 @@ class HServRepoStorApp(Strategy):
     # @profile
     def handle(self, curTime, receiver, msg, node, log, feedback, flow_id, rtt_delay, deadline):
         # TODO: NEED TO MAKE A COLLECTOR FUNCTION TO UPDATE A HOP COUNTER FOR DATA REPLICATION!!!!!!!!!!!!!!!!!!!!!!!!!!
-        msg['receiveTime'] = time.time()
+        msg['receiveTime'] = curTime
         if self.view.hasStorageCapability(node) and 'satisfied' not in msg or ('Shelf' not in msg or msg['Shelf']):
             self.controller.add_replication_hops(msg)
             if node is self.view.all_labels_main_source(msg["labels"]):
@@ -1163,8 +1159,8 @@ class HServRepoStorApp(Strategy):
         else:
             feedback = False
 
-        if time.time() - self.last_period >= 1:
-            self.last_period = time.time()
+        if curTime - self.last_period >= self.depl_period:
+            self.last_period = curTime
             period = True
         else:
             period = False
@@ -1172,13 +1168,13 @@ class HServRepoStorApp(Strategy):
         if self.view.hasStorageCapability(node):
 
             self.updateCloudBW(node, period)
-            self.deplCloud(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplCloud(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
             self.updateDeplBW(node, period)
-            self.deplStorage(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplStorage(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         elif not self.view.hasStorageCapability(node) and self.view.has_computationalSpot(node):
             self.updateUpBW(node, period)
-            self.deplUp(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplUp(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         """
                 response : True, if this is a response from the cloudlet/cloud
@@ -1194,12 +1190,12 @@ class HServRepoStorApp(Strategy):
         # if node == 12:
         #    self.debug = True
         service = None
-        if type(content) is dict and 'shelf_life' in content and 'max_replications' in content:
+        if isinstance(content, (dict, Message)) and 'shelf_life' in content and 'max_replications' in content:
             if content["shelf_life"] and content['replications'] <= content['max_replications']:
                 source, in_cache = self.view.closest_source(node, content)
                 path = self.view.shortest_path(node, source)
                 self.handle(curTime, receiver, content, node, log, feedback, flow_id, rtt_delay, deadline)
-        elif type(content) is dict and 'shelf_life' in content and content["shelf_life"] :
+        elif isinstance(content, (dict, Message)) and 'shelf_life' in content and content["shelf_life"] :
             source, in_cache = self.view.closest_source(node, content)
             path = self.view.shortest_path(node, source)
             self.handle(curTime, receiver, content, node, log, feedback, flow_id, rtt_delay, deadline)
@@ -1251,10 +1247,10 @@ class HServRepoStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -1266,17 +1262,17 @@ class HServRepoStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -1288,7 +1284,7 @@ class HServRepoStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -1305,7 +1301,7 @@ class HServRepoStorApp(Strategy):
                         print("This should not happen in Hybrid.")
                         raise ValueError("Task should not be rejected at the cloud.")
                     else:
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                             self.controller.add_request_labels_to_node(node, service)
                         # request is to be executed in the cloud and returned to receiver
@@ -1333,10 +1329,10 @@ class HServRepoStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -1348,17 +1344,17 @@ class HServRepoStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -1370,7 +1366,7 @@ class HServRepoStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -1382,7 +1378,7 @@ class HServRepoStorApp(Strategy):
                     if ret == False:
 
 
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                             self.controller.add_request_labels_to_node(node, service)
                         source = self.view.content_source_cloud(service, labels)
@@ -1451,7 +1447,7 @@ class HServRepoStorApp(Strategy):
                     self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                               flow_id, deadline, rtt_delay, RESPONSE)
                     if path_del + curTime > deadline:
-                        if type(content) is dict:
+                        if isinstance(content, (dict, Message)):
                             compSpot.missed_requests[content['content']] += 1
                         else:
                             compSpot.missed_requests[content] += 1
@@ -1475,7 +1471,7 @@ class HServRepoStorApp(Strategy):
                 delay = self.view.link_delay(node, next_node)
                 if self.view.hasStorageCapability(node):
                     source, in_cache = self.view.closest_source(node, service)
-                    if type(service) is not dict and self.controller.has_message(node, labels, content):
+                    if not isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content):
@@ -1492,7 +1488,7 @@ class HServRepoStorApp(Strategy):
                                 self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels,
                                                           next_node, flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -1507,13 +1503,13 @@ class HServRepoStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         service = self.view.storage_nodes()[node].hasMessage(content, labels)
-                    elif type(service) is dict and self.controller.has_message(node, labels, content):
+                    elif isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content['content']):
@@ -1522,10 +1518,10 @@ class HServRepoStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -1537,17 +1533,17 @@ class HServRepoStorApp(Strategy):
                                 self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels,
                                                           next_node,flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -1559,7 +1555,7 @@ class HServRepoStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -1577,7 +1573,7 @@ class HServRepoStorApp(Strategy):
                         service['receiveTime'] = curTime
                         service['service_type'] = "processed"
                     else:
-                        service = dict()
+                        service = Message()
                         service['content'] = content
                         service['labels'] = labels
                         service['msg_size'] = 1000000
@@ -1661,10 +1657,10 @@ class HServRepoStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -1677,17 +1673,17 @@ class HServRepoStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -1699,7 +1695,7 @@ class HServRepoStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -1846,8 +1842,7 @@ class HServRepoStorApp(Strategy):
         self.deplBW = self.view.model.repoStorage[node].getDepletedProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedUnProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedMessagesBW(period)
-    def deplCloud(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplCloud(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() +
                 self.view.model.repoStorage[node].getStaleMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
@@ -1872,7 +1867,7 @@ class HServRepoStorApp(Strategy):
                 """
 
                 if not self.view.model.repoStorage[node].isProcessedEmpty():
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -1889,7 +1884,7 @@ class HServRepoStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage()() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -1907,7 +1902,7 @@ class HServRepoStorApp(Strategy):
 
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage()() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -1951,7 +1946,7 @@ class HServRepoStorApp(Strategy):
 
                 if (self.view.model.repoStorage[node].getOldestStaleMessage() is not None and
                         self.cloudBW < self.cloud_lim):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -1974,7 +1969,7 @@ class HServRepoStorApp(Strategy):
                     """
 
                 elif (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -1996,7 +1991,7 @@ class HServRepoStorApp(Strategy):
                 * and a  message for processing is processed
                     """
                 elif (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2030,8 +2025,7 @@ class HServRepoStorApp(Strategy):
                       " Total space is " + self.view.model.repoStorage[node].getTotalStorageSpace()) """
                 # System.out.prln("Depleted  messages: " + sdepleted)
 
-    def deplUp(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplUp(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
 
@@ -2047,7 +2041,7 @@ class HServRepoStorApp(Strategy):
                 """
                 # TODO: NEED TO add COMPRESSED PROCESSED messages to storage AFTER normal servicing
                 if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2066,7 +2060,7 @@ class HServRepoStorApp(Strategy):
 
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2084,7 +2078,7 @@ class HServRepoStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2123,7 +2117,7 @@ class HServRepoStorApp(Strategy):
         for i in range(0, 50) and self.cloudBW > self.cloud_lim and \
                  not self.view.model.repoStorage[node].isProcessingEmpty() and self.upEmptyLoop:
             if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                self.processedDepletion(node)
+                self.processedDepletion(curTime, node)
 
             elif (not self.view.model.repoStorage[node].isProcessingEmpty):
                 self.view.model.repoStorage[node].deleteAnyMessage(
@@ -2133,15 +2127,14 @@ class HServRepoStorApp(Strategy):
 
     # System.out.prln("Depletion is at: "+ self.cloudBW)
 
-    def deplStorage(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplStorage(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcMessagesSize() +
                 self.view.model.repoStorage[node].getMessagesSize() >
                 self.view.model.repoStorage[node].getTotalStorageSpace() * self.max_stor):
             self.deplEmptyLoop = True
             for i in range(0, 50) and self.deplBW < self.depl_rate and self.deplEmptyLoop:
                 if (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2162,7 +2155,7 @@ class HServRepoStorApp(Strategy):
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
 
                 elif (self.view.model.repoStorage[node].getOldestStaleMessage() is not None):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2183,7 +2176,7 @@ class HServRepoStorApp(Strategy):
 
 
                 elif (self.view.model.repoStorage[node].getOldestInvalidProcessMessage() is not None):
-                    msg = self.oldestInvalidProcDepletion(node)
+                    msg = self.oldestInvalidProcDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -2286,8 +2279,7 @@ class HServRepoStorApp(Strategy):
             # Revise:
             self.lastDepl = curTime
 
-    def processedDepletion(self, node):
-        curTime = time.time()
+    def processedDepletion(self, curTime, node):
         if (self.view.model.repoStorage[node].getOldestFreshMessage() is not None):
             if (self.view.model.repoStorage[node].getOldestFreshMessage().getProperty("procTime") is None):
                 temp = self.view.model.repoStorage[node].getOldestFreshMessage()
@@ -2326,8 +2318,7 @@ class HServRepoStorApp(Strategy):
                     self.view.model.repoStorage[node].addToStoredMessages(temp)
                     self.view.model.repoStorage[node].deleteProcessedMessage(temp['content'], report)
 
-    def oldestSatisfiedDepletion(self, node):
-        curTime = time.time()
+    def oldestSatisfiedDepletion(self, curTime, node):
         ctemp = self.view.model.repoStorage[node].getOldestStaleMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(ctemp['content'])
         storTime = curTime - ctemp['receiveTime']
@@ -2353,8 +2344,7 @@ class HServRepoStorApp(Strategy):
         self.lastCloudUpload = curTime
         return ctemp
 
-    def oldestInvalidProcDepletion(self, node):
-        curTime = time.time()
+    def oldestInvalidProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestInvalidProcessMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         if (temp['comp'] is not None):
@@ -2384,8 +2374,7 @@ class HServRepoStorApp(Strategy):
                 self.view.model.repoStorage[node].addToDeplProcMessages(temp)
         return temp
 
-    def oldestUnProcDepletion(self, node):
-        curTime = time.time()
+    def oldestUnProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestDeplUnProcMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         self.view.model.repoStorage[node].addToDepletedUnProcMessages(temp)
@@ -2502,7 +2491,8 @@ class HServProStorApp(Strategy):
     """
 
     def __init__(self, view, controller, replacement_interval=10, debug=False, n_replacements=1,
-                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,**kwargs):
+                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,
+                 depl_period=1, **kwargs):
         super(HServProStorApp, self).__init__(view, controller)
 
         self.view.model.strategy = 'HYBRIDS_PRO_REPO_APP'
@@ -2542,6 +2532,7 @@ class HServProStorApp(Strategy):
         self.lastDepl = 0
 
         self.last_period = 0
+        self.depl_period = depl_period
 
         self.cloudEmptyLoop = True
 
@@ -2731,7 +2722,7 @@ class HServProStorApp(Strategy):
     # TODO: ADAPT FOR POPULARITY PLACEMENT!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
     #@profile
     def handle(self, curTime, receiver, msg, node, log, feedback, flow_id, rtt_delay, deadline):
-        msg['receiveTime'] = time.time()
+        msg['receiveTime'] = curTime
         if self.view.hasStorageCapability(node) and 'satisfied' not in msg or ('Shelf' not in msg or msg['Shelf']):
             self.controller.add_replication_hops(msg)
             if node in self.view.storage_nodes() and self.view.all_labels_most_requests(msg["labels"]) and self.view.storage_nodes()[node] is self.view.all_labels_most_requests(msg["labels"]):
@@ -2814,8 +2805,8 @@ class HServProStorApp(Strategy):
         else:
             feedback = False
 
-        if time.time() - self.last_period >= 1:
-            self.last_period = time.time()
+        if curTime - self.last_period >= self.depl_period:
+            self.last_period = curTime
             period = True
         else:
             period = False
@@ -2823,13 +2814,13 @@ class HServProStorApp(Strategy):
         if self.view.hasStorageCapability(node):
 
             self.updateCloudBW(node, period)
-            self.deplCloud(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplCloud(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
             self.updateDeplBW(node, period)
-            self.deplStorage(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplStorage(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         elif not self.view.hasStorageCapability(node) and self.view.has_computationalSpot(node):
             self.updateUpBW(node, period)
-            self.deplUp(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplUp(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         """
                 response : True, if this is a response from the cloudlet/cloud
@@ -2845,12 +2836,12 @@ class HServProStorApp(Strategy):
         # if node == 12:
         #    self.debug = True
         service = None
-        if type(content) is dict and 'shelf_life' in content and 'max_replications' in content:
+        if isinstance(content, (dict, Message)) and 'shelf_life' in content and 'max_replications' in content:
             if content["shelf_life"] and content['replications'] <= content['max_replications']:
                 source, in_cache = self.view.closest_source(node, content)
                 path = self.view.shortest_path(node, source)
                 self.handle(curTime, receiver, content, node, log, feedback, flow_id, rtt_delay, deadline)
-        elif type(content) is dict and 'shelf_life' in content and content["shelf_life"] :
+        elif isinstance(content, (dict, Message)) and 'shelf_life' in content and content["shelf_life"] :
             source, in_cache = self.view.closest_source(node, content)
             path = self.view.shortest_path(node, source)
             self.handle(curTime, receiver, content, node, log, feedback, flow_id, rtt_delay, deadline)
@@ -2902,10 +2893,10 @@ class HServProStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -2917,17 +2908,17 @@ class HServProStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -2939,7 +2930,7 @@ class HServProStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -2955,7 +2946,7 @@ class HServProStorApp(Strategy):
                         raise ValueError("Task should not be rejected at the cloud.")
                     else:
                         # request is to be executed in the cloud and returned to receiver
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                             self.controller.add_request_labels_to_node(node, service)
                         services = self.view.services()
@@ -2982,10 +2973,10 @@ class HServProStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -2997,17 +2988,17 @@ class HServProStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -3019,7 +3010,7 @@ class HServProStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -3031,7 +3022,7 @@ class HServProStorApp(Strategy):
 
                     if ret == False:
 
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                                 self.controller.add_request_labels_to_node(node, service)
                         source = self.view.content_source_cloud(service, labels)
@@ -3100,7 +3091,7 @@ class HServProStorApp(Strategy):
                     self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                               flow_id, deadline, rtt_delay, RESPONSE)
                     if path_del + curTime > deadline:
-                        if type(content) is dict:
+                        if isinstance(content, (dict, Message)):
                             compSpot.missed_requests[content['content']] += 1
                         else:
                             compSpot.missed_requests[content] += 1
@@ -3124,7 +3115,7 @@ class HServProStorApp(Strategy):
                 delay = self.view.link_delay(node, next_node)
                 if self.view.hasStorageCapability(node):
                     source, in_cache = self.view.closest_source(node, service)
-                    if type(service) is not dict and self.controller.has_message(node, labels, content):
+                    if not isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content):
@@ -3142,7 +3133,7 @@ class HServProStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -3157,13 +3148,13 @@ class HServProStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         service = self.view.storage_nodes()[node].hasMessage(content, labels)
-                    elif type(service) is dict and self.controller.has_message(node, labels, content):
+                    elif isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content['content']):
@@ -3172,10 +3163,10 @@ class HServProStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -3188,17 +3179,17 @@ class HServProStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -3210,7 +3201,7 @@ class HServProStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -3228,7 +3219,7 @@ class HServProStorApp(Strategy):
                         service['receiveTime'] = curTime
                         service['service_type'] = "processed"
                     else:
-                        service = dict()
+                        service = Message()
                         service['content'] = content
                         service['labels'] = labels
                         service['msg_size'] = 1000000
@@ -3312,10 +3303,10 @@ class HServProStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -3328,17 +3319,17 @@ class HServProStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -3350,7 +3341,7 @@ class HServProStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -3500,8 +3491,7 @@ class HServProStorApp(Strategy):
                       self.view.model.repoStorage[node].getDepletedUnProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedMessagesBW(period)
 
-    def deplCloud(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplCloud(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() +
                 self.view.model.repoStorage[node].getStaleMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
@@ -3526,7 +3516,7 @@ class HServProStorApp(Strategy):
                 """
 
                 if not self.view.model.repoStorage[node].isProcessedEmpty():
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -3544,7 +3534,7 @@ class HServProStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage()() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
 
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
@@ -3563,7 +3553,7 @@ class HServProStorApp(Strategy):
 
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage()() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3606,7 +3596,7 @@ class HServProStorApp(Strategy):
 
                 if (self.view.model.repoStorage[node].getOldestStaleMessage() is not None and
                         self.cloudBW < self.cloud_lim):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3628,7 +3618,7 @@ class HServProStorApp(Strategy):
                     """
 
                 elif (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3649,7 +3639,7 @@ class HServProStorApp(Strategy):
                 * and a  message for processing is processed
                     """
                 elif (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3682,8 +3672,7 @@ class HServProStorApp(Strategy):
                       " Total space is " + self.view.model.repoStorage[node].getTotalStorageSpace()) """
                 # System.out.prln("Depleted  messages: " + sdepleted)
 
-    def deplUp(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplUp(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
 
@@ -3699,7 +3688,7 @@ class HServProStorApp(Strategy):
                 """
                 # TODO: NEED TO add COMPRESSED PROCESSED messages to storage AFTER normal servicing
                 if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3717,7 +3706,7 @@ class HServProStorApp(Strategy):
 
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3734,7 +3723,7 @@ class HServProStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -3772,7 +3761,7 @@ class HServProStorApp(Strategy):
         for i in range(0, 50) and self.cloudBW > self.cloud_lim and \
                  not self.view.model.repoStorage[node].isProcessingEmpty() and self.upEmptyLoop:
             if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                self.processedDepletion(node)
+                self.processedDepletion(curTime, node)
 
             elif (not self.view.model.repoStorage[node].isProcessingEmpty):
                 self.view.model.repoStorage[node].deleteAnyMessage(self.view.model.repoStorage[node].getOldestProcessMessage['content'])
@@ -3781,15 +3770,14 @@ class HServProStorApp(Strategy):
 
     # System.out.prln("Depletion is at: "+ self.cloudBW)
 
-    def deplStorage(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplStorage(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcMessagesSize() +
                 self.view.model.repoStorage[node].getMessagesSize() >
                 self.view.model.repoStorage[node].getTotalStorageSpace() * self.max_stor):
             self.deplEmptyLoop = True
             for i in range(0, 50) and self.deplBW < self.depl_rate and self.deplEmptyLoop:
                 if (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -3809,7 +3797,7 @@ class HServProStorApp(Strategy):
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
 
                 elif (self.view.model.repoStorage[node].getOldestStaleMessage() is not None):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -3829,7 +3817,7 @@ class HServProStorApp(Strategy):
 
 
                 elif (self.view.model.repoStorage[node].getOldestInvalidProcessMessage() is not None):
-                    msg = self.oldestInvalidProcDepletion(node)
+                    msg = self.oldestInvalidProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -3935,8 +3923,7 @@ class HServProStorApp(Strategy):
             # Revise:
             self.lastDepl = curTime
 
-    def processedDepletion(self, node):
-        curTime = time.time()
+    def processedDepletion(self, curTime, node):
         if (self.view.model.repoStorage[node].getOldestFreshMessage() is not None):
             if (self.view.model.repoStorage[node].getOldestFreshMessage().getProperty("procTime") is None):
                 temp = self.view.model.repoStorage[node].getOldestFreshMessage()
@@ -3975,8 +3962,7 @@ class HServProStorApp(Strategy):
                     self.view.model.repoStorage[node].addToStoredMessages(temp)
                     self.view.model.repoStorage[node].deleteProcessedMessage(temp['content'], report)
 
-    def oldestSatisfiedDepletion(self, node):
-        curTime = time.time()
+    def oldestSatisfiedDepletion(self, curTime, node):
         ctemp = self.view.model.repoStorage[node].getOldestStaleMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(ctemp['content'])
         storTime = curTime - ctemp['receiveTime']
@@ -4002,8 +3988,7 @@ class HServProStorApp(Strategy):
         self.lastCloudUpload = curTime
         return ctemp
 
-    def oldestInvalidProcDepletion(self, node):
-        curTime = time.time()
+    def oldestInvalidProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestInvalidProcessMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         if (temp['comp'] is not None):
@@ -4034,8 +4019,7 @@ class HServProStorApp(Strategy):
 
             return temp
 
-    def oldestUnProcDepletion(self, node):
-        curTime = time.time()
+    def oldestUnProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestDeplUnProcMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         self.view.model.repoStorage[node].addToDepletedUnProcMessages(temp)
@@ -4152,7 +4136,8 @@ class HServReStorApp(Strategy):
     """
 
     def __init__(self, view, controller, replacement_interval=10, debug=False, n_replacements=1,
-                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,**kwargs):
+                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,
+                 depl_period=1, **kwargs):
         super(HServReStorApp, self).__init__(view, controller)
 
         self.view.model.strategy = 'HYBRIDS_RE_REPO_APP'
@@ -4192,6 +4177,7 @@ class HServReStorApp(Strategy):
         self.lastDepl = 0
 
         self.last_period = 0
+        self.depl_period = depl_period
 
         self.cloudEmptyLoop = True
 
@@ -4386,7 +4372,7 @@ class HServReStorApp(Strategy):
 
         :return:
         """
-        msg['receiveTime'] = time.time()
+        msg['receiveTime'] = curTime
         if self.view.hasStorageCapability(node) and 'satisfied' not in msg or ('Shelf' not in msg or msg['Shelf']):
             self.controller.add_replication_hops(msg)
             # TODO: Check usages of IS OPERATOR throughout code!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -4505,8 +4491,8 @@ class HServReStorApp(Strategy):
         else:
             feedback = False
 
-        if time.time() - self.last_period >= 1:
-            self.last_period = time.time()
+        if curTime - self.last_period >= self.depl_period:
+            self.last_period = curTime
             period = True
         else:
             period = False
@@ -4514,13 +4500,13 @@ class HServReStorApp(Strategy):
         if self.view.hasStorageCapability(node):
 
             self.updateCloudBW(node, period)
-            self.deplCloud(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplCloud(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
             self.updateDeplBW(node, period)
-            self.deplStorage(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplStorage(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         elif not self.view.hasStorageCapability(node) and self.view.has_computationalSpot(node):
             self.updateUpBW(node, period)
-            self.deplUp(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplUp(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         """
                 response : True, if this is a response from the cloudlet/cloud
@@ -4536,12 +4522,12 @@ class HServReStorApp(Strategy):
         # if node == 12:
         #    self.debug = True
         service = None
-        if type(content) is dict and 'shelf_life' in content and 'max_replications' in content:
+        if isinstance(content, (dict, Message)) and 'shelf_life' in content and 'max_replications' in content:
             if content["shelf_life"] and content['replications'] <= content['max_replications']:
                 source, in_cache = self.view.closest_source(node, content)
                 path = self.view.shortest_path(node, source)
                 self.handle(curTime, receiver, content, node, path, log, feedback, flow_id, rtt_delay, deadline)
-        elif type(content) is dict and 'shelf_life' in content and content["shelf_life"] :
+        elif isinstance(content, (dict, Message)) and 'shelf_life' in content and content["shelf_life"] :
             source, in_cache = self.view.closest_source(node, content)
             path = self.view.shortest_path(node, source)
             self.handle(curTime, receiver, content, node, path, log, feedback, flow_id, rtt_delay, deadline)
@@ -4594,10 +4580,10 @@ class HServReStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -4609,17 +4595,17 @@ class HServReStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -4631,7 +4617,7 @@ class HServReStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -4647,7 +4633,7 @@ class HServReStorApp(Strategy):
                         raise ValueError("Task should not be rejected at the cloud.")
                     else:
                         # request is to be executed in the cloud and returned to receiver
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                                 self.controller.add_request_labels_to_node(node, service)
                         services = self.view.services()
@@ -4674,10 +4660,10 @@ class HServReStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -4689,17 +4675,17 @@ class HServReStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -4711,7 +4697,7 @@ class HServReStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -4722,7 +4708,7 @@ class HServReStorApp(Strategy):
 
                     if ret == False:
 
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                                 self.controller.add_request_labels_to_node(node, service)
                         source = self.view.content_source_cloud(service, labels)
@@ -4791,7 +4777,7 @@ class HServReStorApp(Strategy):
                     self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                               flow_id, deadline, rtt_delay, RESPONSE)
                     if path_del + curTime > deadline:
-                        if type(content) is dict:
+                        if isinstance(content, (dict, Message)):
                             compSpot.missed_requests[content['content']] += 1
                         else:
                             compSpot.missed_requests[content] += 1
@@ -4815,7 +4801,7 @@ class HServReStorApp(Strategy):
                 delay = self.view.link_delay(node, next_node)
                 if self.view.hasStorageCapability(node):
                     source, in_cache = self.view.closest_source(node, service)
-                    if type(service) is not dict and self.controller.has_message(node, labels, content):
+                    if not isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content):
@@ -4833,7 +4819,7 @@ class HServReStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -4848,13 +4834,13 @@ class HServReStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         service = self.view.storage_nodes()[node].hasMessage(content, labels)
-                    elif type(service) is dict and self.controller.has_message(node, labels, content):
+                    elif isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content['content']):
@@ -4863,10 +4849,10 @@ class HServReStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -4879,17 +4865,17 @@ class HServReStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -4901,7 +4887,7 @@ class HServReStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -4919,7 +4905,7 @@ class HServReStorApp(Strategy):
                         service['receiveTime'] = curTime
                         service['service_type'] = "processed"
                     else:
-                        service = dict()
+                        service = Message()
                         service['content'] = content
                         service['labels'] = labels
                         service['msg_size'] = 1000000
@@ -5003,10 +4989,10 @@ class HServReStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -5019,17 +5005,17 @@ class HServReStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -5041,7 +5027,7 @@ class HServReStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -5190,8 +5176,7 @@ class HServReStorApp(Strategy):
                       self.view.model.repoStorage[node].getDepletedUnProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedMessagesBW(period)
 
-    def deplCloud(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplCloud(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() +
                 self.view.model.repoStorage[node].getStaleMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
@@ -5216,7 +5201,7 @@ class HServReStorApp(Strategy):
                 """
 
                 if not self.view.model.repoStorage[node].isProcessedEmpty():
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5233,7 +5218,7 @@ class HServReStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage()() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5251,7 +5236,7 @@ class HServReStorApp(Strategy):
 
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage()() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5294,7 +5279,7 @@ class HServReStorApp(Strategy):
 
                 if (self.view.model.repoStorage[node].getOldestStaleMessage() is not None and
                         self.cloudBW < self.cloud_lim):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5316,7 +5301,7 @@ class HServReStorApp(Strategy):
                     """
 
                 elif (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5337,7 +5322,7 @@ class HServReStorApp(Strategy):
                 * and a  message for processing is processed
                     """
                 elif (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5370,8 +5355,7 @@ class HServReStorApp(Strategy):
                       " Total space is " + self.view.model.repoStorage[node].getTotalStorageSpace()) """
                 # System.out.prln("Depleted  messages: " + sdepleted)
 
-    def deplUp(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplUp(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
 
@@ -5387,7 +5371,7 @@ class HServReStorApp(Strategy):
                 """
                 # TODO: NEED TO add COMPRESSED PROCESSED messages to storage AFTER normal servicing
                 if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5405,7 +5389,7 @@ class HServReStorApp(Strategy):
 
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5422,7 +5406,7 @@ class HServReStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -5460,7 +5444,7 @@ class HServReStorApp(Strategy):
         for i in range(0, 50) and self.cloudBW > self.cloud_lim and \
                  not self.view.model.repoStorage[node].isProcessingEmpty() and self.upEmptyLoop:
             if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                self.processedDepletion(node)
+                self.processedDepletion(curTime, node)
 
             elif (not self.view.model.repoStorage[node].isProcessingEmpty):
                 self.view.model.repoStorage[node].deleteAnyMessage(
@@ -5470,15 +5454,14 @@ class HServReStorApp(Strategy):
 
     # System.out.prln("Depletion is at: "+ self.cloudBW)
 
-    def deplStorage(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplStorage(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcMessagesSize() +
                 self.view.model.repoStorage[node].getMessagesSize() >
                 self.view.model.repoStorage[node].getTotalStorageSpace() * self.max_stor):
             self.deplEmptyLoop = True
             for i in range(0, 50) and self.deplBW < self.depl_rate and self.deplEmptyLoop:
                 if (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    content = self.oldestUnProcDepletion(node)
+                    content = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(content, content['labels'])
                     if not source:
                          for n in self.view.model.comp_size:
@@ -5493,7 +5476,7 @@ class HServReStorApp(Strategy):
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
 
                 elif (self.view.model.repoStorage[node].getOldestStaleMessage() is not None):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -5513,7 +5496,7 @@ class HServReStorApp(Strategy):
 
 
                 elif (self.view.model.repoStorage[node].getOldestInvalidProcessMessage() is not None):
-                    msg = self.oldestInvalidProcDepletion(node)
+                    msg = self.oldestInvalidProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -5619,8 +5602,7 @@ class HServReStorApp(Strategy):
             # Revise:
             self.lastDepl = curTime
 
-    def processedDepletion(self, node):
-        curTime = time.time()
+    def processedDepletion(self, curTime, node):
         if (self.view.model.repoStorage[node].getOldestFreshMessage() is not None):
             if (self.view.model.repoStorage[node].getOldestFreshMessage().getProperty("procTime") is None):
                 temp = self.view.model.repoStorage[node].getOldestFreshMessage()
@@ -5659,8 +5641,7 @@ class HServReStorApp(Strategy):
                     self.view.model.repoStorage[node].addToStoredMessages(temp)
                     self.view.model.repoStorage[node].deleteProcessedMessage(temp['content'], report)
 
-    def oldestSatisfiedDepletion(self, node):
-        curTime = time.time()
+    def oldestSatisfiedDepletion(self, curTime, node):
         ctemp = self.view.model.repoStorage[node].getOldestStaleMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(ctemp['content'])
         storTime = curTime - ctemp['receiveTime']
@@ -5686,8 +5667,7 @@ class HServReStorApp(Strategy):
         self.lastCloudUpload = curTime
         return ctemp
 
-    def oldestInvalidProcDepletion(self, node):
-        curTime = time.time()
+    def oldestInvalidProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestInvalidProcessMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         if (temp['comp'] is not None):
@@ -5717,8 +5697,7 @@ class HServReStorApp(Strategy):
                 self.view.model.repoStorage[node].addToDeplProcMessages(temp)
         return temp
 
-    def oldestUnProcDepletion(self, node):
-        curTime = time.time()
+    def oldestUnProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestDeplUnProcMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         self.view.model.repoStorage[node].addToDepletedUnProcMessages(temp)
@@ -5833,7 +5812,8 @@ class HServSpecStorApp(Strategy):
     """
 
     def __init__(self, view, controller, replacement_interval=10, debug=False, n_replacements=1,
-                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,**kwargs):
+                 depl_rate=10000000, cloud_lim=20000000, max_stor=9900000000, min_stor=10000000,
+                 depl_period=1, **kwargs):
         super(HServSpecStorApp, self).__init__(view, controller)
 
         self.view.model.strategy = 'HYBRIDS_SPEC_REPO_APP'
@@ -5873,6 +5853,7 @@ class HServSpecStorApp(Strategy):
         self.lastDepl = 0
 
         self.last_period = 0
+        self.depl_period = depl_period
 
         self.cloudEmptyLoop = True
 
@@ -6080,7 +6061,7 @@ class HServSpecStorApp(Strategy):
 
         :return:
         """
-        msg['receiveTime'] = time.time()
+        msg['receiveTime'] = curTime
         if self.view.hasStorageCapability(node) and 'satisfied' not in msg or ('Shelf' not in msg or msg['Shelf']):
             self.controller.add_replication_hops(msg)
             # TODO: Check usages of IS OPERATOR throughout code!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -6200,8 +6181,8 @@ class HServSpecStorApp(Strategy):
         else:
             feedback = False
 
-        if time.time() - self.last_period >= 1:
-            self.last_period = time.time()
+        if curTime - self.last_period >= self.depl_period:
+            self.last_period = curTime
             period = True
         else:
             period = False
@@ -6209,13 +6190,13 @@ class HServSpecStorApp(Strategy):
         if self.view.hasStorageCapability(node):
 
             self.updateCloudBW(node, period)
-            self.deplCloud(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplCloud(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
             self.updateDeplBW(node, period)
-            self.deplStorage(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplStorage(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         elif not self.view.hasStorageCapability(node) and self.view.has_computationalSpot(node):
             self.updateUpBW(node, period)
-            self.deplUp(node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
+            self.deplUp(curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay, period)
 
         """
                 response : True, if this is a response from the cloudlet/cloud
@@ -6231,12 +6212,12 @@ class HServSpecStorApp(Strategy):
         # if node == 12:
         #    self.debug = True
         service = None
-        if type(content) is dict and 'shelf_life' in content and 'max_replications' in content:
+        if isinstance(content, (dict, Message)) and 'shelf_life' in content and 'max_replications' in content:
             if content["shelf_life"] and content['replications'] <= content['max_replications']:
                 source, in_cache = self.view.closest_source(node, content)
                 path = self.view.shortest_path(node, source)
                 self.handle(curTime, receiver, content, node, path, log, feedback, flow_id, rtt_delay, deadline)
-        elif type(content) is dict and 'shelf_life' in content and content["shelf_life"] :
+        elif isinstance(content, (dict, Message)) and 'shelf_life' in content and content["shelf_life"] :
             source, in_cache = self.view.closest_source(node, content)
             path = self.view.shortest_path(node, source)
             self.handle(curTime, receiver, content, node, path, log, feedback, flow_id, rtt_delay, deadline)
@@ -6288,10 +6269,10 @@ class HServSpecStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -6303,17 +6284,17 @@ class HServSpecStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -6325,7 +6306,7 @@ class HServSpecStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -6341,7 +6322,7 @@ class HServSpecStorApp(Strategy):
                         raise ValueError("Task should not be rejected at the cloud.")
                     else:
                         # request is to be executed in the cloud and returned to receiver
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                             self.controller.add_request_labels_to_node(node, service)
                         services = self.view.services()
@@ -6368,10 +6349,10 @@ class HServSpecStorApp(Strategy):
                         self.controller.put_content_local_cache(source)
                         cache_delay = 0.005
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -6383,17 +6364,17 @@ class HServSpecStorApp(Strategy):
                         self.controller.add_event(curTime + cache_delay + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
                         return
                 elif in_cache:
                     pc = self.controller.has_message(node, labels, content['content'])
-                    if type(pc) != dict:
+                    if not isinstance(pc, (dict, Message)):
                         source, in_cache = self.view.closest_source(node, service)
                         pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                        if type(pc) != dict:
+                        if not isinstance(pc, (dict, Message)):
                             for n in self.content_source(content, content['labels']):
                                 if n == source:
                                     pc = self.model.contents[n][content['content']]
@@ -6405,7 +6386,7 @@ class HServSpecStorApp(Strategy):
                         self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                   flow_id, deadline, rtt_delay, RESPONSE)
                         if path_del + curTime > deadline:
-                            if type(content) is dict:
+                            if isinstance(content, (dict, Message)):
                                 compSpot.missed_requests[content['content']] += 1
                             else:
                                 compSpot.missed_requests[content] += 1
@@ -6416,7 +6397,7 @@ class HServSpecStorApp(Strategy):
 
                     if ret == False:
 
-                        if type(service) is dict and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
+                        if isinstance(service, (dict, Message)) and self.view.hasStorageCapability(node) and not self.view.storage_nodes()[node].hasMessage(
                                     service['content'], service['labels']):
                             self.controller.add_request_labels_to_node(node, service)
                         source = self.view.content_source_cloud(service, labels)
@@ -6485,7 +6466,7 @@ class HServSpecStorApp(Strategy):
                     self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                               flow_id, deadline, rtt_delay, RESPONSE)
                     if path_del + curTime > deadline:
-                        if type(content) is dict:
+                        if isinstance(content, (dict, Message)):
                             compSpot.missed_requests[content['content']] += 1
                         else:
                             compSpot.missed_requests[content] += 1
@@ -6509,7 +6490,7 @@ class HServSpecStorApp(Strategy):
                 delay = self.view.link_delay(node, next_node)
                 if self.view.hasStorageCapability(node):
                     source, in_cache = self.view.closest_source(node, service)
-                    if type(service) is not dict and self.controller.has_message(node, labels, content):
+                    if not isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content):
@@ -6527,7 +6508,7 @@ class HServSpecStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -6542,13 +6523,13 @@ class HServSpecStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         service = self.view.storage_nodes()[node].hasMessage(content, labels)
-                    elif type(service) is dict and self.controller.has_message(node, labels, content):
+                    elif isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                         cache_delay = 0
                         if not in_cache and self.view.has_cache(node):
                             if self.controller.put_content(source, content['content']):
@@ -6557,10 +6538,10 @@ class HServSpecStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -6573,17 +6554,17 @@ class HServSpecStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -6595,7 +6576,7 @@ class HServSpecStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -6613,7 +6594,7 @@ class HServSpecStorApp(Strategy):
                         service['receiveTime'] = curTime
                         service['service_type'] = "processed"
                     else:
-                        service = dict()
+                        service = Message()
                         service['content'] = content
                         service['labels'] = labels
                         service['msg_size'] = 1000000
@@ -6697,10 +6678,10 @@ class HServSpecStorApp(Strategy):
                                 self.controller.put_content_local_cache(source)
                                 cache_delay = 0.005
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -6713,17 +6694,17 @@ class HServSpecStorApp(Strategy):
                                                           next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
                                 return
                         elif in_cache:
                             pc = self.controller.has_message(node, labels, content['content'])
-                            if type(pc) != dict:
+                            if not isinstance(pc, (dict, Message)):
                                 source, in_cache = self.view.closest_source(node, service)
                                 pc = self.view.model.repoStorage[source].hasMessage(content['content'], labels)
-                                if type(pc) != dict:
+                                if not isinstance(pc, (dict, Message)):
                                     for n in self.content_source(content, content['labels']):
                                         if n == source:
                                             pc = self.model.contents[n][content['content']]
@@ -6735,7 +6716,7 @@ class HServSpecStorApp(Strategy):
                                 self.controller.add_event(curTime + delay, receiver, service, labels, next_node,
                                                           flow_id, deadline, rtt_delay, RESPONSE)
                                 if path_del + curTime > deadline:
-                                    if type(content) is dict:
+                                    if isinstance(content, (dict, Message)):
                                         compSpot.missed_requests[content['content']] += 1
                                     else:
                                         compSpot.missed_requests[content] += 1
@@ -6884,8 +6865,7 @@ class HServSpecStorApp(Strategy):
                       self.view.model.repoStorage[node].getDepletedUnProcMessagesBW(period) + \
                       self.view.model.repoStorage[node].getDepletedMessagesBW(period)
 
-    def deplCloud(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplCloud(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() +
                 self.view.model.repoStorage[node].getStaleMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
@@ -6910,7 +6890,7 @@ class HServSpecStorApp(Strategy):
                 """
 
                 if not self.view.model.repoStorage[node].isProcessedEmpty():
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -6927,7 +6907,7 @@ class HServSpecStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage()() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -6945,7 +6925,7 @@ class HServSpecStorApp(Strategy):
 
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage()() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -6988,7 +6968,7 @@ class HServSpecStorApp(Strategy):
 
                 if (self.view.model.repoStorage[node].getOldestStaleMessage() is not None and
                         self.cloudBW < self.cloud_lim):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7010,7 +6990,7 @@ class HServSpecStorApp(Strategy):
                     """
 
                 elif (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7031,7 +7011,7 @@ class HServSpecStorApp(Strategy):
                 * and a  message for processing is processed
                     """
                 elif (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7064,8 +7044,7 @@ class HServSpecStorApp(Strategy):
                       " Total space is " + self.view.model.repoStorage[node].getTotalStorageSpace()) """
                 # System.out.prln("Depleted  messages: " + sdepleted)
 
-    def deplUp(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplUp(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcessedMessagesSize() >
                 (self.view.model.repoStorage[node].getTotalStorageSpace() * self.min_stor)):
 
@@ -7081,7 +7060,7 @@ class HServSpecStorApp(Strategy):
                 """
                 # TODO: NEED TO add COMPRESSED PROCESSED messages to storage AFTER normal servicing
                 if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                    msg = self.processedDepletion(node)
+                    msg = self.processedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7099,7 +7078,7 @@ class HServSpecStorApp(Strategy):
 
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
                 elif self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None:
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7116,7 +7095,7 @@ class HServSpecStorApp(Strategy):
                         print("Message is scheduled to be stored in the CLOUD")
 
                 elif self.view.model.repoStorage[node].getOldestStaleMessage() is not None:
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                         for n in self.view.model.comp_size:
@@ -7154,7 +7133,7 @@ class HServSpecStorApp(Strategy):
         for i in range(0, 50) and self.cloudBW > self.cloud_lim and \
                  not self.view.model.repoStorage[node].isProcessingEmpty() and self.upEmptyLoop:
             if (not self.view.model.repoStorage[node].isProcessedEmpty):
-                self.processedDepletion(node)
+                self.processedDepletion(curTime, node)
 
             elif (not self.view.model.repoStorage[node].isProcessingEmpty):
                 self.view.model.repoStorage[node].deleteAnyMessage(
@@ -7164,15 +7143,14 @@ class HServSpecStorApp(Strategy):
 
     # System.out.prln("Depletion is at: "+ self.cloudBW)
 
-    def deplStorage(self, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
-        curTime = time.time()
+    def deplStorage(self, curTime, node, receiver, content, labels, log, flow_id, deadline, rtt_delay=0, period=False):
         if (self.view.model.repoStorage[node].getProcMessagesSize() +
                 self.view.model.repoStorage[node].getMessagesSize() >
                 self.view.model.repoStorage[node].getTotalStorageSpace() * self.max_stor):
             self.deplEmptyLoop = True
             for i in range(0, 50) and self.deplBW < self.depl_rate and self.deplEmptyLoop:
                 if (self.view.model.repoStorage[node].getOldestDeplUnProcMessage() is not None):
-                    msg = self.oldestUnProcDepletion(node)
+                    msg = self.oldestUnProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -7192,7 +7170,7 @@ class HServSpecStorApp(Strategy):
                     """ Oldest unprocessed message is depleted (as a FIFO type of storage) """
 
                 elif (self.view.model.repoStorage[node].getOldestStaleMessage() is not None):
-                    msg = self.oldestSatisfiedDepletion(node)
+                    msg = self.oldestSatisfiedDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -7212,7 +7190,7 @@ class HServSpecStorApp(Strategy):
 
 
                 elif (self.view.model.repoStorage[node].getOldestInvalidProcessMessage() is not None):
-                    msg = self.oldestInvalidProcDepletion(node)
+                    msg = self.oldestInvalidProcDepletion(curTime, node)
                     source = self.view.content_source_cloud(msg, msg['labels'])
                     if not source:
                        source, in_cache = self.view.closest_source(node, content)
@@ -7318,8 +7296,7 @@ class HServSpecStorApp(Strategy):
             # Revise:
             self.lastDepl = curTime
 
-    def processedDepletion(self, node):
-        curTime = time.time()
+    def processedDepletion(self, curTime, node):
         if (self.view.model.repoStorage[node].getOldestFreshMessage() is not None):
             if (self.view.model.repoStorage[node].getOldestFreshMessage().getProperty("procTime") is None):
                 temp = self.view.model.repoStorage[node].getOldestFreshMessage()
@@ -7358,8 +7335,7 @@ class HServSpecStorApp(Strategy):
                     self.view.model.repoStorage[node].addToStoredMessages(temp)
                     self.view.model.repoStorage[node].deleteProcessedMessage(temp['content'], report)
 
-    def oldestSatisfiedDepletion(self, node):
-        curTime = time.time()
+    def oldestSatisfiedDepletion(self, curTime, node):
         ctemp = self.view.model.repoStorage[node].getOldestStaleMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(ctemp['content'])
         storTime = curTime - ctemp['receiveTime']
@@ -7385,8 +7361,7 @@ class HServSpecStorApp(Strategy):
         self.lastCloudUpload = curTime
         return ctemp
 
-    def oldestInvalidProcDepletion(self, node):
-        curTime = time.time()
+    def oldestInvalidProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestInvalidProcessMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         if (temp['comp'] is not None):
@@ -7416,8 +7391,7 @@ class HServSpecStorApp(Strategy):
                 self.view.model.repoStorage[node].addToDeplProcMessages(temp)
             return temp
 
-    def oldestUnProcDepletion(self, node):
-        curTime = time.time()
+    def oldestUnProcDepletion(self, curTime, node):
         temp = self.view.model.repoStorage[node].getOldestDeplUnProcMessage()
         self.view.model.repoStorage[node].deleteAnyMessage(temp['content'])
         self.view.model.repoStorage[node].addToDepletedUnProcMessages(temp)
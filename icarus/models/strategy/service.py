@@ -4,12 +4,13 @@ from __future__ import division
 from __future__ import print_function
 
 import networkx as nx
+import numpy as np
 import random
 import sys
 
 from math import ceil
 from icarus.registry import register_strategy
-from icarus.util import inheritdoc, path_links
+from icarus.util import inheritdoc, path_links, Message
 from .base import Strategy
 from icarus.models.service import Task, VM
 
@@ -54,7 +55,22 @@ class Coordinated(Strategy):
         self.compSpots = self.view.service_nodes()
         self.num_nodes = len(self.compSpots.keys())
         self.num_services = self.view.num_services()
-        self.serviceNodeUtil = [None]*len(self.receivers)
+        # Service time demand of each (receiver, node, service) over the
+        # current replacement interval
+        self.serviceNodeUtil = np.zeros((len(self.receivers), self.num_nodes, self.num_services))
+        self.receiver_rows = {int(recv[4:]): recv for recv in self.receivers}
+        services = self.view.services()
+        self.service_times = np.array([services[s].service_time for s in range(self.num_services)], dtype=float)
+        self.deadlines = np.array([services[s].deadline for s in range(self.num_services)], dtype=float)
+        # Whether each (receiver, node) round trip leaves enough time to
+        # execute each service before its deadline
+        self.feasible = np.zeros(self.serviceNodeUtil.shape, dtype=bool)
+        for recv in self.receivers:
+            for node, cs in self.compSpots.items():
+                if cs.is_cloud:
+                    continue
+                delay = self.view.path_delay(recv, node)
+                self.feasible[int(recv[4:]), node] = self.deadlines > 2*delay + self.service_times
         self.numVMsPerService = [[0] * self.num_services for x in range(self.num_nodes)]
         self.debug = debug
         self.p = p
@@ -77,15 +93,6 @@ class Coordinated(Strategy):
                 self.numVMsPerService[cs.node][serv] = cs.numberOfVMInstances[serv]
                 aVM = VM(cs, serv)
                 cs.scheduler.idleVMs[serv].append(aVM)
-
-        for recv in self.receivers:
-            recv = int(recv[4:])
-            self.serviceNodeUtil[recv] = [None]*self.num_nodes
-            for n in self.compSpots.keys():
-                cs = self.compSpots[n]
-                if cs.is_cloud:
-                    continue
-                self.serviceNodeUtil[recv][n] = [0.0]*self.num_services
             
     def initialise_metrics(self):
         """
@@ -95,14 +102,23 @@ class Coordinated(Strategy):
             cs = self.compSpots[node]
             cs.scheduler.idleTime = 0.0
 
-        for recv in self.receivers:
-            recv = int(recv[4:])
-            self.serviceNodeUtil[recv] = [None]*self.num_nodes
-            for n in self.compSpots.keys():
-                cs = self.compSpots[n]
-                if cs.is_cloud:
-                    continue
-                self.serviceNodeUtil[recv][n] = [0.0]*self.num_services
+        self.serviceNodeUtil.fill(0.0)
+
+    def feasible_service_utils(self, node):
+        """
+        Return the utilisation of each service at *node*, counting only the
+        demand of receivers for which the node can meet the service deadline.
+        """
+        return np.where(self.feasible[:, node, :], self.serviceNodeUtil[:, node, :], 0.0).sum(axis=0)
+
+    def clear_upstream_utils(self, node, service):
+        """
+        Clear the utilisation of *service* along the paths from the receivers
+        requesting it at *node*, once it is deployed there.
+        """
+        for ap in np.flatnonzero(self.serviceNodeUtil[:, node, service]):
+            path = self.view.shortest_path(self.receiver_rows[ap], node)
+            self.serviceNodeUtil[ap, path[1:], service] = 0.0
 
     def find_topmost_feasible_node(self, receiver, flow_id, path, time, service, deadline, rtt_delay):
         """
@@ -178,17 +194,10 @@ class Coordinated(Strategy):
                 
             for node in nodes:
                 cs = self.compSpots[node]
-                service_utils = {x:0.0 for x in range(self.num_services)}
                 ### sort services that are executable at the node by their utilisation #
-                for recv in self.receivers:
-                    ap = int(recv[4:])
-                    for service in range(self.num_services):
-                        if self.serviceNodeUtil[ap][node][service] == 0:
-                            continue
-                        service_obj = self.view.services()[service]
-                        if service_obj.deadline > (2*self.view.path_delay(recv, node) + service_obj.service_time):
-                            service_utils[service] += self.serviceNodeUtil[ap][node][service]
-                service_utils_sorted = sorted(service_utils.items(), key = lambda x: x[1], reverse=True)
+                service_utils = self.feasible_service_utils(node)
+                order = np.argsort(-service_utils, kind='mergesort')
+                service_utils_sorted = zip(order.tolist(), service_utils[order].tolist())
                 
                 if self.debug:
                     count = 0
@@ -202,14 +211,7 @@ class Coordinated(Strategy):
                 for service, util in service_utils_sorted:
                     num_vms = int(round(util/(self.replacement_interval)))
                     if remaining_vms > 0 and num_vms > 0:
-                        for recv in self.receivers:
-                            ap = int(recv[4:])
-                            if self.serviceNodeUtil[ap][node][service] == 0:
-                                continue
-                            else:
-                                path = self.view.shortest_path(recv, node)
-                                for n in path[1:]:
-                                   self.serviceNodeUtil[ap][n][service] = 0.0
+                        self.clear_upstream_utils(node, service)
                     #cs.numberOfVMInstances[service] = min(num_vms, remaining_vms)
                     self.numVMsPerService[cs.node][service] = min(num_vms, remaining_vms)
                     #if self.debug and cs.numberOfVMInstances[service] > 0:
@@ -240,14 +242,7 @@ class Coordinated(Strategy):
                                 self.numVMsPerService[cs.node][service] = num_vms
                                 newAddition = True
                                 remaining_vms -= num_vms
-                                for recv in self.receivers:
-                                    ap = int(recv[4:])
-                                    if self.serviceNodeUtil[ap][node][service] == 0:
-                                        continue
-                                    else:
-                                        path = self.view.shortest_path(recv, node)
-                                        for n in path[1:]:
-                                           self.serviceNodeUtil[ap][n][service] = 0.0
+                                self.clear_upstream_utils(node, service)
                                 if self.debug:
                                     print (str(num_vms) + " additional vm is instantiated at node: " + str(node) + " for service: " + str(service))
                         if remaining_vms == 0:
@@ -325,7 +320,7 @@ class Coordinated(Strategy):
                 cs = self.view.compSpot(n)
                 if cs.is_cloud:
                     continue
-                self.serviceNodeUtil[int(receiver[4:])][n][service['content']] += self.view.services()[service['content']].service_time
+                self.serviceNodeUtil[int(receiver[4:]), n, service['content']] += self.view.services()[service['content']].service_time
             return
         elif status == REQUEST and node != source:
             compSpot = self.view.compSpot(node)
@@ -401,6 +396,8 @@ class Hybrid(Strategy):
         self.compSpots = self.view.service_nodes()
         self.num_nodes = len(self.compSpots.keys())
         self.num_services = self.view.num_services()
+        services = self.view.services()
+        self.service_times = np.array([services[s].service_time for s in range(self.num_services)], dtype=float)
         self.debug = debug
         # metric to rank each VM of Comp. Spot
         self.deadline_metric = {x : {} for x in range(0, self.num_nodes)}
@@ -440,21 +437,12 @@ class Hybrid(Strategy):
                 continue
             runningServiceResidualTimes = self.deadline_metric[node]
             missedServiceResidualTimes = self.cand_deadline_metric[node]
-            #service_residuals = []
-            running_services_utilisation_normalised = []
-            missed_services_utilisation = []
-            delay = {}
-            #runningServicesUtil = {}
-            #missedServicesUtil = {}
 
             if len(cs.scheduler.upcomingTaskQueue) > 0:
                 print ("Printing upcoming task queue at node: " + str(cs.node))
                 for task in cs.scheduler.upcomingTaskQueue:
                     task.print_task()
 
-            util = []
-            util_normalised = {}
-
             if self.debug:
                 print ("Replacement at node " + repr(node))
             for service in range(0, self.num_services):
@@ -463,46 +451,30 @@ class Hybrid(Strategy):
                     print ("numberOfInstances = " + str(cs.numberOfVMInstances[service]))
                     print ("Total VMs: " + str(len(cs.scheduler.idleVMs[service]) + len(cs.scheduler.busyVMs[service]) + len(cs.scheduler.startingVMs[service])) )
                     print ("\t Idle: " + str(len(cs.scheduler.idleVMs[service])) + " Busy: " + str(len(cs.scheduler.busyVMs[service])) + " Starting: " + str(len(cs.scheduler.startingVMs[service])) )
-                d_metric = 0.0
-                u_metric = 0.0
-                util.append([service, (cs.missed_requests[service] + cs.running_requests[service]) * cs.services[service].service_time])
-                if cs.numberOfVMInstances[service] == 0:
-                # No instances
-                    if cs.missed_requests[service] > 0:
-                        d_metric = 1.0*missedServiceResidualTimes[service]/cs.missed_requests[service]
-                    else:
-                        d_metric = float('inf')
-                    delay[service] = d_metric
-                    u_metric = cs.missed_requests[service] * cs.services[service].service_time
-                    if u_metric > self.replacement_interval:
-                        u_metric = self.replacement_interval
-                    #missedServiceResidualTimes[service] = d_metric
-                    #missedServicesUtil[service] = u_metric
-                    missed_services_utilisation.append([service, u_metric])
-                    #service_residuals.append([service, d_metric])
-                elif cs.numberOfVMInstances[service] > 0:
-                # At least one instance
-                    if cs.running_requests[service] > 0:
-                        d_metric = 1.0*runningServiceResidualTimes[service]/cs.running_requests[service]
-                    else:
-                        d_metric = float('inf')
-                    runningServiceResidualTimes[service] = d_metric
-                    u_metric_missed = (cs.missed_requests[service]) * cs.services[service].service_time * 1.0
-                    if u_metric_missed > self.replacement_interval:
-                        u_metric_missed = self.replacement_interval
-                    #missedServicesUtil[service] = u_metric_missed
-                    u_metric_served = (1.0*cs.running_requests[service]*cs.services[service].service_time)/cs.numberOfVMInstances[service]
-                    #runningServicesUtil[service] = u_metric_served
-                    missed_services_utilisation.append([service, u_metric_missed])
-                    #running_services_latency.append([service, d_metric])
-                    running_services_utilisation_normalised.append([service, u_metric_served/cs.numberOfVMInstances[service]])
-                    #service_residuals.append([service, d_metric])
-                    delay[service] = d_metric
-                else:
-                    print("This should not happen")
-            running_services_utilisation_normalised = sorted(running_services_utilisation_normalised, key=lambda x: x[1]) #smaller to larger
-            missed_services_utilisation = sorted(missed_services_utilisation, key=lambda x: x[1], reverse=True) #larger to smaller
-            #service_residuals = sorted(service_residuals, key=lambda x: x[1]) #smaller to larger
+
+            instances = np.array(cs.numberOfVMInstances[:self.num_services], dtype=float)
+            running = np.array(cs.running_requests[:self.num_services], dtype=float)
+            missed = np.array(cs.missed_requests[:self.num_services], dtype=float)
+            running_residuals = np.array([runningServiceResidualTimes[x] for x in range(self.num_services)], dtype=float)
+            missed_residuals = np.array([missedServiceResidualTimes[x] for x in range(self.num_services)], dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Average residual time of the requests of each service,
+                # missed ones for services without instances
+                delay = np.where(instances == 0,
+                                 np.where(missed > 0, missed_residuals/missed, float('inf')),
+                                 np.where(running > 0, running_residuals/running, float('inf')))
+                running_utils = running*self.service_times/instances/instances
+            missed_utils = np.minimum(missed*self.service_times, self.replacement_interval)
+            for service in np.flatnonzero(instances > 0).tolist():
+                runningServiceResidualTimes[service] = float(delay[service])
+            if (instances < 0).any():
+                print("This should not happen")
+            running_services = np.flatnonzero(instances > 0)
+            running_services = running_services[np.argsort(running_utils[running_services], kind='mergesort')] #smaller to larger
+            missed_services = np.flatnonzero(instances >= 0)
+            missed_services = missed_services[np.argsort(-missed_utils[missed_services], kind='mergesort')] #larger to smaller
+            running_services_utilisation_normalised = [list(x) for x in zip(running_services.tolist(), running_utils[running_services].tolist())]
+            missed_services_utilisation = zip(missed_services.tolist(), missed_utils[missed_services].tolist())
             exit_loop = False
             for service_missed, missed_util in missed_services_utilisation:
                 if exit_loop:
@@ -704,10 +676,10 @@ class Hybrid(Strategy):
             next_node = path[1]
             delay = self.view.link_delay(node, next_node)
             if self.view.hasStorageCapability(node):
-                if type(service) is not dict and self.controller.has_message(node, labels, content):
+                if not isinstance(service, (dict, Message)) and self.controller.has_message(node, labels, content):
                     service = self.view.storage_nodes()[node].hasMessage(content, labels)
                 else:
-                    service = dict()
+                    service = Message()
                     service['content'] = content
                     service['labels'] = labels
                 service['receiveTime'] = time
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+import random
+import sys
+import unittest
+
+import numpy as np
+from scipy.optimize import linprog
+
+from icarus.models.strategy.optimal import ForwardingProblem, OptimalScheduling, \
+    routing_tables
+from icarus.models.strategy.placement import OptimalPlacementAndScheduling
+
+
+def dense_forwarding_lp(A, C, D):
+    """Solve the forwarding LP over all (s, g, h) triples with linprog"""
+    S, H, G = A.shape
+    n = S*G*H
+    index = lambda s, g, h: (s*G + g)*H + h
+    A_ub, b_ub = [], []
+    for h in range(H):
+        row = np.zeros(n)
+        for s in range(S):
+            for g in range(G):
+                row[index(s, g, h)] = 1
+        A_ub.append(row)
+        b_ub.append(C[h])
+    for s in range(S):
+        for g in range(G):
+            row = np.zeros(n)
+            for h in range(H):
+                row[index(s, g, h)] = 1
+            A_ub.append(row)
+            b_ub.append(D[s, g])
+    bounds = [(0, None) if A[s, h, g] else (0, 0)
+              for s in range(S) for g in range(G) for h in range(H)]
+    return linprog(-np.ones(n), A_ub=np.array(A_ub), b_ub=b_ub, bounds=bounds)
+
+
+def cvxpy_can_solve():
+    try:
+        import cvxpy as cp
+        x = cp.Variable(1)
+        cp.Problem(cp.Maximize(cp.sum_entries(x)), [x <= 1]).solve()
+    except Exception:
+        return False
+    return True
+
+
+class TestForwardingProblem(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.RandomState(7)
+        S, H, G = 3, 4, 2
+        self.A = (self.rng.rand(S, H, G) < 0.6).astype(int)
+        self.A[0, :, 0] = 0
+        self.C = self.rng.randint(1, 5, size=H).astype(float)
+        self.D = 3*self.rng.rand(S, G)
+
+    def test_formulation(self):
+        problem = ForwardingProblem(self.A, self.C)
+        n_vars = len(problem.triples[0])
+        self.assertEqual(np.count_nonzero(self.A), n_vars)
+        A_ub = np.vstack([problem.capacity.toarray(), problem.coverage.toarray()])
+        b_ub = np.concatenate([self.C, self.D.ravel()])
+        sparse = linprog(-np.ones(n_vars), A_ub=A_ub, b_ub=b_ub,
+                         bounds=[(0, None)]*n_vars)
+        dense = dense_forwarding_lp(self.A, self.C, self.D)
+        self.assertEqual(0, sparse.status)
+        self.assertAlmostEqual(dense.fun, sparse.fun, places=6)
+
+    def test_solve(self):
+        if not cvxpy_can_solve():
+            self.skipTest('installed cvxpy backend cannot solve problems')
+        problem = ForwardingProblem(self.A, self.C)
+        for _ in range(2):
+            x_bar, solve_time = problem.solve(self.D)
+            expected = dense_forwarding_lp(self.A, self.C, self.D)
+            self.assertAlmostEqual(-expected.fun, x_bar.sum(), places=4)
+            self.assertTrue(np.all(x_bar >= -1e-6))
+            self.assertTrue(np.all(x_bar.sum(axis=(0, 1)) <= self.C + 1e-6))
+            self.assertTrue(np.all(x_bar.sum(axis=2) <= self.D + 1e-6))
+            self.assertTrue(np.all(x_bar[self.A.transpose(0, 2, 1) == 0] == 0))
+            self.assertGreaterEqual(solve_time, 0.0)
+            self.D = 3*self.rng.rand(*self.D.shape)
+
+    def test_no_feasible_triples(self):
+        problem = ForwardingProblem(np.zeros((2, 3, 2)), np.ones(3))
+        x_bar, solve_time = problem.solve(np.ones((2, 2)))
+        self.assertEqual((2, 2, 3), x_bar.shape)
+        self.assertFalse(x_bar.any())
+        self.assertEqual(0.0, solve_time)
+
+
+class TestGroupSpecificExecution(unittest.TestCase):
+
+    def strategy(self, x_bar, avg_D, std_D, r):
+        strategy = OptimalScheduling.__new__(OptimalScheduling)
+        strategy.x_bar = x_bar
+        strategy.avg_D = avg_D
+        strategy.std_D = std_D
+        strategy.riskAversionParameter = r
+        return strategy
+
+    def test_closed_form(self):
+        x_bar = np.array([[[1.0, 2.0, 0.0], [0.5, 0.5, 0.0]]])
+        avg_D = np.array([[2.0, 3.0]])
+        std_D = np.array([[1.0, 4.0]])
+        strategy = self.strategy(x_bar, avg_D, std_D, 0.5)
+        strategy.groupSpecificExecution()
+        # cap = [1.5, 1.0]: group 0 is scaled by 1.5/3, group 1 is untouched
+        np.testing.assert_allclose([[[0.5, 1.0, 0.0], [0.5, 0.5, 0.0]]], strategy.x)
+
+    def test_negative_cap(self):
+        x_bar = np.ones((1, 1, 2))
+        strategy = self.strategy(x_bar, np.array([[1.0]]), np.array([[2.0]]), 1.0)
+        strategy.groupSpecificExecution()
+        self.assertFalse(strategy.x.any())
+
+    def test_matches_lp(self):
+        rng = np.random.RandomState(3)
+        S, G, H = 2, 3, 4
+        x_bar = rng.rand(S, G, H)
+        avg_D = 3*rng.rand(S, G)
+        std_D = rng.rand(S, G)
+        strategy = self.strategy(x_bar, avg_D, std_D, 1.0)
+        strategy.groupSpecificExecution()
+        for s in range(S):
+            for g in range(G):
+                cap = max(avg_D[s, g] - std_D[s, g], 0.0)
+                res = linprog(-np.ones(H), A_ub=np.ones((1, H)), b_ub=[cap],
+                              bounds=[(0, b) for b in x_bar[s, g]])
+                self.assertAlmostEqual(-res.fun, strategy.x[s, g].sum(), places=6)
+                self.assertTrue(np.all(strategy.x[s, g] <= x_bar[s, g] + 1e-12))
+
+
+class FixedRandom(object):
+
+    def __init__(self, r):
+        self.r = r
+
+    def random(self):
+        return self.r
+
+
+def walk_access_nodes(probability, nodes, ap, service, r, cloud):
+    """Pick the execution node by summing probabilities along the path"""
+    cum = 0.0
+    for node in nodes:
+        cum += probability[service, ap, node]
+        if r <= cum:
+            return node
+    return cloud
+
+
+class TestRoutingTables(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(5)
+        S, G, H = 4, 3, 6
+        self.access_nodes = {0: [3, 1, 0], 1: [4, 1, 0], 2: [5, 2, 0]}
+        self.probability = np.zeros((S, G, H))
+        for ap, nodes in self.access_nodes.items():
+            for service in range(S):
+                p = rng.dirichlet(np.ones(len(nodes) + 1))[:-1]
+                p[rng.rand(len(nodes)) < 0.4] = 0.0
+                self.probability[service, ap, nodes] = p
+        # Requests executed entirely along the path, skipping the edge node
+        self.probability[0, 0, [3, 1, 0]] = [0.0, 0.25, 0.75]
+        self.probability[1, 1, [4, 1, 0]] = 0.0
+
+    def strategy(self):
+        strategy = OptimalScheduling.__new__(OptimalScheduling)
+        strategy.access_nodes = self.access_nodes
+        strategy.routing_tables = routing_tables(self.probability, self.access_nodes)
+        return strategy
+
+    def pick(self, strategy, receiver, service, r):
+        module = sys.modules[type(strategy).__module__]
+        _random = module.random
+        module.random = FixedRandom(r)
+        try:
+            return strategy.pickExecutionNode(receiver, service, 'cloud')
+        finally:
+            module.random = _random
+
+    def test_matches_walk(self):
+        strategy = self.strategy()
+        rnd = random.Random(0)
+        picked = set()
+        for ap, nodes in self.access_nodes.items():
+            for service in range(self.probability.shape[0]):
+                cum = np.cumsum(self.probability[service, ap, nodes]).tolist()
+                draws = [0.0, 1.0 - 1e-12] + cum + [rnd.random() for _ in range(50)]
+                for r in draws:
+                    expected = walk_access_nodes(self.probability, nodes, ap,
+                                                 service, r, 'cloud')
+                    actual = self.pick(strategy, 'rec_%d' % ap, service, r)
+                    self.assertEqual(expected, actual)
+                    picked.add(actual)
+        self.assertIn('cloud', picked)
+
+    def test_zero_probability_nodes(self):
+        strategy = self.strategy()
+        self.assertEqual(1, self.pick(strategy, 'rec_0', 0, 0.1))
+        self.assertEqual(1, self.pick(strategy, 'rec_0', 0, 0.25))
+        self.assertEqual(0, self.pick(strategy, 'rec_0', 0, 0.26))
+        self.assertEqual(0, self.pick(strategy, 'rec_0', 0, 1.0 - 1e-12))
+        for r in (0.1, 0.5, 0.99):
+            self.assertEqual('cloud', self.pick(strategy, 'rec_1', 1, r))
+
+    def test_cumulative_probability_check(self):
+        self.probability[2, 2, [5, 2, 0]] = [0.5, 0.3, 0.205]
+        routing_tables(self.probability, self.access_nodes)
+        self.probability[2, 2, 0] = 0.25
+        self.assertRaises(ValueError, routing_tables, self.probability,
+                          self.access_nodes)
+        routing_tables(self.probability, self.access_nodes, tolerance=0.1)
+
+    def test_fractional_rates(self):
+        # Fractional parts of the rates forwarded to each node by the
+        # placement strategy, which are not probabilities
+        fraction = np.array([[[0.6, 0.7, 0.0]]])
+        access_nodes = {0: [0, 1, 2]}
+        self.assertRaises(ValueError, routing_tables, fraction, access_nodes)
+        strategy = OptimalPlacementAndScheduling.__new__(OptimalPlacementAndScheduling)
+        strategy.access_nodes = access_nodes
+        strategy.routing_tables = routing_tables(fraction, access_nodes, check=False)
+        np.testing.assert_allclose([[0.6, 1.3, 1.3]], strategy.routing_tables[0])
+        for r in (0.0, 0.3, 0.6, 0.61, 0.99):
+            self.assertEqual(walk_access_nodes(fraction, [0, 1, 2], 0, 0, r, 'cloud'),
+                             self.pick(strategy, 'rec_0', 0, r))
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+import copy
+import random
+import unittest
+from math import ceil
+
+import networkx as nx
+import numpy as np
+
+from icarus.models.strategy.service import Coordinated, Hybrid
+
+
+class MockTopology(nx.Graph):
+
+    def receivers(self):
+        return sorted(v for v in self.nodes() if str(v).startswith('rec_'))
+
+
+class MockScheduler(object):
+
+    def __init__(self):
+        self.idleVMs = {}
+        self.busyVMs = {}
+        self.startingVMs = {}
+        self.upcomingTaskQueue = []
+
+
+class MockService(object):
+
+    def __init__(self, service_time, deadline):
+        self.service_time = service_time
+        self.deadline = deadline
+
+
+class MockComputationSpot(object):
+
+    def __init__(self, node, services, numOfVMs, is_cloud=False):
+        self.node = node
+        self.services = services
+        self.service_population_size = len(services)
+        self.numOfVMs = numOfVMs
+        self.numberOfVMInstances = [0]*len(services)
+        self.is_cloud = is_cloud
+        self.scheduler = MockScheduler()
+
+
+class MockModel(object):
+    pass
+
+
+class MockView(object):
+
+    def __init__(self, topology, compSpots, services):
+        self.model = MockModel()
+        self._topology = topology
+        self._compSpots = compSpots
+        self._services = services
+
+    def topology(self):
+        return self._topology
+
+    def service_nodes(self):
+        return self._compSpots
+
+    def num_services(self):
+        return len(self._services)
+
+    def services(self):
+        return self._services
+
+    def path_delay(self, s, t):
+        return nx.shortest_path_length(self._topology, s, t, weight='delay')
+
+    def shortest_path(self, s, t):
+        return nx.shortest_path(self._topology, s, t)
+
+
+class MockController(object):
+
+    def __init__(self):
+        self.reassignments = []
+
+    def reassign_vm(self, time, cs, serviceToReplace, serviceToAdd, debug):
+        self.reassignments.append((time, cs.node, serviceToReplace, serviceToAdd))
+
+
+def view(rnd, n_services):
+    #
+    #           7 (cloud)
+    #           |
+    #           0
+    #         /   \
+    #        1     2
+    #       / \   / \
+    #      3   4 5   6
+    #      |   | |   |
+    #    rec_0 ... rec_3
+    #
+    topology = MockTopology(nx.balanced_tree(2, 2))
+    for leaf in range(3, 7):
+        topology.add_edge(leaf, 'rec_%d' % (leaf - 3))
+    topology.add_edge(0, 7)
+    for u, v in topology.edges():
+        topology.adj[u][v]['delay'] = rnd.choice([0.5, 1, 2])
+    depths = nx.shortest_path_length(topology, 0)
+    for v in range(7):
+        topology.node[v]['depth'] = depths[v]
+    topology.graph['height'] = 2
+    services = [MockService(rnd.choice([0.5, 1, 2]), rnd.choice([2, 4, 6, 8, 10]))
+                for _ in range(n_services)]
+    compSpots = {v: MockComputationSpot(v, services, rnd.randint(1, 6))
+                 for v in range(7)}
+    compSpots[7] = MockComputationSpot(7, services, 0, is_cloud=True)
+    return MockView(topology, compSpots, services)
+
+
+def reference_coordinated_replace_services(self, time):
+    """Coordinated.replace_services as it was before vectorisation"""
+    for height in range(self.topo.graph['height']+1):
+        nodes = []
+        for node in self.compSpots.keys():
+            cs = self.compSpots[node]
+            if cs.is_cloud:
+                continue
+            if self.topo.node[node]['depth'] == height:
+                nodes.append(node)
+                for service in range(self.num_services):
+                    self.numVMsPerService[node][service] = 0
+        for node in nodes:
+            cs = self.compSpots[node]
+            service_utils = {x: 0.0 for x in range(self.num_services)}
+            for recv in self.receivers:
+                ap = int(recv[4:])
+                for service in range(self.num_services):
+                    if self.serviceNodeUtil[ap][node][service] == 0:
+                        continue
+                    service_obj = self.view.services()[service]
+                    if service_obj.deadline > (2*self.view.path_delay(recv, node) + service_obj.service_time):
+                        service_utils[service] += self.serviceNodeUtil[ap][node][service]
+            service_utils_sorted = sorted(service_utils.items(), key=lambda x: x[1], reverse=True)
+            remaining_vms = cs.numOfVMs
+            for service, util in service_utils_sorted:
+                num_vms = int(round(util/(self.replacement_interval)))
+                if remaining_vms > 0 and num_vms > 0:
+                    for recv in self.receivers:
+                        ap = int(recv[4:])
+                        if self.serviceNodeUtil[ap][node][service] == 0:
+                            continue
+                        path = self.view.shortest_path(recv, node)
+                        for n in path[1:]:
+                            self.serviceNodeUtil[ap][n][service] = 0.0
+                self.numVMsPerService[cs.node][service] = min(num_vms, remaining_vms)
+                remaining_vms -= self.numVMsPerService[cs.node][service]
+                if remaining_vms == 0:
+                    break
+            while remaining_vms > 0:
+                newAddition = False
+                for service, util in service_utils_sorted:
+                    if self.numVMsPerService[cs.node][service] > 0:
+                        newAddition = True
+                        self.numVMsPerService[cs.node][service] += 1
+                        remaining_vms -= 1
+                    else:
+                        num_vms = int(ceil(util/(self.replacement_interval)))
+                        num_vms = min(num_vms, remaining_vms)
+                        if num_vms > 0:
+                            self.numVMsPerService[cs.node][service] = num_vms
+                            newAddition = True
+                            remaining_vms -= num_vms
+                            for recv in self.receivers:
+                                ap = int(recv[4:])
+                                if self.serviceNodeUtil[ap][node][service] == 0:
+                                    continue
+                                path = self.view.shortest_path(recv, node)
+                                for n in path[1:]:
+                                    self.serviceNodeUtil[ap][n][service] = 0.0
+                    if remaining_vms == 0:
+                        break
+                if newAddition is False:
+                    break
+    for node in self.compSpots.keys():
+        servicesToReplace = []
+        servicesToAdd = []
+        cs = self.compSpots[node]
+        if cs.is_cloud:
+            continue
+        for service in range(self.num_services):
+            diff = self.numVMsPerService[cs.node][service] - cs.numberOfVMInstances[service]
+            servicesToAdd.extend([service]*max(diff, 0))
+            servicesToReplace.extend([service]*max(-diff, 0))
+        if len(servicesToReplace) != len(servicesToAdd):
+            raise ValueError("This should not happen in Coordinated strategy replace_services()")
+        for serviceToReplace, serviceToAdd in zip(servicesToReplace, servicesToAdd):
+            self.controller.reassign_vm(time, cs, serviceToReplace, serviceToAdd, self.debug)
+
+
+def reference_hybrid_replace_services1(self, time):
+    """Hybrid.replace_services1 as it was before vectorisation"""
+    for node, cs in self.compSpots.items():
+        if cs.is_cloud:
+            continue
+        runningServiceResidualTimes = self.deadline_metric[node]
+        missedServiceResidualTimes = self.cand_deadline_metric[node]
+        running_services_utilisation_normalised = []
+        missed_services_utilisation = []
+        delay = {}
+        for service in range(0, self.num_services):
+            if cs.numberOfVMInstances[service] == 0:
+                if cs.missed_requests[service] > 0:
+                    d_metric = 1.0*missedServiceResidualTimes[service]/cs.missed_requests[service]
+                else:
+                    d_metric = float('inf')
+                delay[service] = d_metric
+                u_metric = cs.missed_requests[service] * cs.services[service].service_time
+                if u_metric > self.replacement_interval:
+                    u_metric = self.replacement_interval
+                missed_services_utilisation.append([service, u_metric])
+            elif cs.numberOfVMInstances[service] > 0:
+                if cs.running_requests[service] > 0:
+                    d_metric = 1.0*runningServiceResidualTimes[service]/cs.running_requests[service]
+                else:
+                    d_metric = float('inf')
+                runningServiceResidualTimes[service] = d_metric
+                u_metric_missed = (cs.missed_requests[service]) * cs.services[service].service_time * 1.0
+                if u_metric_missed > self.replacement_interval:
+                    u_metric_missed = self.replacement_interval
+                u_metric_served = (1.0*cs.running_requests[service]*cs.services[service].service_time)/cs.numberOfVMInstances[service]
+                missed_services_utilisation.append([service, u_metric_missed])
+                running_services_utilisation_normalised.append([service, u_metric_served/cs.numberOfVMInstances[service]])
+                delay[service] = d_metric
+        running_services_utilisation_normalised = sorted(running_services_utilisation_normalised, key=lambda x: x[1])
+        missed_services_utilisation = sorted(missed_services_utilisation, key=lambda x: x[1], reverse=True)
+        exit_loop = False
+        for service_missed, missed_util in missed_services_utilisation:
+            if exit_loop:
+                break
+            for indx in range(len(running_services_utilisation_normalised)):
+                service_running = running_services_utilisation_normalised[indx][0]
+                running_util = running_services_utilisation_normalised[indx][1]
+                if running_util > missed_util:
+                    exit_loop = True
+                    break
+                if service_running == service_missed:
+                    continue
+                if missed_util >= running_util and delay[service_missed] < delay[service_running] and delay[service_missed] > 0:
+                    self.controller.reassign_vm(time, cs, service_running, service_missed, self.debug)
+                    del running_services_utilisation_normalised[indx]
+                    break
+
+
+class TestCoordinatedReplacement(unittest.TestCase):
+
+    n_services = 6
+
+    def state(self, seed):
+        rnd = random.Random(seed)
+        strategy = Coordinated(view(rnd, self.n_services), MockController(),
+                               replacement_interval=rnd.choice([1, 2, 5]))
+        demand = np.array([rnd.choice([0, 0, 0.5, 1, 2, 4, 8])
+                           for _ in range(strategy.serviceNodeUtil.size)])
+        strategy.serviceNodeUtil[:] = demand.reshape(strategy.serviceNodeUtil.shape)
+        return strategy
+
+    def outcome(self, strategy, replace_services):
+        try:
+            replace_services(strategy, 100.0)
+        except ValueError:
+            return None
+        return (strategy.controller.reassignments,
+                [list(x) for x in strategy.numVMsPerService],
+                strategy.serviceNodeUtil.tolist())
+
+    def test_feasible_service_utils(self):
+        strategy = self.state(0)
+        for node, cs in strategy.compSpots.items():
+            if cs.is_cloud:
+                continue
+            expected = np.zeros(self.n_services)
+            for recv in strategy.receivers:
+                delay = strategy.view.path_delay(recv, node)
+                for service, obj in enumerate(strategy.view.services()):
+                    if obj.deadline > 2*delay + obj.service_time:
+                        expected[service] += strategy.serviceNodeUtil[int(recv[4:]), node, service]
+            np.testing.assert_array_equal(expected, strategy.feasible_service_utils(node))
+
+    def test_matches_loops(self):
+        completed = 0
+        for seed in range(200):
+            expected = self.outcome(self.state(seed), reference_coordinated_replace_services)
+            actual = self.outcome(self.state(seed), Coordinated.replace_services)
+            self.assertEqual(expected, actual)
+            if expected is not None:
+                completed += 1
+        self.assertGreater(completed, 100)
+
+
+class TestHybridReplacement(unittest.TestCase):
+
+    n_services = 6
+
+    def state(self, seed):
+        rnd = random.Random(seed)
+        strategy = Hybrid(view(rnd, self.n_services), MockController(),
+                          replacement_interval=rnd.choice([1, 2, 5]))
+        for node, cs in strategy.compSpots.items():
+            if cs.is_cloud:
+                continue
+            for service in range(self.n_services):
+                instances = rnd.choice([0, 0, 1, 2, 3])
+                cs.numberOfVMInstances[service] = instances
+                cs.scheduler.idleVMs[service] = [None]*instances
+                cs.scheduler.busyVMs[service] = []
+                cs.scheduler.startingVMs[service] = []
+                strategy.deadline_metric[node][service] = rnd.choice([0, 0.5, 1, 3])
+                strategy.cand_deadline_metric[node][service] = rnd.choice([0, 0.5, 1, 3])
+            cs.running_requests = [rnd.randint(0, 4) for _ in range(self.n_services)]
+            cs.missed_requests = [rnd.randint(0, 4) for _ in range(self.n_services)]
+        return strategy
+
+    def outcome(self, strategy, replace_services1):
+        replace_services1(strategy, 100.0)
+        return (strategy.controller.reassignments,
+                copy.deepcopy(strategy.deadline_metric),
+                copy.deepcopy(strategy.cand_deadline_metric))
+
+    def test_matches_loops(self):
+        reassigned = 0
+        for seed in range(200):
+            expected = self.outcome(self.state(seed), reference_hybrid_replace_services1)
+            actual = self.outcome(self.state(seed), Hybrid.replace_services1)
+            self.assertEqual(expected, actual)
+            reassigned += len(expected[0]) > 0
+        self.assertGreater(reassigned, 50)
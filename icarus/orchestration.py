@@ -12,6 +12,7 @@ user-provided settings.
 """
 from __future__ import division
 import time
+import math
 import collections
 import multiprocessing as mp
 import logging
@@ -19,12 +20,24 @@ import copy
 import sys
 import signal
 import traceback
+import functools
+import hashlib
+import shutil
+import tempfile
+import Queue
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import networkx as nx
 
 from icarus.execution import exec_experiment
+from icarus.execution.network import symmetrify_paths
 from icarus.registry import TOPOLOGY_FACTORY, COMPUTATION_PLACEMENT, CACHE_PLACEMENT, CONTENT_PLACEMENT, COMPUTATION_PLACEMENT, \
                             CACHE_POLICY, REPO_POLICY, WORKLOAD, DATA_COLLECTOR, STRATEGY
 from icarus.results import ResultSet
-from icarus.util import SequenceNumber, timestr
+from icarus.util import SequenceNumber, Tree, timestr
 
 
 __all__ = ['Orchestrator', 'run_scenario']
@@ -40,7 +53,7 @@ class Orchestrator(object):
     aggregate results.
     """
 
-    def __init__(self, settings, summary_freq=4):
+    def __init__(self, settings, summary_freq=4, results=None):
         """Constructor
 
         Parameters
@@ -50,9 +63,12 @@ class Orchestrator(object):
         summary_freq : int
             Frequency (in number of experiment) at which summary messages
             are displayed
+        results : ResultSet, optional
+            The result set to which results are added. If not given, results
+            are kept in memory in a new ResultSet
         """
         self.settings = settings
-        self.results = ResultSet()
+        self.results = results if results is not None else ResultSet()
         self.seq = SequenceNumber()
         self.exp_durations = collections.deque(maxlen=30)
         self.n_success = 0
@@ -77,58 +93,95 @@ class Orchestrator(object):
         This call is blocking, whether multiple processes are used or not. This
         methods returns only after all experiments are executed.
         """
-        # Create queue of experiment configurations
-        queue = collections.deque(self.settings.EXPERIMENT_QUEUE)
+        # Replications already in the result set, e.g. those of an
+        # interrupted campaign being resumed, are not run again
+        completed = collections.Counter(experiment_fingerprint(params)
+                                        for params, _ in self.results)
+        # Create queue of experiment configurations, one per replication
+        queue = collections.deque()
+        n_skipped = 0
+        for experiment in self.settings.EXPERIMENT_QUEUE:
+            fingerprint = experiment_fingerprint(experiment)
+            n_done = min(completed[fingerprint], self.settings.N_REPLICATIONS)
+            completed[fingerprint] -= n_done
+            n_skipped += n_done
+            queue.extend([experiment] * (self.settings.N_REPLICATIONS - n_done))
+        if n_skipped:
+            logger.info('Skipping %d experiments whose results are already available'
+                        % n_skipped)
         # Calculate number of experiments and number of processes
-        self.n_exp = len(queue) * self.settings.N_REPLICATIONS
+        self.n_exp = len(queue)
         self.n_proc = self.settings.N_PROCESSES \
                       if self.settings.PARALLEL_EXECUTION \
                       else 1
         logger.info('Starting simulations: %d experiments, %d process(es)'
                     % (self.n_exp, self.n_proc))
 
+        # Shortest paths are computed once per distinct topology and loaded
+        # by every experiment run on it
+        path_dir = tempfile.mkdtemp(prefix='icarus-paths-')
+        try:
+            path_tables = build_path_tables(queue, path_dir)
+            self._run_queue(queue, path_tables)
+        finally:
+            shutil.rmtree(path_dir, ignore_errors=True)
+
+        logger.info('END | Planned: %d, Completed: %d, Succeeded: %d, Failed: %d',
+                    self.n_exp, self.n_fail + self.n_success, self.n_success, self.n_fail)
+
+    def _run_queue(self, queue, path_tables):
+        """Run all experiments of the queue, with the shortest path tables
+        returned by `build_path_tables`
+        """
         if self.settings.PARALLEL_EXECUTION:
-            # This job queue is used only to keep track of which jobs have
-            # finished and which are still running. Currently this information
-            # is used only to handle keyboard interrupts correctly
-            job_queue = collections.deque()
-            # Schedule experiments from the queue
-            while queue:
-                experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
-                    job_queue.append(self.pool.apply_async(run_scenario,
-                            args=(self.settings, experiment,
-                                  self.seq.assign(), self.n_exp),
-                            callback=self.experiment_callback))
-            self.pool.close()
-            # This solution is probably not optimal, but at least makes
-            # KeyboardInterrupt work fine, which is crucial if launching the
-            # simulation remotely via screen.
-            # What happens here is that we keep waiting for possible
-            # KeyboardInterrupts till the last process terminates successfully.
-            # We may have to wait up to 5 seconds after the last process
-            # terminates before exiting, which is really negligible
+            # Jobs are submitted only as workers become free, so that the
+            # pool holds at most N_PROCESSES jobs, and results are collected
+            # as soon as each job completes, in whatever order that happens
+            jobs = ((experiment, path_tables.get(topology_key(experiment)))
+                    for experiment in queue)
+            done = Queue.Queue()
+            running = {}
+
+            def submit():
+                for experiment, path_table in jobs:
+                    seq = self.seq.assign()
+                    running[seq] = self.pool.apply_async(run_scenario,
+                            args=(self.settings, experiment, seq, self.n_exp,
+                                  path_table),
+                            callback=functools.partial(_put, done, seq))
+                    return True
+                return False
+
             try:
-                while job_queue:
-                    job = job_queue.popleft()
-                    while not job.ready():
-                        time.sleep(5)
+                while len(running) < self.n_proc and submit():
+                    pass
+                while running and not self._stop:
+                    try:
+                        seq, args = done.get(True, 5)
+                    except Queue.Empty:
+                        # Jobs failing in the pool itself never call back
+                        for seq, job in list(running.items()):
+                            if job.ready() and not job.successful():
+                                done.put((seq, None))
+                        continue
+                    if running.pop(seq, None) is None:
+                        continue
+                    self.experiment_callback(args)
+                    submit()
             except KeyboardInterrupt:
                 self.pool.terminate()
+            self.pool.close()
             self.pool.join()
 
         else:  # Single-process execution
             while queue:
                 experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
-                    self.experiment_callback(run_scenario(self.settings,
-                                            experiment, self.seq.assign(),
-                                            self.n_exp))
-                    if self._stop:
-                        self.stop()
-
-        logger.info('END | Planned: %d, Completed: %d, Succeeded: %d, Failed: %d',
-                    self.n_exp, self.n_fail + self.n_success, self.n_success, self.n_fail)
+                self.experiment_callback(run_scenario(self.settings,
+                                        experiment, self.seq.assign(),
+                                        self.n_exp,
+                                        path_tables.get(topology_key(experiment))))
+                if self._stop:
+                    self.stop()
 
 
     def experiment_callback(self, args):
@@ -162,7 +215,116 @@ class Orchestrator(object):
                         self.n_success, self.n_fail, n_scheduled, eta)
 
 
-def run_scenario(settings, params, curr_exp, n_exp):
+class ExperimentTimeout(Exception):
+    """Raised when an experiment runs longer than the JOB_TIMEOUT setting"""
+    pass
+
+
+def _put(queue, seq, args):
+    """Callback putting the results of job *seq* in *queue*"""
+    queue.put((seq, args))
+
+
+def _timeout(signum, frame):
+    raise ExperimentTimeout('Experiment exceeded its JOB_TIMEOUT')
+
+
+def experiment_fingerprint(params):
+    """Return a digest identifying the parameters of an experiment
+
+    Parameters
+    ----------
+    params : Tree
+        experiment parameters tree
+
+    Returns
+    -------
+    fingerprint : str
+        The digest
+    """
+    return hashlib.sha1(repr(sorted(Tree(params).paths().items()))).hexdigest()
+
+
+def topology_key(params):
+    """Return a key identifying the topology specification of an experiment
+
+    Parameters
+    ----------
+    params : Tree
+        experiment parameters tree
+
+    Returns
+    -------
+    key : str
+        The key
+    """
+    return repr(sorted(params['topology'].paths().items()))
+
+
+def topology_fingerprint(topology):
+    """Return a digest of the nodes, links and link weights of a topology,
+    in the order in which they are stored.
+
+    Two topologies with the same fingerprint have the same shortest paths.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+
+    Returns
+    -------
+    fingerprint : str
+        The digest
+    """
+    digest = hashlib.sha1(repr(topology.is_directed()))
+    digest.update(repr(list(topology.nodes())))
+    digest.update(repr(list(topology.edges(data='weight', default=1))))
+    return digest.hexdigest()
+
+
+def build_path_tables(queue, directory):
+    """Compute the shortest paths of each distinct topology of a queue of
+    experiments and store them in *directory*
+
+    Parameters
+    ----------
+    queue : iterable
+        The experiment parameters trees
+    directory : str
+        The directory where the path tables are stored
+
+    Returns
+    -------
+    path_tables : dict
+        Dictionary mapping the `topology_key` of each topology whose paths
+        were computed to a (fingerprint, file name) tuple, to be passed to
+        `run_scenario`
+    """
+    path_tables = {}
+    for params in queue:
+        key = topology_key(params)
+        if key in path_tables:
+            continue
+        topology_spec = copy.deepcopy(params['topology'])
+        topology_name = topology_spec.pop('name')
+        try:
+            topology = TOPOLOGY_FACTORY[topology_name](**topology_spec)
+            shortest_path = symmetrify_paths(nx.all_pairs_dijkstra_path(topology))
+        except Exception:
+            logger.debug('Could not compute the shortest paths of topology %s:\n%s'
+                         % (topology_name, traceback.format_exc()))
+            path_tables[key] = None
+            continue
+        path_file = tempfile.NamedTemporaryFile(dir=directory, suffix='.pickle',
+                                                delete=False)
+        with path_file:
+            pickle.dump(shortest_path, path_file, pickle.HIGHEST_PROTOCOL)
+        path_tables[key] = (topology_fingerprint(topology), path_file.name)
+    return path_tables
+
+
+def run_scenario(settings, params, curr_exp, n_exp, path_table=None):
     """Run a single scenario experiment
 
     Parameters
@@ -175,6 +337,13 @@ def run_scenario(settings, params, curr_exp, n_exp):
         sequence number of the experiment
     n_exp : int
         Number of scheduled experiments
+    path_table : tuple, optional
+        A (fingerprint, file name) tuple returned by `build_path_tables`. If
+        the topology built for the experiment has the given fingerprint, its
+        shortest paths are loaded from the file rather than recomputed
+
+    If the settings have a JOB_TIMEOUT, the experiment is interrupted and
+    reported as failed once it runs for longer than JOB_TIMEOUT seconds.
 
     Returns
     -------
@@ -185,6 +354,11 @@ def run_scenario(settings, params, curr_exp, n_exp):
         integer expressing the wall-clock duration of the experiment (in
         seconds)
     """
+    timeout = settings.JOB_TIMEOUT if 'JOB_TIMEOUT' in settings else None
+    if timeout:
+        # Interrupt the experiment once it exceeds its time budget
+        alarm_handler = signal.signal(signal.SIGALRM, _timeout)
+        signal.alarm(int(math.ceil(timeout)))
     try:
         start_time = time.time()
         proc_name = mp.current_process().name
@@ -204,6 +378,10 @@ def run_scenario(settings, params, curr_exp, n_exp):
                          % topology_name)
             return None
         topology = TOPOLOGY_FACTORY[topology_name](**topology_spec)
+        shortest_path = None
+        if path_table is not None and topology_fingerprint(topology) == path_table[0]:
+            with open(path_table[1], 'rb') as path_file:
+                shortest_path = pickle.load(path_file)
 
         workload_spec = tree['workload']
         workload_name = workload_spec.pop('name')
@@ -314,6 +492,9 @@ def run_scenario(settings, params, curr_exp, n_exp):
         # Configuration parameters of network model
         netconf = tree['netconf']
 
+        # Cadence of intermediate snapshots of the collectors (optional)
+        snapshot = tree['snapshot'] if 'snapshot' in tree else None
+
         # Text description of the scenario run to print on screen
         scenario = tree['desc'] if 'desc' in tree else "Description N/A"
 
@@ -329,7 +510,8 @@ def run_scenario(settings, params, curr_exp, n_exp):
         #         collectors[m] = dict(collect_spec)
 
         logger.info('Experiment %d/%d | Start simulation', curr_exp, n_exp)
-        results = exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_policy, collectors, warmup_strategy, sched_policy)
+        results = exec_experiment(topology, workload, netconf, strategy, cache_policy, repo_policy, collectors, warmup_strategy, sched_policy, snapshot,
+                                  shortest_path)
 
         duration = time.time() - start_time
         logger.info('Experiment %d/%d | End simulation | Duration %s.',
@@ -344,3 +526,7 @@ def run_scenario(settings, params, curr_exp, n_exp):
         logger.error('Experiment %d/%d | Failed | %s: %s\n%s',
                      curr_exp, n_exp, err_type, err_message,
                      traceback.format_exc())
+    finally:
+        if timeout:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, alarm_handler)
@@ -14,6 +14,7 @@ import matplotlib.pyplot as plt
 
 from icarus.util import Tree, step_cdf
 from icarus.tools import means_confidence_interval
+from icarus.results.readwrite import IndexedResultSet
 
 
 __all__ = ['plot_lines', 'plot_bar_chart', 'plot_cdf']
@@ -161,6 +162,8 @@ def plot_lines(resultset, desc, filename, plotdir):
         plt.yscale(desc['yscale'])
     if 'filter' not in desc or desc['filter'] is None:
         desc['filter'] = {}
+    if not isinstance(resultset, IndexedResultSet):
+        resultset = IndexedResultSet(resultset)
     xvals = sorted(desc['xvals'])
     if 'xticks' in desc:
         ax1.set_xticks(desc['xticks'])
@@ -347,6 +350,8 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
         plt.ylabel(desc['ylabel'])
     if 'filter' not in desc or desc['filter'] is None:
         desc['filter'] = {}
+    if not isinstance(resultset, IndexedResultSet):
+        resultset = IndexedResultSet(resultset)
     plot_empty = desc['plotempty'] if 'plotempty' in desc else True
 
     ymetrics = desc['ymetrics']
@@ -550,6 +555,8 @@ def plot_cdf(resultset, desc, filename, plotdir):
         plt.yscale(desc['yscale'])
     if 'filter' not in desc or desc['filter'] is None:
         desc['filter'] = {}
+    if not isinstance(resultset, IndexedResultSet):
+        resultset = IndexedResultSet(resultset)
     step = desc['step'] if 'step' in desc else True
     plot_empty = desc['plotempty'] if 'plotempty' in desc else True
     ymetrics = desc['ymetrics']
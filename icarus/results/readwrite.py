@@ -3,10 +3,16 @@
 import collections
 import copy
 import json
+import logging
+import os
+import struct
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
+
+import numpy as np
+
 from icarus.util import Tree
 from icarus.registry import register_results_reader, register_results_writer
 import pprint
@@ -18,9 +24,22 @@ __all__ = [
     'write_results_pickle',
     'read_results_pickle',
     'write_results_txt',
-    'read_results_txt'
+    'read_results_txt',
+    'StreamResultSet',
+    'IndexedResultSet',
+    'write_results_stream',
+    'read_results_stream'
            ]
 
+logger = logging.getLogger('results')
+
+# Header of each record of a results stream: the length of the pickled record
+_FRAME = struct.Struct('<Q')
+
+# Types of parameter values that are hashable and compared by value, which
+# IndexedResultSet can therefore look up in a hash table
+_SCALARS = (type(None), bool, int, long, float, str, unicode)
+
 class ResultSet(object):
     """This class can be used to store results from different experiments,
     accessed and filtered.
@@ -180,6 +199,374 @@ class ResultSet(object):
                 filtered_resultset.add(parameters, results)
         return filtered_resultset
 
+
+
+class StreamResultSet(ResultSet):
+    """Result set stored in a results stream file rather than in memory.
+
+    A results stream is a sequence of records, one per experiment, each
+    being a pickled (parameters, results) tuple preceded by its length.
+    Records are appended to the file as soon as they are added, so that
+    results of completed experiments are not lost if the simulation is
+    interrupted, and they are read back lazily, one at a time, when the
+    result set is iterated or filtered. An incomplete record at the end of
+    the file, left by a crash during a write, is ignored when reading and
+    truncated before the next record is appended.
+    """
+
+    def __init__(self, path, attr=None, overwrite=False):
+        """Constructor
+
+        Parameters
+        ----------
+        path : str
+            The path of the results stream file
+        attr : dict, optional
+            Dictionary of common attributes to all experiments
+        overwrite : bool, optional
+            If True, the records already in the file are discarded
+        """
+        super(StreamResultSet, self).__init__(attr)
+        self.path = path
+        if overwrite or not os.path.exists(path):
+            open(path, 'wb').close()
+            self._end = 0
+        else:
+            # Found on the first append, so that reading does not modify
+            # the file
+            self._end = None
+        self._len = None
+
+    def __len__(self):
+        if self._len is None:
+            self._len = sum(1 for _ in self._frames(load=False))
+        return self._len
+
+    def __iter__(self):
+        return self._frames()
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        for j, result in enumerate(self):
+            if j == i:
+                return result
+        raise IndexError('result index out of range')
+
+    def __add__(self, resultset):
+        if self.attr != resultset.attr:
+            raise ValueError('The resultsets cannot be merged because '
+                             'they have different global attributes')
+        rs = ResultSet(copy.deepcopy(self.attr))
+        for i in self:
+            rs.add(*i)
+        for i in resultset:
+            rs.add(*i)
+        return rs
+
+    def _frames(self, load=True, offsets=False):
+        """Iterate over the records of the file, unpickling them only if
+        *load* is True and yielding them along with their offset in the file
+        if *offsets* is True"""
+        with open(self.path, 'rb') as stream_file:
+            while True:
+                offset = stream_file.tell()
+                header = stream_file.read(_FRAME.size)
+                if len(header) < _FRAME.size:
+                    break
+                size = _FRAME.unpack(header)[0]
+                if not load:
+                    stream_file.seek(size, os.SEEK_CUR)
+                    if stream_file.tell() > os.fstat(stream_file.fileno()).st_size:
+                        break
+                    yield None
+                    continue
+                record = stream_file.read(size)
+                if len(record) < size:
+                    break
+                yield (offset, pickle.loads(record)) if offsets \
+                    else pickle.loads(record)
+            if header:
+                logger.warning('Ignoring incomplete record at the end of %s'
+                               % self.path)
+
+    def _truncate(self):
+        """Truncate the file at the end of its last complete record and
+        return its new size"""
+        with open(self.path, 'r+b') as stream_file:
+            size = os.fstat(stream_file.fileno()).st_size
+            end = 0
+            while end + _FRAME.size <= size:
+                stream_file.seek(end)
+                record_end = end + _FRAME.size + \
+                    _FRAME.unpack(stream_file.read(_FRAME.size))[0]
+                if record_end > size:
+                    break
+                end = record_end
+            if end < size:
+                logger.warning('Truncating incomplete record at the end of %s'
+                               % self.path)
+                stream_file.truncate(end)
+        return end
+
+    def _read(self, offset):
+        """Read the record starting at *offset* in the file"""
+        with open(self.path, 'rb') as stream_file:
+            stream_file.seek(offset)
+            size = _FRAME.unpack(stream_file.read(_FRAME.size))[0]
+            return pickle.loads(stream_file.read(size))
+
+    def add(self, parameters, results):
+        """Add a result to the result set, appending it to the file.
+
+        Parameters
+        ----------
+        parameters : Tree
+            Tree of experiment parameters
+        results : Tree
+            Tree of experiment results
+
+        Returns
+        -------
+        offset : int
+            The offset of the record in the file
+        """
+        if not isinstance(parameters, Tree):
+            parameters = Tree(parameters)
+        if not isinstance(results, Tree):
+            results = Tree(results)
+        record = pickle.dumps((parameters, results), pickle.HIGHEST_PROTOCOL)
+        if self._end is None:
+            self._end = self._truncate()
+        offset = self._end
+        with open(self.path, 'r+b') as stream_file:
+            # Overwrite anything left after the last complete record by a
+            # write that failed
+            stream_file.seek(offset)
+            stream_file.truncate()
+            stream_file.write(_FRAME.pack(len(record)) + record)
+            stream_file.flush()
+            os.fsync(stream_file.fileno())
+        self._end = offset + _FRAME.size + len(record)
+        if self._len is not None:
+            self._len += 1
+        return offset
+
+    def dump(self):
+        return list(self)
+
+    def filter(self, condition):
+        """Return subset of results matching specific conditions
+
+        Records are read one at a time and only the matching ones are kept
+        in memory.
+
+        Parameters
+        ----------
+        condition : dict
+            Dictionary listing all parameters and values to be matched in the
+            results set. Each parameter, i.e., each key of the dictionary must
+            be an iterable object containing the path in the parameters tree
+            to the required parameter
+
+        Returns
+        -------
+        filtered_results : ResultSet
+            List of 2-tuples of filtered results, where the first element is a
+            tree of all experiment parameters and the second value is
+            a tree with experiment results.
+        """
+        filtered_resultset = ResultSet()
+        for parameters, results in self:
+            if parameters.match(condition):
+                filtered_resultset.add(parameters, results)
+        return filtered_resultset
+
+
+class IndexedResultSet(ResultSet):
+    """Result set indexing the parameters of its experiments, so that they
+    can be filtered quickly.
+
+    Parameter trees are flattened into columns, one per parameter path, in
+    which each experiment is stored as the integer code of its value. A
+    filter condition is then compared only against the distinct values of
+    each column it refers to and experiments are selected with a vectorised
+    mask over the codes, instead of matching the parameter tree of every
+    experiment. This makes the repeated filtering done by plotting functions
+    fast even on large result sets.
+
+    If built from a `StreamResultSet`, only the parameters of experiments are
+    kept in memory while their results are read from the results stream file
+    when they are accessed.
+    """
+
+    def __init__(self, resultset=None, attr=None):
+        """Constructor
+
+        Parameters
+        ----------
+        resultset : ResultSet, optional
+            The result set whose results are indexed. If a `StreamResultSet`,
+            results added to this result set are also appended to its file
+        attr : dict, optional
+            Dictionary of common attributes to all experiments. If not given,
+            those of *resultset* are used
+        """
+        if attr is None and resultset is not None:
+            attr = copy.deepcopy(resultset.attr)
+        super(IndexedResultSet, self).__init__(attr)
+        # Results of experiments if in memory, otherwise their offsets in
+        # the stream file
+        self._results = []
+        self._stream = resultset if isinstance(resultset, StreamResultSet) else None
+        self._params = []
+        # Map each parameter path to the codes of the values of experiments
+        self._columns = {}
+        # Map each parameter path to its distinct values, indexed by code
+        self._values = {}
+        # Map each parameter path to the codes of its hashable values
+        self._codes = {}
+        # Columns converted to arrays since the last experiment was added
+        self._arrays = {}
+        if self._stream is not None:
+            for offset, (parameters, _) in self._stream._frames(offsets=True):
+                self._results.append(offset)
+                self._index(parameters)
+        elif resultset is not None:
+            for parameters, results in resultset:
+                self.add(parameters, results)
+
+    def __len__(self):
+        return len(self._params)
+
+    def __iter__(self):
+        if self._stream is not None:
+            return iter(self._stream)
+        return iter(self._results)
+
+    def __getitem__(self, i):
+        if self._stream is not None:
+            return self._stream._read(self._results[i])
+        return self._results[i]
+
+    def __add__(self, resultset):
+        if self.attr != resultset.attr:
+            raise ValueError('The resultsets cannot be merged because '
+                             'they have different global attributes')
+        rs = IndexedResultSet(attr=copy.deepcopy(self.attr))
+        for i in self:
+            rs.add(*i)
+        for i in resultset:
+            rs.add(*i)
+        return rs
+
+    def _index(self, parameters):
+        """Add the parameters of an experiment to the columns"""
+        row = len(self._params)
+        self._params.append(parameters)
+        for path, value in parameters.paths().items():
+            if path not in self._columns:
+                # Experiments preceding the first one with this parameter
+                # do not have it, which is what the None value stands for
+                self._columns[path] = [0] * row
+                self._values[path] = [None]
+                self._codes[path] = {None: 0}
+            values = self._values[path]
+            codes = self._codes[path]
+            if isinstance(value, _SCALARS):
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+            else:
+                code = len(values)
+                values.append(value)
+            self._columns[path].append(code)
+        for column in self._columns.values():
+            if len(column) == row:
+                column.append(0)
+        self._arrays.clear()
+
+    def _column(self, path):
+        """Return the codes of the values of a parameter as an array"""
+        if path not in self._arrays:
+            self._arrays[path] = np.array(self._columns[path], dtype=int)
+        return self._arrays[path]
+
+    def _mask(self, condition):
+        """Return a boolean array selecting the experiments matching a
+        condition"""
+        mask = np.ones(len(self), dtype=bool)
+        for path, val in Tree(condition).paths().items():
+            if path in self._columns:
+                values = self._values[path]
+                codes = self._codes[path]
+                if isinstance(val, _SCALARS) and len(values) == len(codes):
+                    # All values of the column are in its hash table
+                    code = codes.get(val)
+                    if code is None or not values[code] == val:
+                        return np.zeros(len(self), dtype=bool)
+                    mask &= self._column(path) == code
+                else:
+                    mask &= np.in1d(self._column(path),
+                                    [code for code, value in enumerate(values)
+                                     if value == val])
+            elif any(p[:len(path)] == path for p in self._columns):
+                # The condition refers to a subtree of parameters
+                mask &= np.array([parameters.getval(path) == val
+                                  for parameters in self._params], dtype=bool)
+            elif not None == val:
+                return np.zeros(len(self), dtype=bool)
+        return mask
+
+    def add(self, parameters, results):
+        """Add a result to the result set.
+
+        Parameters
+        ----------
+        parameters : Tree
+            Tree of experiment parameters
+        results : Tree
+            Tree of experiment results
+        """
+        if not isinstance(parameters, Tree):
+            parameters = Tree(parameters)
+        if not isinstance(results, Tree):
+            results = Tree(results)
+        if self._stream is not None:
+            self._results.append(self._stream.add(parameters, results))
+        else:
+            self._results.append((parameters, results))
+        self._index(parameters)
+
+    def dump(self):
+        return list(self)
+
+    def filter(self, condition):
+        """Return subset of results matching specific conditions
+
+        Parameters
+        ----------
+        condition : dict
+            Dictionary listing all parameters and values to be matched in the
+            results set. Each parameter, i.e., each key of the dictionary must
+            be an iterable object containing the path in the parameters tree
+            to the required parameter
+
+        Returns
+        -------
+        filtered_results : ResultSet
+            List of 2-tuples of filtered results, where the first element is a
+            tree of all experiment parameters and the second value is
+            a tree with experiment results.
+        """
+        filtered_resultset = ResultSet()
+        for i in np.flatnonzero(self._mask(condition)):
+            filtered_resultset.add(*self[i])
+        return filtered_resultset
+
+
+
 # TODO: THIS is where results are written to pickle!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 @register_results_writer('PICKLE')
 def write_results_pickle(results, path):
@@ -250,3 +637,47 @@ def read_results_txt(path):
         lines = txt_file.read()
         txt_file.close()
         return eval(lines)
+
+
+@register_results_writer('STREAM')
+def write_results_stream(results, path):
+    """Write a resultset to a results stream file
+
+    If *results* is a `StreamResultSet` stored at *path*, its records are
+    already in the file and nothing is written.
+
+    Parameters
+    ----------
+    results : ResultSet
+        The set of results
+    path : str
+        The path of the file to which write
+    """
+    if isinstance(results, StreamResultSet) and \
+            os.path.abspath(results.path) == os.path.abspath(path):
+        return
+    stream = StreamResultSet(path, overwrite=True)
+    for parameters, results in results:
+        stream.add(parameters, results)
+
+
+@register_results_reader('STREAM')
+def read_results_stream(path):
+    """Reads a resultset from a results stream file.
+
+    Records are not loaded in memory but read lazily whenever the returned
+    result set is iterated or filtered.
+
+    Parameters
+    ----------
+    path : str
+        The file path from which results are read
+
+    Returns
+    -------
+    results : StreamResultSet
+        The read result set
+    """
+    if not os.path.exists(path):
+        raise IOError('No such results stream: %s' % path)
+    return StreamResultSet(path)
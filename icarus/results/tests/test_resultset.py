@@ -1,6 +1,12 @@
+import os
+import random
+import shutil
+import tempfile
 import unittest
 
-from icarus.results import ResultSet
+from icarus.results import ResultSet, StreamResultSet, IndexedResultSet, \
+    read_results_stream, write_results_stream
+from icarus.util import AnyValue
 
 class TestResultSet(unittest.TestCase):
 
@@ -54,3 +60,118 @@ class TestResultSet(unittest.TestCase):
         rs.add(a, b)
         rs.add(b, a)
         self.assertEqual([[a, b], [b, a]], eval(rs.json()))
+
+
+class TestStreamResultSet(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'results.stream')
+        self.cond_a = {'alpha': 1, 'beta': 2}
+        self.cond_b = {'alpha': -1, 'beta': 2}
+        self.metric = {'m1': 1, 'm2': 2}
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_append_and_read(self):
+        rs = StreamResultSet(self.path)
+        rs.add(self.cond_a, self.metric)
+        rs.add(self.cond_b, self.metric)
+        read_rs = read_results_stream(self.path)
+        self.assertEqual(2, len(read_rs))
+        self.assertEqual(self.cond_b, read_rs[-1][0])
+        self.assertEqual(self.metric, read_rs[0][1])
+        self.assertEqual(1, len(read_rs.filter({'alpha': -1})))
+        read_rs.add(self.cond_a, self.metric)
+        self.assertEqual(3, len(StreamResultSet(self.path)))
+
+    def test_incomplete_record(self):
+        rs = StreamResultSet(self.path)
+        rs.add(self.cond_a, self.metric)
+        rs.add(self.cond_b, self.metric)
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        read_rs = read_results_stream(self.path)
+        self.assertEqual(1, len(read_rs))
+        self.assertEqual([self.cond_a], [p for p, _ in read_rs])
+
+    def test_append_after_incomplete_record(self):
+        rs = StreamResultSet(self.path)
+        rs.add(self.cond_a, self.metric)
+        rs.add(self.cond_b, self.metric)
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        rs = StreamResultSet(self.path)
+        rs.add(self.cond_b, self.metric)
+        self.assertEqual([(self.cond_a, self.metric), (self.cond_b, self.metric)],
+                         list(rs))
+        self.assertEqual(2, len(StreamResultSet(self.path)))
+
+    def test_write(self):
+        rs = ResultSet()
+        rs.add(self.cond_a, self.metric)
+        write_results_stream(rs, self.path)
+        write_results_stream(read_results_stream(self.path), self.path)
+        self.assertEqual(rs.dump(), read_results_stream(self.path).dump())
+
+
+class TestIndexedResultSet(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'results.stream')
+        rnd = random.Random(0)
+        self.rs = ResultSet()
+        for i in range(200):
+            params = {'alpha': rnd.choice([0.6, 0.8, 1]),
+                      'strategy': {'name': rnd.choice(['LCE', 'NO_CACHE'])},
+                      'list': [rnd.randint(0, 1)]}
+            if rnd.random() < 0.5:
+                params['beta'] = rnd.choice([1, 2])
+            if rnd.random() < 0.1:
+                params['alpha'] = AnyValue()
+            self.rs.add(params, {'m': i})
+        self.conditions = [{}, {'alpha': 1}, {'alpha': 1.0, 'beta': 2},
+                           {'beta': None}, {'gamma': None}, {'gamma': 1},
+                           {'strategy': {'name': 'LCE'}, 'alpha': 0.6},
+                           {'list': [1]}, {'strategy': 'LCE'},
+                           {'alpha': AnyValue()}]
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertFiltersEqual(self, expected, actual):
+        for condition in self.conditions:
+            self.assertEqual(expected.filter(condition).dump(),
+                             actual.filter(condition).dump())
+
+    def test_filter_matches_resultset(self):
+        indexed_rs = IndexedResultSet(self.rs)
+        self.assertEqual(len(self.rs), len(indexed_rs))
+        self.assertEqual(self.rs[3], indexed_rs[3])
+        self.assertFiltersEqual(self.rs, indexed_rs)
+        indexed_rs.add({'gamma': 1}, {'m': -1})
+        self.rs.add({'gamma': 1}, {'m': -1})
+        self.assertFiltersEqual(self.rs, indexed_rs)
+
+    def test_stream(self):
+        write_results_stream(self.rs, self.path)
+        indexed_rs = IndexedResultSet(read_results_stream(self.path))
+        self.assertEqual(self.rs.dump(), indexed_rs.dump())
+        self.assertEqual(self.rs[-1], indexed_rs[-1])
+        self.assertFiltersEqual(self.rs, indexed_rs)
+        indexed_rs.add({'gamma': 1}, {'m': -1})
+        self.assertEqual(({'gamma': 1}, {'m': -1}), indexed_rs[-1])
+        self.assertEqual(len(self.rs) + 1, len(read_results_stream(self.path)))
+
+    def test_stream_append_after_incomplete_record(self):
+        write_results_stream(self.rs, self.path)
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        indexed_rs = IndexedResultSet(read_results_stream(self.path))
+        self.assertEqual(len(self.rs) - 1, len(indexed_rs))
+        indexed_rs.add({'gamma': 1}, {'m': -1})
+        self.assertEqual(({'gamma': 1}, {'m': -1}), indexed_rs[-1])
+        self.assertEqual(self.rs[-2], indexed_rs[-2])
+        self.assertEqual(len(self.rs), len(list(read_results_stream(self.path))))
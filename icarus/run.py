@@ -10,8 +10,9 @@ import logging
 import multiprocessing as mp
 
 from icarus.util import Settings, config_logging
-from icarus.registry import RESULTS_WRITER
+from icarus.registry import RESULTS_READER, RESULTS_WRITER
 from icarus.orchestration import Orchestrator
+from icarus.results import StreamResultSet
 
 
 __all__ = ['run', 'handler']
@@ -78,7 +79,7 @@ def _validate_settings(settings, freeze=True):
         settings.freeze()
 
 
-def run(config_file, output, config_override):
+def run(config_file, output, config_override, resume=False):
     """
     Run function. It starts the simulator.
     experiments
@@ -91,6 +92,9 @@ def run(config_file, output, config_override):
         The file name where results will be saved
     config_override : dict, optional
         Configuration parameters overriding parameters in the file
+    resume : bool, optional
+        If True and the output file exists, the results it contains are kept
+        and the experiments they belong to are not run again
     """
     # Read settings from file and save them in icarus.conf.settings
     settings = Settings()
@@ -107,7 +111,16 @@ def run(config_file, output, config_override):
     # Validate settings
     _validate_settings(settings, freeze=True)
     # set up orchestration
-    orch = Orchestrator(settings)
+    # Streamed results are appended to the output file as experiments complete
+    if resume and os.path.exists(output):
+        results = RESULTS_READER[settings.RESULTS_FORMAT](output)
+        logger.info('Resuming from %d results saved in %s'
+                    % (len(results), os.path.abspath(output)))
+    elif settings.RESULTS_FORMAT == 'STREAM':
+        results = StreamResultSet(output, overwrite=True)
+    else:
+        results = None
+    orch = Orchestrator(settings, results=results)
     for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT, signal.SIGABRT):
         signal.signal(sig, functools.partial(handler, settings, orch, output))
     logger.info('Launching orchestrator')
@@ -13,6 +13,7 @@ import collections
 
 from fnss.util import random_from_pdf
 from icarus.registry import register_content_placement
+from icarus.util import Message
 
 
 __all__ = ['uniform_content_placement', 'uniform_repo_content_placement',
@@ -63,7 +64,7 @@ def apply_labels_association(association, data):
     for label, contents in association.items():
         for c in contents:
             if label not in data[c]['labels']:
-                data[c]['labels'].append(label)
+                data[c]['labels'] = data[c]['labels'] + [label]
     return data
 
 def get_sources(topology):
@@ -256,7 +257,7 @@ def weighted_repo_content_placement(topology, contents, freshness_per, shelf_lif
             if placed_data.has_key(contents[c]['content']):
                 placed_data[contents[c]['content']].update(freshness_per=freshness_per)
             else:
-                placed_data[contents[c]['content']] = dict()
+                placed_data[contents[c]['content']] = Message()
                 placed_data[contents[c]['content']]['freshness_per'] = freshness_per
         if shelf_life is not None:
             placed_data[contents[c]['content']].update(shelf_life=shelf_life)
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
+from __future__ import division
+import random
 import unittest
 
+from fnss.util import random_from_pdf
+
 import icarus.scenarios as workload
+from icarus.scenarios.workload import LabelContentIndex, RequestDraws
+from icarus.tools import TruncatedZipfDist
 
 
 class TestYCBS(unittest.TestCase):
@@ -70,3 +76,85 @@ class TestYCBS(unittest.TestCase):
         self.assertTrue(ev_3['log'])
         self.assertIn(ev_3['item'], range(1, n_items + 1))
         self.assertEqual(ev_3['op'], "READ")
+
+
+class TestLabelContentIndex(unittest.TestCase):
+
+    @staticmethod
+    def scan(data, labels):
+        content = None
+        for c in data:
+            if all(label in labels for label in data[c]['labels']):
+                content = data[c]['content']
+        return content
+
+    def test_matches_scan(self):
+        rnd = random.Random(0)
+        all_labels = ['a', 'b', 'c', 'd', 'e']
+        data = {}
+        for c in range(50):
+            data[c] = {'content': c,
+                       'labels': rnd.sample(all_labels, rnd.randint(1, 3))}
+        index = LabelContentIndex(data)
+        for _ in range(500):
+            labels = rnd.sample(all_labels, rnd.randint(1, 4))
+            self.assertEqual(self.scan(data, labels), index.match(labels))
+            c = rnd.randrange(50)
+            data[c]['labels'] = labels
+            index.update(c)
+
+    def test_no_match(self):
+        data = {0: {'content': 0, 'labels': ['a']},
+                1: {'content': 1, 'labels': ['a', 'b']}}
+        index = LabelContentIndex(data)
+        self.assertIsNone(index.match(['b']))
+        self.assertEqual(1, index.match(['b', 'a']))
+        data[1]['labels'] = ['c']
+        self.assertEqual(0, index.match(['a', 'b']))
+
+
+class TestRequestDraws(unittest.TestCase):
+
+    def test_unbatched_uses_random(self):
+        dist = TruncatedZipfDist(0.8, 10)
+        pdf = {'a': 0.2, 'b': 0.5, 'c': 0.3}
+        draws = RequestDraws()
+        random.seed(1)
+        values = [draws.expovariate(2.0), draws.choice('xyz'),
+                  draws.rv(dist), draws.from_pdf(pdf)]
+        random.seed(1)
+        expected = [random.expovariate(2.0), random.choice('xyz'),
+                    dist.rv(), random_from_pdf(pdf)]
+        self.assertEqual(expected, values)
+
+    def test_batched_reproducible(self):
+        dist = TruncatedZipfDist(0.8, 10)
+        pdf = {'a': 0.2, 'b': 0.5, 'c': 0.3}
+
+        def sample(draws):
+            return [(draws.expovariate(2.0), draws.choice('xyz'),
+                     draws.rv(dist), draws.from_pdf(pdf)) for _ in range(25)]
+        values = sample(RequestDraws(3, 8))
+        self.assertEqual(values, sample(RequestDraws(3, 8)))
+        self.assertNotEqual(values, sample(RequestDraws(4, 8)))
+        for t, choice, rv, key in values:
+            self.assertGreater(t, 0)
+            self.assertIn(choice, 'xyz')
+            self.assertIn(rv, range(1, 11))
+            self.assertIn(key, pdf)
+
+    def test_batched_distribution(self):
+        dist = TruncatedZipfDist(1.0, 5)
+        pdf = {'a': 0.1, 'b': 0.9}
+        draws = RequestDraws(0, 1000)
+        n = 20000
+        rvs = [draws.rv(dist) for _ in range(n)]
+        for i in range(5):
+            self.assertAlmostEqual(dist.pdf[i], rvs.count(i + 1) / n, delta=0.02)
+        keys = [draws.from_pdf(pdf) for _ in range(n)]
+        self.assertAlmostEqual(0.1, keys.count('a') / n, delta=0.02)
+        mean = sum(draws.expovariate(4.0) for _ in range(n)) / n
+        self.assertAlmostEqual(0.25, mean, delta=0.02)
+
+    def test_invalid_batch_size(self):
+        self.assertRaises(ValueError, RequestDraws, 0, 0)
@@ -29,6 +29,7 @@ import heapq
 from fnss.util import random_from_pdf
 from icarus.tools import TruncatedZipfDist
 from icarus.registry import register_workload
+from icarus.util import Message, label_mask
 from collections import Counter
 
 __all__ = [
@@ -51,6 +52,182 @@ TASK_COMPLETE = 2
 STORE = 3
 
 
+class RequestDraws(object):
+    """Random variates used by workloads to generate requests.
+
+    Without a batch size, every draw is delegated to the `random` module (or
+    to the distribution's own `rv` method), exactly as the workloads always
+    did. With a batch size, each kind of draw is served from its own NumPy
+    stream, pre-drawn in blocks of *batch_size* values. Each stream is seeded
+    from *seed* in the order streams are first used, so a given seed always
+    yields the same requests.
+
+    Parameters
+    ----------
+    seed : int, optional
+        The seed of the batched streams
+    batch_size : int, optional
+        The number of values pre-drawn at a time. If None, values are drawn
+        one at a time from the `random` module
+    """
+
+    def __init__(self, seed=None, batch_size=None):
+        if batch_size is not None and batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.batch_size = batch_size
+        if batch_size is not None:
+            self.seeds = np.random.RandomState(seed)
+        self.streams = {}
+        self.pdfs = {}
+
+    def _next(self, key, draw):
+        """Return the next value of stream *key*, pre-drawing a block of
+        values with *draw* if the stream is exhausted"""
+        if key not in self.streams:
+            self.streams[key] = [np.random.RandomState(
+                self.seeds.randint(2 ** 32 - 1)), iter(())]
+        stream = self.streams[key]
+        try:
+            return next(stream[1])
+        except StopIteration:
+            stream[1] = iter(draw(stream[0], self.batch_size).tolist())
+            return next(stream[1])
+
+    def expovariate(self, rate):
+        """Return an exponentially distributed inter-arrival time"""
+        if self.batch_size is None:
+            return random.expovariate(rate)
+        return self._next(('expovariate', rate),
+                          lambda rs, n: rs.exponential(1.0 / rate, n))
+
+    def choice(self, seq):
+        """Return a uniformly chosen element of *seq*"""
+        if self.batch_size is None:
+            return random.choice(seq)
+        return seq[self._next(('choice', len(seq)),
+                              lambda rs, n: rs.randint(0, len(seq), n))]
+
+    def rv(self, dist):
+        """Return a value of *dist*, a `DiscreteDist` instance"""
+        if self.batch_size is None:
+            return dist.rv()
+        cdf = dist.cdf
+        return self._next(('rv', id(dist)), lambda rs, n:
+                          np.searchsorted(cdf, rs.random_sample(n)) + 1)
+
+    def from_pdf(self, pdf):
+        """Return a key of *pdf*, as `fnss.util.random_from_pdf` does.
+
+        In batched mode, *pdf* must not change once it has been used.
+        """
+        if self.batch_size is None:
+            return random_from_pdf(pdf)
+        if id(pdf) not in self.pdfs:
+            self.pdfs[id(pdf)] = (list(pdf.keys()),
+                                  np.cumsum(list(pdf.values())))
+        keys, cdf = self.pdfs[id(pdf)]
+        pos = self._next(('from_pdf', id(pdf)), lambda rs, n: np.minimum(
+            np.searchsorted(cdf, rs.random_sample(n), side='right'),
+            len(keys) - 1))
+        return keys[pos]
+
+
+class LabelContentIndex(object):
+    """Index of workload contents by their label sets.
+
+    It returns, for a set of request labels, the last content (in the
+    iteration order of the workload data) whose labels are all among the
+    request labels, which is what a full scan of the data would return.
+
+    Contents are filed under the bitmask of the labels they had when indexed,
+    as interned in `LABELS`. Workloads must call `update` after changing the
+    labels of a content. Label changes made elsewhere are picked up when a
+    stale content is matched.
+
+    Parameters
+    ----------
+    data : dict
+        The workload data, mapping content keys to content dictionaries
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.keys = list(data)
+        self.position = {c: i for i, c in enumerate(self.keys)}
+        self.filed = {}
+        self.buckets = {}
+        for c in self.keys:
+            self.update(c)
+
+    def update(self, c):
+        """File content *c* under its current labels
+
+        Parameters
+        ----------
+        c : any hashable type
+            The key of the content in the workload data
+        """
+        labels = label_mask(self.data[c]['labels'])
+        if self.filed.get(c) == labels:
+            return
+        self.filed[c] = labels
+        if labels not in self.buckets:
+            self.buckets[labels] = []
+        heapq.heappush(self.buckets[labels], -self.position[c])
+
+    def _last(self, labels):
+        """Return the position of the last content filed under *labels*"""
+        bucket = self.buckets.get(labels)
+        while bucket:
+            c = self.keys[-bucket[0]]
+            if self.filed[c] == labels:
+                return -bucket[0]
+            heapq.heappop(bucket)
+        return None
+
+    @staticmethod
+    def _submasks(mask):
+        """Iterate over all the bitmasks whose bits are all set in *mask*"""
+        sub = mask
+        while True:
+            yield sub
+            if sub == 0:
+                return
+            sub = (sub - 1) & mask
+
+    def match(self, labels):
+        """Return the last content whose labels are all in *labels*
+
+        Parameters
+        ----------
+        labels : iterable
+            The request labels
+
+        Returns
+        -------
+        content : any hashable type
+            The 'content' value of the matching content, or None if no content
+            matches
+        """
+        labels = label_mask(labels)
+        while True:
+            if 2 ** bin(labels).count('1') <= len(self.buckets):
+                candidates = self._submasks(labels)
+            else:
+                candidates = [k for k in self.buckets if k & labels == k]
+            best = None
+            for key in candidates:
+                pos = self._last(key)
+                if pos is not None and (best is None or pos > best):
+                    best = pos
+            if best is None:
+                return None
+            c = self.keys[best]
+            if label_mask(self.data[c]['labels']) == self.filed[c]:
+                return self.data[c]['content']
+            self.update(c)
+
+
 @register_workload('STATIONARY')
 class StationaryWorkload(object):
     """This function generates events on the fly, i.e. instead of creating an
@@ -167,9 +344,8 @@ class StationaryWorkload(object):
 
             content = int(self.zipf.rv())  # TODO: THIS is where the content identifier requests are generated!
 
-            if type(content) is not dict:
-                data = dict()
-                data.update(content=content)
+            if not isinstance(content, Message):
+                data = Message(content=content)
             else:
                 data = content
             data.update(labels=[])
@@ -611,6 +787,9 @@ class StationaryRepoWorkload(object):
         not logged)
     n_measured : int, optional
         The number of logged requests after the warmup
+    batch_size : int, optional
+        If given, request inter-arrival times, receivers, contents and labels
+        are pre-drawn with NumPy in blocks of this size (see `RequestDraws`)
 
     Returns
     -------
@@ -624,7 +803,7 @@ class StationaryRepoWorkload(object):
                  label_ex=False, alpha_labels=0, rate=1.0,
                  n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=0,
                  n_services=10, topics=None, types=None, max_labels=1,
-                 freshness_pers=0, shelf_lives=0, msg_sizes=1000000, **kwargs):
+                 freshness_pers=0, shelf_lives=0, msg_sizes=1000000, batch_size=None, **kwargs):
         if types is None:
             types = []
         if alpha < 0:
@@ -648,9 +827,8 @@ class StationaryRepoWorkload(object):
         self.data = dict()
 
         for content in self.contents:
-            if type(content) is not dict:
-                datum = dict()
-                datum.update(content=content)
+            if not isinstance(content, Message):
+                datum = Message(content=content)
             else:
                 datum = content
             datum.update(service_type="proc")
@@ -684,12 +862,15 @@ class StationaryRepoWorkload(object):
             self.receiver_dist = TruncatedZipfDist(beta, len(self.receivers), seed)
 
         self.seed = seed
+        self.batch_size = batch_size
+        self.draws = RequestDraws(seed, batch_size)
         self.first = True
 
     def __iter__(self):
         req_counter = 0
         t_event = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -702,7 +883,7 @@ class StationaryRepoWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+            t_event += (self.draws.expovariate(self.rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
@@ -719,9 +900,9 @@ class StationaryRepoWorkload(object):
                 continue
 
             if self.beta == 0:
-                receiver = random.choice(self.receivers)
+                receiver = self.draws.choice(self.receivers)
             else:
-                receiver = self.receivers[self.receiver_dist.rv() - 1]
+                receiver = self.receivers[self.draws.rv(self.receiver_dist) - 1]
             node = receiver
 
             labels = []
@@ -731,7 +912,7 @@ class StationaryRepoWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                    labels_zipf = int(self.labels_zipf.rv())
+                    labels_zipf = int(self.draws.rv(self.labels_zipf))
                     if labels_zipf < len(self.labels['topics']):
                         labels.append(self.labels['topics'][labels_zipf])
                     elif labels_zipf >= len(self.labels['topics']):
@@ -739,20 +920,20 @@ class StationaryRepoWorkload(object):
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(self.zipf.rv())  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.rv(self.zipf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels_zipf = int(self.labels_zipf.rv())
+                        labels_zipf = int(self.draws.rv(self.labels_zipf))
                         if labels_zipf < len(self.labels['topics']):
                             labels.append(self.labels['topics'][labels_zipf])
                         elif labels_zipf >= len(self.labels['topics']):
                             labels.append(self.labels['types'][labels_zipf - len(self.labels['topics'])])
                     self.alter = True
-                    content = int(self.zipf.rv())
+                    content = int(self.draws.rv(self.zipf))
 
             log = (req_counter >= self.n_warmup)
             flow_id += 1
@@ -781,28 +962,23 @@ class StationaryRepoWorkload(object):
             # el
             if labels:
 
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 datum.update(labels=labels)
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_event
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': REQUEST}
             else:
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 deadline = self.model.services[content].deadline + t_event
@@ -865,6 +1041,9 @@ class BurstyRepoWorkload(object):
         not logged)
     n_measured : int, optional
         The number of logged requests after the warmup
+    batch_size : int, optional
+        If given, request inter-arrival times, receivers, contents and labels
+        are pre-drawn with NumPy in blocks of this size (see `RequestDraws`)
 
     Returns
     -------
@@ -877,7 +1056,7 @@ class BurstyRepoWorkload(object):
     def __init__(self, topology, n_contents, alpha, max_on=0, max_off=0, disrupt_mode=None, disrupt_weights=None,
                  beta=0, label_ex=False, alpha_labels=0, rate=1.0, n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=0,
                  n_services=10, topics=None, types=None, max_labels=1, freshness_pers=0, shelf_lives=0,
-                 msg_sizes=1000000, **kwargs):
+                 msg_sizes=1000000, batch_size=None, **kwargs):
         if types is None:
             types = []
         if alpha < 0:
@@ -901,9 +1080,8 @@ class BurstyRepoWorkload(object):
         self.data = dict()
 
         for content in self.contents:
-            if type(content) is not dict:
-                datum = dict()
-                datum.update(content=content)
+            if not isinstance(content, Message):
+                datum = Message(content=content)
             else:
                 datum = content
             datum.update(service_type="proc")
@@ -949,12 +1127,15 @@ class BurstyRepoWorkload(object):
             self.receiver_dist = TruncatedZipfDist(beta, len(self.receivers), seed)
 
         self.seed = seed
+        self.batch_size = batch_size
+        self.draws = RequestDraws(seed, batch_size)
         self.first = True
 
     def __iter__(self):
         req_counter = 0
         t_event = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -967,7 +1148,7 @@ class BurstyRepoWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+            t_event += (self.draws.expovariate(self.rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
@@ -984,9 +1165,9 @@ class BurstyRepoWorkload(object):
                 continue
 
             if self.beta == 0:
-                receiver = random.choice(self.receivers)
+                receiver = self.draws.choice(self.receivers)
             else:
-                receiver = self.receivers[self.receiver_dist.rv() - 1]
+                receiver = self.receivers[self.draws.rv(self.receiver_dist) - 1]
             node = receiver
 
             if self.disrupt_mode == 'RAND':
@@ -1010,7 +1191,7 @@ class BurstyRepoWorkload(object):
             elif self.disrupt_mode == 'WEIGHTED' or disrupt_mode == "POISSON":
 
                 if self.beta == 0:
-                    w_receiver = random.choice(self.receivers)
+                    w_receiver = self.draws.choice(self.receivers)
                 else:
                     w_receiver = self.receivers[self.random_from_pdf(self.disrupt_weights)]
                 d_node = w_receiver
@@ -1033,7 +1214,7 @@ class BurstyRepoWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                    labels_zipf = int(self.labels_zipf.rv())
+                    labels_zipf = int(self.draws.rv(self.labels_zipf))
                     if labels_zipf < len(self.labels['topics']):
                         labels.append(self.labels['topics'][labels_zipf])
                     elif labels_zipf >= len(self.labels['topics']):
@@ -1041,20 +1222,20 @@ class BurstyRepoWorkload(object):
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(self.zipf.rv())  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.rv(self.zipf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels_zipf = int(self.labels_zipf.rv())
+                        labels_zipf = int(self.draws.rv(self.labels_zipf))
                         if labels_zipf < len(self.labels['topics']):
                             labels.append(self.labels['topics'][labels_zipf])
                         elif labels_zipf >= len(self.labels['topics']):
                             labels.append(self.labels['types'][labels_zipf - len(self.labels['topics'])])
                     self.alter = True
-                    content = int(self.zipf.rv())
+                    content = int(self.draws.rv(self.zipf))
 
             log = (req_counter >= self.n_warmup)
             flow_id += 1
@@ -1083,28 +1264,23 @@ class BurstyRepoWorkload(object):
             # el
             if labels:
 
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 datum.update(labels=labels)
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_event
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': REQUEST}
             else:
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 deadline = self.model.services[content].deadline + t_event
@@ -1170,6 +1346,9 @@ class TraceDrivenRepoWorkload(object):
         The network-wide mean rate of requests per second
     beta : float, optional
         Spatial skewness of requests rates
+    batch_size : int, optional
+        If given, request inter-arrival times, receivers, contents and labels
+        are pre-drawn with NumPy in blocks of this size (see `RequestDraws`)
 
     Returns
     -------
@@ -1181,7 +1360,7 @@ class TraceDrivenRepoWorkload(object):
 
     def __init__(self, topology, rates_file, contents_file, labels_file, content_locations, n_contents,
                  n_warmup, n_measured, n_services=10, max_labels=1, msg_sizes=1000000, freshness_pers=0.2,
-                 shelf_lives=5, rate=1.0, label_ex=False, alpha_labels=0, beta=0, seed=0, **kwargs):
+                 shelf_lives=5, rate=1.0, label_ex=False, alpha_labels=0, beta=0, seed=0, batch_size=None, **kwargs):
         """Constructor"""
 
         if alpha_labels < 0:
@@ -1217,6 +1396,8 @@ class TraceDrivenRepoWorkload(object):
             self.receiver_dist = TruncatedZipfDist(beta, len(self.receivers), seed)
 
         self.seed = seed
+        self.batch_size = batch_size
+        self.draws = RequestDraws(seed, batch_size)
 
         if beta < 0:
             raise ValueError('beta must be positive')
@@ -1323,9 +1504,8 @@ class TraceDrivenRepoWorkload(object):
         self.data = dict()
 
         for content in self.contents:
-            if type(content) is not dict:
-                datum = dict()
-                datum.update(content=content)
+            if not isinstance(content, Message):
+                datum = Message(content=content)
             else:
                 datum = content
             datum.update(service_type="proc")
@@ -1348,6 +1528,7 @@ class TraceDrivenRepoWorkload(object):
         req_counter = 0
         t_event = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -1360,7 +1541,7 @@ class TraceDrivenRepoWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+            t_event += (self.draws.expovariate(self.rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
@@ -1377,9 +1558,9 @@ class TraceDrivenRepoWorkload(object):
                 continue
 
             if self.beta == 0:
-                receiver = random.choice(self.receivers)
+                receiver = self.draws.choice(self.receivers)
             else:
-                receiver = self.receivers[self.receiver_dist.rv() - 1]
+                receiver = self.receivers[self.draws.rv(self.receiver_dist) - 1]
             node = receiver
 
             labels = []
@@ -1389,20 +1570,20 @@ class TraceDrivenRepoWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                        labels.append(random_from_pdf(self.labels_pdf))
+                        labels.append(self.draws.from_pdf(self.labels_pdf))
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(random_from_pdf(self.rates_pdf))  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.from_pdf(self.rates_pdf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels.append(random_from_pdf(self.labels_pdf))
+                        labels.append(self.draws.from_pdf(self.labels_pdf))
                     self.alter = True
-                    content = int(random_from_pdf(self.rates_pdf))
+                    content = int(self.draws.from_pdf(self.rates_pdf))
 
             log = (req_counter >= self.n_warmup)
             flow_id += 1
@@ -1431,29 +1612,24 @@ class TraceDrivenRepoWorkload(object):
             # el
             if labels:
 
-                index = int(random_from_pdf(self.rates_pdf))
+                index = int(self.draws.from_pdf(self.rates_pdf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 datum.update(labels=labels)
                 self.data[index] = datum
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_event
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': REQUEST}
             else:
-                index = int(random_from_pdf(self.rates_pdf))
+                index = int(self.draws.from_pdf(self.rates_pdf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 deadline = self.model.services[content].deadline + t_event
@@ -1516,6 +1692,9 @@ class BurstyTraceRepoWorkload(object):
         The network-wide mean rate of requests per second
     beta : float, optional
         Spatial skewness of requests rates
+    batch_size : int, optional
+        If given, request inter-arrival times, receivers, contents and labels
+        are pre-drawn with NumPy in blocks of this size (see `RequestDraws`)
 
     Returns
     -------
@@ -1528,7 +1707,7 @@ class BurstyTraceRepoWorkload(object):
     def __init__(self, topology, rates_file, contents_file, labels_file, content_locations, n_contents,
                  n_warmup, n_measured, max_on=0, max_off=0, disrupt_mode=None, disrupt_weights=None, n_services=10,
                  max_labels=1, msg_sizes=1000000, freshness_pers=0.2, shelf_lives=5, rate=1.0, label_ex=False,
-                 alpha_labels=0, beta=0, seed=0, **kwargs):
+                 alpha_labels=0, beta=0, seed=0, batch_size=None, **kwargs):
         """Constructor"""
 
         if alpha_labels < 0:
@@ -1547,9 +1726,8 @@ class BurstyTraceRepoWorkload(object):
         self.data = dict()
 
         for content in self.contents:
-            if type(content) is not dict:
-                datum = dict()
-                datum.update(content=content)
+            if not isinstance(content, Message):
+                datum = Message(content=content)
             else:
                 datum = content
             datum.update(service_type="proc")
@@ -1593,6 +1771,8 @@ class BurstyTraceRepoWorkload(object):
             self.receiver_dist = TruncatedZipfDist(beta, len(self.receivers), seed)
 
         self.seed = seed
+        self.batch_size = batch_size
+        self.draws = RequestDraws(seed, batch_size)
 
         if beta < 0:
             raise ValueError('beta must be positive')
@@ -1680,6 +1860,7 @@ class BurstyTraceRepoWorkload(object):
         req_counter = 0
         t_event = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -1692,7 +1873,7 @@ class BurstyTraceRepoWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+            t_event += (self.draws.expovariate(self.rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
@@ -1709,9 +1890,9 @@ class BurstyTraceRepoWorkload(object):
                 continue
 
             if self.beta == 0:
-                receiver = random.choice(self.receivers)
+                receiver = self.draws.choice(self.receivers)
             else:
-                receiver = self.receivers[self.receiver_dist.rv() - 1]
+                receiver = self.receivers[self.draws.rv(self.receiver_dist) - 1]
             node = receiver
 
             labels = []
@@ -1721,20 +1902,20 @@ class BurstyTraceRepoWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                        labels.append(random_from_pdf(self.labels_pdf))
+                        labels.append(self.draws.from_pdf(self.labels_pdf))
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(random_from_pdf(self.rates_pdf))  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.from_pdf(self.rates_pdf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels.append(random_from_pdf(self.labels_pdf))
+                        labels.append(self.draws.from_pdf(self.labels_pdf))
                     self.alter = True
-                    content = int(random_from_pdf(self.rates_pdf))
+                    content = int(self.draws.from_pdf(self.rates_pdf))
 
             log = (req_counter >= self.n_warmup)
             flow_id += 1
@@ -1763,28 +1944,23 @@ class BurstyTraceRepoWorkload(object):
             # el
             if labels:
 
-                index = int(random_from_pdf(self.rates_pdf))
+                index = int(self.draws.from_pdf(self.rates_pdf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 datum.update(labels=labels)
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_event
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': REQUEST}
             else:
-                index = int(random_from_pdf(self.rates_pdf))
+                index = int(self.draws.from_pdf(self.rates_pdf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 deadline = self.model.services[content].deadline + t_event
@@ -1845,6 +2021,9 @@ class BurstyRepoDataAndWorkload(object):
         not logged)
     n_measured : int, optional
         The number of logged requests after the warmup
+    batch_size : int, optional
+        If given, request inter-arrival times, receivers, contents and labels
+        are pre-drawn with NumPy in blocks of this size (see `RequestDraws`)
 
     Returns
     -------
@@ -1860,7 +2039,8 @@ class BurstyRepoDataAndWorkload(object):
                  beta=0, label_ex=False, alpha_labels=0, rate=100, n_warmup=10 ** 5,
                  n_measured=4 * 10 ** 5, seed=0, n_services=10, topics=None, types=None, max_labels=1, freshness_pers=0,
                  shelf_lives=0, msg_sizes=1000000, data_gen_dist_mode=None, data_gen_dist=None, data_rate=0,
-                 stor_shelf=0, stor_scope=0, n_stor_warmup=0, n_stor_measured=0, mu=0, sigma=0, **kwargs):
+                 stor_shelf=0, stor_scope=0, n_stor_warmup=0, n_stor_measured=0, mu=0, sigma=0,
+                 batch_size=None, **kwargs):
         if types is None:
             types = []
         if alpha < 0:
@@ -1884,9 +2064,8 @@ class BurstyRepoDataAndWorkload(object):
         self.data = dict()
 
         for content in self.contents:
-            if type(content) is not dict:
-                datum = dict()
-                datum.update(content=content)
+            if not isinstance(content, Message):
+                datum = Message(content=content)
             else:
                 datum = content
             datum.update(service_type="proc")
@@ -1964,12 +2143,15 @@ class BurstyRepoDataAndWorkload(object):
             self.receiver_dist = TruncatedZipfDist(beta, len(self.receivers), seed)
 
         self.seed = seed
+        self.batch_size = batch_size
+        self.draws = RequestDraws(seed, batch_size)
         self.first = True
 
     def __iter__(self):
         req_counter = 0
         t_event = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -1984,7 +2166,7 @@ class BurstyRepoDataAndWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+            t_event += (self.draws.expovariate(self.rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
@@ -2001,9 +2183,9 @@ class BurstyRepoDataAndWorkload(object):
                 continue
 
             if self.beta == 0:
-                receiver = random.choice(self.receivers)
+                receiver = self.draws.choice(self.receivers)
             else:
-                receiver = self.receivers[self.receiver_dist.rv() - 1]
+                receiver = self.receivers[self.draws.rv(self.receiver_dist) - 1]
             node = receiver
 
             if self.disrupt_mode == 'RAND':
@@ -2027,7 +2209,7 @@ class BurstyRepoDataAndWorkload(object):
             elif self.disrupt_mode == 'WEIGHTED' or disrupt_mode == "POISSON":
 
                 if self.beta == 0:
-                    w_receiver = random.choice(self.receivers)
+                    w_receiver = self.draws.choice(self.receivers)
                 else:
                     w_receiver = self.receivers[self.random_from_pdf(self.disrupt_weights)]
                 d_node = w_receiver
@@ -2048,7 +2230,7 @@ class BurstyRepoDataAndWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                    labels_zipf = int(self.labels_zipf.rv())
+                    labels_zipf = int(self.draws.rv(self.labels_zipf))
                     if labels_zipf < len(self.labels['topics']):
                         labels.append(self.labels['topics'][labels_zipf])
                     elif labels_zipf >= len(self.labels['topics']):
@@ -2056,20 +2238,20 @@ class BurstyRepoDataAndWorkload(object):
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(self.zipf.rv())  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.rv(self.zipf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels_zipf = int(self.labels_zipf.rv())
+                        labels_zipf = int(self.draws.rv(self.labels_zipf))
                         if labels_zipf < len(self.labels['topics']):
                             labels.append(self.labels['topics'][labels_zipf])
                         elif labels_zipf >= len(self.labels['topics']):
                             labels.append(self.labels['types'][labels_zipf - len(self.labels['topics'])])
                     self.alter = True
-                    content = int(self.zipf.rv())
+                    content = int(self.draws.rv(self.zipf))
 
             log = (req_counter >= self.n_warmup)
             flow_id += 1
@@ -2098,28 +2280,23 @@ class BurstyRepoDataAndWorkload(object):
             # el
             if labels:
 
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 datum.update(labels=labels)
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_event
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': REQUEST}
             else:
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="proc")
                 deadline = self.model.services[content].deadline + t_event
@@ -2150,6 +2327,7 @@ class BurstyRepoDataAndWorkload(object):
         stor_counter = 0
         t_data = 0.0
         flow_id = 0
+        self.label_index = LabelContentIndex(self.data)
 
         # TODO: Associate requests with labels and other, deadline/freshless period/shelf-life requirements,
         #       rather than just contents (could be either or both, depending on restrictions - maybe create
@@ -2164,7 +2342,7 @@ class BurstyRepoDataAndWorkload(object):
         # aFile.write("# Time\tNodeID\tserviceID\n")
         eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
         while stor_counter < self.n_stor_warmup + self.n_stor_measured or len(self.model.eventQ) > 0:
-            t_data += (random.expovariate(self.data_rate))
+            t_data += (self.draws.expovariate(self.data_rate))
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_data:
                 heapq.heappop(self.model.eventQ)
@@ -2182,9 +2360,9 @@ class BurstyRepoDataAndWorkload(object):
 
             if self.data_gen_dist_mode:
                 if self.data_gen_dist_mode == "WEIGHTED_DATA_GEN" or self.data_gen_dist_mode == "POISSON":
-                    receiver = random_from_pdf(self.data_gen_pdf)
+                    receiver = self.draws.from_pdf(self.data_gen_pdf)
             else:
-                    receiver = random.choice(self.receivers)
+                    receiver = self.draws.choice(self.receivers)
             node = receiver
 
             if self.disrupt_mode == 'RAND':
@@ -2208,7 +2386,7 @@ class BurstyRepoDataAndWorkload(object):
             elif self.disrupt_mode == 'WEIGHTED':
 
                 if self.beta == 0:
-                    w_receiver = random.choice(self.receivers)
+                    w_receiver = self.draws.choice(self.receivers)
                 else:
                     w_receiver = self.receivers[self.random_from_pdf(self.disrupt_weights)]
                 d_node = w_receiver
@@ -2236,7 +2414,7 @@ class BurstyRepoDataAndWorkload(object):
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
                 for i in range(0, self.max_labels):
-                    labels_zipf = int(self.labels_zipf.rv())
+                    labels_zipf = int(self.draws.rv(self.labels_zipf))
                     if labels_zipf < len(self.labels['topics']):
                         labels.append(self.labels['topics'][labels_zipf])
                     elif labels_zipf >= len(self.labels['topics']):
@@ -2244,20 +2422,20 @@ class BurstyRepoDataAndWorkload(object):
 
             else:
                 if self.alpha_labels == 0 or self.alter is True:
-                    content = int(self.zipf.rv())  # TODO: THIS is where the content identifier requests are generated!
+                    content = int(self.draws.rv(self.zipf))  # TODO: THIS is where the content identifier requests are generated!
 
                 # TODO: Might need to revise this, programming-wise, to account for no content association to selected
                 #  label\/\/\/\/\/\/\/\/
 
                 elif self.alter is False:
                     for i in range(0, self.max_labels):
-                        labels_zipf = int(self.labels_zipf.rv())
+                        labels_zipf = int(self.draws.rv(self.labels_zipf))
                         if labels_zipf < len(self.labels['topics']):
                             labels.append(self.labels['topics'][labels_zipf])
                         elif labels_zipf >= len(self.labels['topics']):
                             labels.append(self.labels['types'][labels_zipf - len(self.labels['topics'])])
                     self.alter = True
-                    content = int(self.zipf.rv())
+                    content = int(self.draws.rv(self.zipf))
 
             log = (stor_counter >= self.n_stor_warmup)
             flow_id += 1
@@ -2286,30 +2464,25 @@ class BurstyRepoDataAndWorkload(object):
             # el
             if labels:
 
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="non-proc")
                 datum.update(labels=labels)
                 datum.update(shelf_life=self.stor_shelf)
                 datum.update(max_replications=self.stor_scope)
 
-                self.model.node_labels[node] = dict()
-                for c in self.data:
-                    if all(label in labels for label in self.data[c]['labels']):
-                        index = self.data[c]['content']
+                self.model.clear_node_labels(node)
+                self.label_index.update(index)
+                match = self.label_index.match(labels)
+                if match is not None:
+                    index = match
                 deadline = self.model.services[index].deadline + t_data
-                self.model.node_labels[node] = dict()
-                if node not in self.model.request_labels:
-                    self.model.request_labels[node] = Counter()
-                self.model.request_labels[node].update(labels)
-                for label in labels:
-                    if label not in self.model.request_labels_nodes:
-                        self.model.request_labels_nodes[label] = Counter()
-                    self.model.request_labels_nodes[label].update([node])
+                self.model.clear_node_labels(node)
+                self.model.add_request_labels(node, labels)
                 event = {'receiver': receiver, 'content': datum, 'labels': labels, 'log': log, 'node': node,
                          'flow_id': flow_id, 'rtt_delay': 0, 'deadline': deadline, 'status': STORE}
             else:
-                index = int(self.zipf.rv())
+                index = int(self.draws.rv(self.zipf))
                 datum = self.data[index]
                 datum.update(service_type="non-proc")
                 deadline = self.model.services[content].deadline + t_data
@@ -0,0 +1,103 @@
+import os
+import shutil
+import signal
+import tempfile
+import unittest
+
+import icarus.orchestration as orchestration
+from icarus.registry import RESULTS_READER, RESULTS_WRITER
+from icarus.results import ResultSet, StreamResultSet
+from icarus.run import run
+from icarus.util import Tree
+
+
+CONFIG = """
+from icarus.util import Tree
+PARALLEL_EXECUTION = False
+N_REPLICATIONS = 3
+RESULTS_FORMAT = %r
+LOG_LEVEL = 'ERROR'
+EXPERIMENT_QUEUE = [
+    Tree({'topology': {'name': 'NO_TOPOLOGY'}, 'strategy': {'name': 'A'}}),
+    Tree({'topology': {'name': 'NO_TOPOLOGY'}, 'strategy': {'name': 'B'}}),
+]
+"""
+
+
+class TestExperimentFingerprint(unittest.TestCase):
+
+    def test_order_independent(self):
+        a = Tree({'strategy': {'name': 'A', 'p': 0.5}, 'topology': {'name': 'T'}})
+        b = Tree({'topology': {'name': 'T'}, 'strategy': {'p': 0.5, 'name': 'A'}})
+        self.assertEqual(orchestration.experiment_fingerprint(a),
+                         orchestration.experiment_fingerprint(b))
+        b['strategy']['p'] = 0.25
+        self.assertNotEqual(orchestration.experiment_fingerprint(a),
+                            orchestration.experiment_fingerprint(b))
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.dir, 'results')
+        self.runs = []
+        self._run_scenario = orchestration.run_scenario
+        orchestration.run_scenario = self.run_scenario
+        self._handlers = {sig: signal.getsignal(sig) for sig in
+                          (signal.SIGTERM, signal.SIGINT, signal.SIGHUP,
+                           signal.SIGQUIT, signal.SIGABRT)}
+
+    def tearDown(self):
+        orchestration.run_scenario = self._run_scenario
+        for sig, handler in self._handlers.items():
+            signal.signal(sig, handler)
+        shutil.rmtree(self.dir)
+
+    def run_scenario(self, settings, params, curr_exp, n_exp, path_table=None):
+        self.runs.append((params['strategy']['name'], n_exp))
+        return params, Tree({'RUN': len(self.runs)}), 0.0
+
+    def campaign(self, results_format, resume):
+        config = os.path.join(self.dir, 'config.py')
+        with open(config, 'w') as f:
+            f.write(CONFIG % results_format)
+        run(config, self.output, None, resume=resume)
+        return [(params['strategy']['name'], results['RUN'])
+                for params, results in RESULTS_READER[results_format](self.output)]
+
+    def saved(self, results_format):
+        """Save the results of two of the three replications of A"""
+        experiment = Tree({'topology': {'name': 'NO_TOPOLOGY'}, 'strategy': {'name': 'A'}})
+        if results_format == 'STREAM':
+            results = StreamResultSet(self.output, overwrite=True)
+        else:
+            results = ResultSet()
+        for i in (-2, -1):
+            results.add(experiment, Tree({'RUN': i}))
+        RESULTS_WRITER[results_format](results, self.output)
+
+    def test_resume(self):
+        for results_format in ('PICKLE', 'STREAM'):
+            self.runs = []
+            self.saved(results_format)
+            saved = self.campaign(results_format, True)
+            self.assertEqual([('A', 4)] + [('B', 4)] * 3, self.runs, results_format)
+            # Saved results are kept, and the new ones appended to them
+            self.assertEqual([('A', -2), ('A', -1), ('A', 1), ('B', 2), ('B', 3), ('B', 4)],
+                             saved, results_format)
+
+    def test_resume_complete(self):
+        self.campaign('STREAM', False)
+        self.runs = []
+        saved = self.campaign('STREAM', True)
+        self.assertEqual([], self.runs)
+        self.assertEqual(6, len(saved))
+
+    def test_no_resume(self):
+        for results_format in ('PICKLE', 'STREAM'):
+            self.runs = []
+            self.saved(results_format)
+            saved = self.campaign(results_format, False)
+            self.assertEqual([('A', 6)] * 3 + [('B', 6)] * 3, self.runs, results_format)
+            self.assertEqual(6, len(saved), results_format)
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 import networkx as nx
@@ -49,3 +51,48 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(util.apportionment(10, [0.53, 0.47]), [5, 5])
         self.assertEqual(util.apportionment(100, [0.4, 0.21, 0.39]), [40, 21, 39])
         self.assertEqual(util.apportionment(99, [0.2, 0.7, 0.1]), [20, 69, 10])
+
+    def test_message(self):
+        msg = util.Message({'content': 1, 'labels': ['a']}, msg_size=10)
+        self.assertEqual(1, msg['content'])
+        self.assertEqual({'content': 1, 'labels': ['a'], 'msg_size': 10}, msg)
+        self.assertNotIn('shelf_life', msg)
+        self.assertIsNone(msg.get('shelf_life'))
+        self.assertRaises(KeyError, msg.__getitem__, 'shelf_life')
+        msg['cluster'] = 2
+        msg.update(shelf_life=5)
+        self.assertIn('cluster', msg)
+        self.assertEqual(5, len(msg))
+        self.assertEqual(2, msg.pop('cluster'))
+        self.assertEqual(['content', 'labels', 'msg_size', 'shelf_life'],
+                         msg.keys())
+        msg_copy = msg.copy()
+        msg_copy['content'] = 2
+        self.assertEqual(1, msg['content'])
+        for msg_copy in (copy.deepcopy(msg), pickle.loads(pickle.dumps(msg))):
+            self.assertEqual(msg, msg_copy)
+            self.assertIsNot(msg['labels'], msg_copy['labels'])
+
+    def test_label_registry(self):
+        registry = util.LabelRegistry()
+        a, b = registry.intern('a'), registry.intern('b')
+        self.assertEqual(a, registry.intern('a'))
+        self.assertEqual('b', registry.label(b))
+        mask = registry.mask(['b', 'a', 'b'])
+        self.assertEqual(registry.mask(['a', 'b']), mask)
+        self.assertEqual(['a', 'b'], registry.labels(mask))
+        c = registry.mask(['c'])
+        self.assertEqual(3, len(registry))
+        self.assertEqual(registry.mask(['a']), registry.mask(['a']) & mask)
+        self.assertNotEqual(c, c & mask)
+
+    def test_message_label_mask(self):
+        msg = util.Message(content=1, labels=['a', 'b'])
+        self.assertEqual(util.label_mask(['b', 'a']), msg.label_mask)
+        msg['labels'] = ['c']
+        self.assertEqual(util.label_mask(['c']), msg.label_mask)
+        msg['labels'].append('d')
+        self.assertEqual(util.label_mask(['c', 'd']), msg.label_mask)
+        msg['labels'][0] = 'a'
+        self.assertEqual(util.label_mask(['a', 'd']), msg.label_mask)
+        self.assertEqual(0, util.Message(content=1).label_mask)
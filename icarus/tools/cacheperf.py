@@ -3,10 +3,12 @@ replacement policies.
 """
 from __future__ import division
 import math
+import multiprocessing as mp
 
 import numpy as np
 from scipy.optimize import fsolve
 
+from icarus.registry import CACHE_POLICY
 from icarus.tools import TruncatedZipfDist, DiscreteDist
 
 
@@ -27,7 +29,12 @@ __all__ = [
        'numeric_per_content_cache_hit_ratio',
        'numeric_cache_hit_ratio',
        'numeric_cache_hit_ratio_2_layers',
-       'trace_driven_cache_hit_ratio'
+       'replay_cache_hit_ratio',
+       'numeric_cache_hit_ratio_sweep',
+       'trace_driven_cache_hit_ratio',
+       'stack_distances',
+       'stack_distance_cache_hit_ratio',
+       'stack_distance_per_content_cache_hit_ratio'
           ]
 
 
@@ -694,6 +701,131 @@ def numeric_cache_hit_ratio_2_layers(pdf, l1_cache, l2_cache,
            }
 
 
+def _cache(policy, size):
+    """Instantiate a cache of the given size from a policy name or from a
+    dictionary with the policy name under key *name* and its parameters
+    """
+    if isinstance(policy, dict):
+        policy = dict(policy)
+        return CACHE_POLICY[policy.pop('name')](size, **policy)
+    return CACHE_POLICY[policy](size)
+
+
+def _replay(args):
+    """Replay requests through a list of (policy, size) configurations and
+    return the number of measured hits of each. It takes a single tuple of
+    arguments so that it can be mapped over a process pool.
+    """
+    requests, configs, warmup = args
+    caches = [_cache(policy, size) for policy, size in configs]
+    hits = [0] * len(caches)
+    ops = [(cache.get, cache.put) for cache in caches]
+    for i, content in enumerate(requests):
+        measured = i >= warmup
+        for j, (get, put) in enumerate(ops):
+            if get(content):
+                if measured:
+                    hits[j] += 1
+            else:
+                put(content)
+    return hits
+
+
+def replay_cache_hit_ratio(requests, configs, warmup=0, n_processes=None):
+    """Compute the cache hit ratio of several caches replaying the same
+    sequence of requests.
+
+    All caches are fed in a single pass over the requests, which are
+    typically drawn at once with `DiscreteDist.rv` or extracted from a trace,
+    so that every configuration observes exactly the same requests.
+
+    Parameters
+    ----------
+    requests : array-like
+        The sequence of requested content identifiers
+    configs : list of tuples
+        List of *(policy, size)* cache configurations. Policy is either the
+        name of a registered cache policy or a dictionary with the name under
+        key *name* and the policy parameters, as in the *cache_policy*
+        parameter of the network model
+    warmup : int, optional
+        The number of initial requests used to warm up the caches, whose
+        hits and misses are not measured
+    n_processes : int, optional
+        If greater than 1, the configurations are spread across a pool of
+        this number of processes, each replaying the requests through its
+        share of the caches
+
+    Returns
+    -------
+    cache_hit_ratio : array of float
+        The cache hit ratio of each configuration, in the order of *configs*
+    """
+    requests = np.asarray(requests).tolist()
+    if warmup < 0 or warmup >= len(requests):
+        raise ValueError('warmup must be non-negative and lower than the '
+                         'number of requests')
+    configs = list(configs)
+    if n_processes is None or n_processes <= 1 or len(configs) <= 1:
+        hits = _replay((requests, configs, warmup))
+    else:
+        n_processes = min(n_processes, len(configs))
+        chunks = [configs[i::n_processes] for i in range(n_processes)]
+        pool = mp.Pool(n_processes)
+        try:
+            chunk_hits = pool.map(_replay, [(requests, chunk, warmup)
+                                            for chunk in chunks])
+        finally:
+            pool.close()
+            pool.join()
+        hits = [0] * len(configs)
+        for i, chunk in enumerate(chunk_hits):
+            hits[i::n_processes] = chunk
+    return np.asarray(hits) / (len(requests) - warmup)
+
+
+def numeric_cache_hit_ratio_sweep(pdf, policies, sizes, warmup=None,
+                                  measure=None, seed=None, n_processes=None):
+    """Numerically compute the cache hit ratio of every combination of cache
+    policy and size under IRM stationary demand with a given pdf.
+
+    The requests are drawn once and replayed through all caches with
+    `replay_cache_hit_ratio`, rather than generated again for each of them.
+
+    Parameters
+    ----------
+    pdf : array-like
+        The probability density function of an item being requested
+    policies : list
+        The cache policies, each either the name of a registered cache policy
+        or a dictionary with the name under key *name* and its parameters
+    sizes : list of int
+        The cache sizes
+    warmup : int, optional
+        The number of warmup requests to generate. If not specified, it is set
+        to 10 times the content population
+    measure : int, optional
+        The number of measured requests to generate. If not specified, it is
+        set to 30 times the content population
+    seed : int, optional
+        The seed used to generate random numbers
+    n_processes : int, optional
+        The number of processes across which caches are spread, if greater
+        than 1
+
+    Returns
+    -------
+    cache_hit_ratio : 2-d array of float
+        The cache hit ratio of each policy (row) and size (column)
+    """
+    if warmup is None: warmup = 10 * len(pdf)
+    if measure is None: measure = 30 * len(pdf)
+    requests = DiscreteDist(pdf, seed).rv(warmup + measure)
+    configs = [(policy, size) for policy in policies for size in sizes]
+    hit_ratio = replay_cache_hit_ratio(requests, configs, warmup, n_processes)
+    return hit_ratio.reshape(len(policies), len(sizes))
+
+
 def trace_driven_cache_hit_ratio(workload, cache, warmup_ratio=0.25):
     """Compute cache hit ratio of a cache under an arbitrary trace-driven
     workload.
@@ -728,3 +860,149 @@ def trace_driven_cache_hit_ratio(workload, cache, warmup_ratio=0.25):
             cache.put(content)
         n_req += 1
     return cache_hits / (n - n_warmup)
+
+
+def stack_distances(requests):
+    """Compute the LRU stack distance of each request of a sequence.
+
+    The stack distance of a request is the position of the requested content
+    in the LRU stack, i.e. one plus the number of distinct contents requested
+    since its last request. A LRU cache of size *C* serves a request if and
+    only if its stack distance is between 1 and *C*.
+
+    Distances are computed in a single pass in O(n log n) time (Mattson's
+    algorithm), counting the contents requested since the last request with a
+    Fenwick tree over the times of the last request of each content.
+
+    Parameters
+    ----------
+    requests : array-like
+        The sequence of requested content identifiers
+
+    Returns
+    -------
+    distances : array of int
+        The stack distance of each request, or 0 for the first request of
+        each content
+    """
+    _, ids = np.unique(np.asarray(requests), return_inverse=True)
+    n = len(ids)
+    tree = [0] * (n + 1)
+    last = {}
+    distances = [0] * n
+    n_marked = 0
+    # Position t of the tree is marked if the request at time t - 1 is the
+    # last request of its content
+    for i, content in enumerate(ids.tolist()):
+        if content in last:
+            k = last[content]
+            marked_before = 0
+            while k > 0:
+                marked_before += tree[k]
+                k -= k & -k
+            distances[i] = n_marked - marked_before + 1
+            k = last[content]
+            while k <= n:
+                tree[k] -= 1
+                k += k & -k
+            n_marked -= 1
+        k = i + 1
+        while k <= n:
+            tree[k] += 1
+            k += k & -k
+        n_marked += 1
+        last[content] = i + 1
+    return np.asarray(distances, dtype=int)
+
+
+def _stack_distance_columns(distances, sizes):
+    """Map each stack distance to the index of the smallest cache size
+    serving it, or to len(sizes) if no size does
+    """
+    if np.any(np.diff(sizes) < 0):
+        raise ValueError('sizes must be sorted in increasing order')
+    columns = np.searchsorted(sizes, distances)
+    columns[distances == 0] = len(sizes)
+    return columns
+
+
+def stack_distance_cache_hit_ratio(requests, warmup=0, sizes=None):
+    """Compute the cache hit ratio of a LRU cache of every size under a
+    sequence of requests, from the stack distance of each request.
+
+    Differently from the numeric_cache_hit_ratio and
+    trace_driven_cache_hit_ratio functions, the requests are processed once
+    for all cache sizes.
+
+    Parameters
+    ----------
+    requests : array-like
+        The sequence of requested content identifiers, e.g. extracted from a
+        trace or drawn from a `DiscreteDist`
+    warmup : int, optional
+        The number of initial requests used to warm up the cache, whose hits
+        and misses are not measured
+    sizes : array-like, optional
+        The cache sizes, in increasing order. If not specified, all sizes from
+        0 to the number of distinct contents requested are evaluated
+
+    Returns
+    -------
+    cache_hit_ratio : array of float
+        The cache hit ratio of each size. If sizes is not specified, the
+        element of index *C* is the cache hit ratio of a cache of size *C*
+    """
+    distances = stack_distances(requests)
+    if warmup < 0 or warmup >= len(distances):
+        raise ValueError('warmup must be non-negative and lower than the '
+                         'number of requests')
+    if sizes is None:
+        sizes = np.arange(distances.max() + 1)
+    sizes = np.asarray(sizes)
+    columns = _stack_distance_columns(distances[warmup:], sizes)
+    hits = np.bincount(columns, minlength=len(sizes) + 1)[:len(sizes)]
+    return np.cumsum(hits) / (len(distances) - warmup)
+
+
+def stack_distance_per_content_cache_hit_ratio(requests, warmup=0, sizes=None):
+    """Compute the per-content cache hit ratio of a LRU cache of every size
+    under a sequence of requests, from the stack distance of each request.
+
+    Parameters
+    ----------
+    requests : array-like
+        The sequence of requested content identifiers, e.g. extracted from a
+        trace or drawn from a `DiscreteDist`
+    warmup : int, optional
+        The number of initial requests used to warm up the cache, whose hits
+        and misses are not measured
+    sizes : array-like, optional
+        The cache sizes, in increasing order. If not specified, all sizes from
+        0 to the number of distinct contents requested are evaluated
+
+    Returns
+    -------
+    contents : array
+        The distinct contents requested, sorted
+    cache_hit_ratio : 2-d array of float
+        The cache hit ratio of each content (row) for each size (column).
+        Contents not requested after the warmup have a cache hit ratio of 0
+    """
+    requests = np.asarray(requests)
+    distances = stack_distances(requests)
+    if warmup < 0 or warmup >= len(distances):
+        raise ValueError('warmup must be non-negative and lower than the '
+                         'number of requests')
+    contents, ids = np.unique(requests, return_inverse=True)
+    if sizes is None:
+        sizes = np.arange(distances.max() + 1)
+    sizes = np.asarray(sizes)
+    ids = ids[warmup:]
+    columns = _stack_distance_columns(distances[warmup:], sizes)
+    hits = np.zeros((len(contents), len(sizes) + 1))
+    np.add.at(hits, (ids, columns), 1)
+    hits = np.cumsum(hits[:, :-1], axis=1)
+    n_requests = np.bincount(ids, minlength=len(contents))[:, np.newaxis]
+    hit_ratio = np.zeros_like(hits)
+    np.divide(hits, n_requests, out=hit_ratio, where=n_requests > 0)
+    return contents, hit_ratio
@@ -3,6 +3,7 @@
 from __future__ import division
 
 import math
+import numbers
 import random
 import collections
 
@@ -13,6 +14,7 @@ import scipy.stats as ss
 __all__ = [
        'DiscreteDist',
        'TruncatedZipfDist',
+       'alias_table',
        'means_confidence_interval',
        'proportions_confidence_interval',
        'cdf',
@@ -25,9 +27,14 @@ class DiscreteDist(object):
 
     The support must be a finite discrete set of contiguous integers
     {1, ..., N}. This definition of discrete distribution.
+
+    Values can be sampled either by binary search over the CDF (method
+    'cdf', the default, which reproduces the values drawn by earlier
+    versions) or from a Walker alias table (method 'alias'), which takes
+    constant time per value.
     """
 
-    def __init__(self, pdf, seed=None):
+    def __init__(self, pdf, seed=None, method='cdf'):
         """
         Constructor
 
@@ -37,14 +44,28 @@ class DiscreteDist(object):
             The probability density function
         seed : any hashable type (optional)
             The seed to be used for random number generation
+        method : str, optional
+            The sampling method, either 'cdf' or 'alias'
         """
         if np.abs(sum(pdf) - 1.0) > 0.001:
             raise ValueError('The sum of pdf values must be equal to 1')
+        if method not in ('cdf', 'alias'):
+            raise ValueError('method must be either "cdf" or "alias"')
         random.seed(seed)
         self._pdf = np.asarray(pdf)
         self._cdf = np.cumsum(self._pdf)
         # set last element of the CDF to 1.0 to avoid rounding errors
         self._cdf[-1] = 1.0
+        self._method = method
+        if method == 'alias':
+            self._prob, self._alias = alias_table(self._pdf)
+            self._prob_list = self._prob.tolist()
+            self._alias_list = self._alias.tolist()
+        # Vectorised draws use their own generator, not the random module
+        if seed is not None and not isinstance(seed, numbers.Integral):
+            seed = hash(seed)
+        self._random_state = np.random.RandomState(
+            None if seed is None else seed % 2 ** 32)
 
     def __len__(self):
         """Return the cardinality of the support
@@ -81,10 +102,40 @@ class DiscreteDist(object):
         """
         return self._cdf
 
-    def rv(self):
+    @property
+    def method(self):
+        """Return the sampling method, either 'cdf' or 'alias'"""
+        return self._method
+
+    def rv(self, n=None):
         """Get rand value from the distribution
+
+        Parameters
+        ----------
+        n : int, optional
+            The number of values to draw
+
+        Returns
+        -------
+        rv : int or Numpy array
+            A single value, drawn using the random module, if *n* is None,
+            otherwise an array of *n* values drawn at once from the
+            distribution's own NumPy generator
         """
+        if n is not None:
+            u = self._random_state.random_sample(n)
+            if self._method == 'alias':
+                u *= len(self._pdf)
+                i = u.astype(np.int64)
+                return np.where(u - i < self._prob[i], i, self._alias[i]) + 1
+            return np.searchsorted(self._cdf, u) + 1
         rv = random.random()
+        if self._method == 'alias':
+            rv *= len(self._prob_list)
+            i = int(rv)
+            if rv - i < self._prob_list[i]:
+                return i + 1
+            return self._alias_list[i] + 1
         # This operation performs binary search over the CDF to return the
         # random value. Worst case time complexity is O(log2(n))
         return int(np.searchsorted(self._cdf, rv) + 1)
@@ -94,7 +145,7 @@ class TruncatedZipfDist(DiscreteDist):
     a finite population, which can hence take values of alpha > 0.
     """
 
-    def __init__(self, alpha=1.0, n=1000, seed=None):
+    def __init__(self, alpha=1.0, n=1000, seed=None, method='cdf'):
         """Constructor
 
         Parameters
@@ -105,6 +156,8 @@ class TruncatedZipfDist(DiscreteDist):
             The size of population
         seed : any hashable type, optional
             The seed to be used for random number generation
+        method : str, optional
+            The sampling method, either 'cdf' or 'alias' (see `DiscreteDist`)
         """
         # Validate parameters
         if alpha <= 0:
@@ -116,13 +169,45 @@ class TruncatedZipfDist(DiscreteDist):
         pdf = np.arange(1.0, n + 1.0) ** -alpha
         pdf /= np.sum(pdf)
         self._alpha = alpha
-        super(TruncatedZipfDist, self).__init__(pdf, seed)
+        super(TruncatedZipfDist, self).__init__(pdf, seed, method)
 
     @property
     def alpha(self):
         return self._alpha
 
 
+def alias_table(pdf):
+    """Build the table used by Walker's alias method to sample from a pdf.
+
+    Parameters
+    ----------
+    pdf : array-like
+        The probability density function
+
+    Returns
+    -------
+    prob : Numpy array
+        Probability of keeping each value rather than its alias
+    alias : Numpy array
+        Index of the alias of each value
+    """
+    n = len(pdf)
+    prob = np.asarray(pdf, dtype=float) * n
+    alias = np.arange(n)
+    small = [i for i in range(n) if prob[i] < 1.0]
+    large = [i for i in range(n) if prob[i] >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large[-1]
+        alias[s] = l
+        prob[l] -= 1.0 - prob[s]
+        if prob[l] < 1.0:
+            small.append(large.pop())
+    # Remaining values are left with probability 1 up to rounding errors
+    prob[small + large] = 1.0
+    return prob, alias
+
+
 def means_confidence_interval(data, confidence=0.95):
     """Computes the confidence interval for a given set of means.
 
@@ -1,3 +1,5 @@
+from __future__ import division
+import collections
 import unittest
 
 import numpy as np
@@ -45,6 +47,91 @@ class TestNumericCacheHitRatio(unittest.TestCase):
         self.assertLess(np.abs(h - r), 0.01)
 
 
+class TestCacheHitRatioSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pdf = stats.TruncatedZipfDist(0.8, 200).pdf
+        cls.requests = stats.DiscreteDist(cls.pdf, 0).rv(4000)
+
+    def test_replay_matches_trace_driven(self):
+        configs = [('ARRAY_LRU', 10), ('ARRAY_FIFO', 20),
+                   ({'name': 'ARRAY_SLRU', 'segments': 2}, 20)]
+        h = cacheperf.replay_cache_hit_ratio(self.requests, configs, 1000)
+        expected = [cacheperf.trace_driven_cache_hit_ratio(self.requests, c, 0.25)
+                    for c in (cache.ArrayLruCache(10), cache.ArrayFifoCache(20),
+                              cache.ArraySegmentedLruCache(20, 2))]
+        np.testing.assert_allclose(expected, h)
+
+    def test_process_pool(self):
+        configs = [('ARRAY_LRU', 10), ('ARRAY_FIFO', 10), ('ARRAY_LRU', 30)]
+        serial = cacheperf.replay_cache_hit_ratio(self.requests, configs, 500)
+        parallel = cacheperf.replay_cache_hit_ratio(self.requests, configs, 500,
+                                                    n_processes=2)
+        np.testing.assert_array_equal(serial, parallel)
+
+    def test_sweep(self):
+        h = cacheperf.numeric_cache_hit_ratio_sweep(self.pdf, ['ARRAY_LRU', 'ARRAY_IN_CACHE_LFU'],
+                                                    [5, 20, 50], seed=1)
+        self.assertEqual((2, 3), h.shape)
+        self.assertTrue(np.all(np.diff(h, axis=1) > 0))
+        self.assertLess(np.abs(h[0, 2] - cacheperf.che_cache_hit_ratio(self.pdf, 50)), 0.02)
+
+    def test_invalid_warmup(self):
+        self.assertRaises(ValueError, cacheperf.replay_cache_hit_ratio,
+                          self.requests, [('ARRAY_LRU', 10)], len(self.requests))
+
+
+class TestStackDistance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pdf = stats.TruncatedZipfDist(0.8, 100).pdf
+        cls.requests = stats.DiscreteDist(cls.pdf, 0).rv(5000)
+
+    def test_stack_distances(self):
+        d = cacheperf.stack_distances([1, 2, 3, 1, 2, 2, 4, 1])
+        self.assertEqual([0, 0, 0, 3, 3, 1, 0, 3], list(d))
+        d = cacheperf.stack_distances(['a', 'b', 'a', 'a'])
+        self.assertEqual([0, 0, 2, 1], list(d))
+
+    def test_matches_lru_replay(self):
+        h = cacheperf.stack_distance_cache_hit_ratio(self.requests, 1250)
+        self.assertEqual(0, h[0])
+        for size in (1, 3, 10, 40, 100):
+            expected = cacheperf.trace_driven_cache_hit_ratio(
+                                self.requests, cache.ArrayLruCache(size), 0.25)
+            self.assertAlmostEqual(expected, h[size])
+
+    def test_sizes(self):
+        h = cacheperf.stack_distance_cache_hit_ratio(self.requests, 1250)
+        np.testing.assert_allclose(h[[2, 20]], cacheperf.stack_distance_cache_hit_ratio(
+                                                    self.requests, 1250, [2, 20]))
+        self.assertRaises(ValueError, cacheperf.stack_distance_cache_hit_ratio,
+                          self.requests, 0, [20, 2])
+
+    def test_per_content(self):
+        size = 10
+        contents, h = cacheperf.stack_distance_per_content_cache_hit_ratio(
+                                                self.requests, 1000, [size])
+        c = cache.ArrayLruCache(size)
+        hits = collections.Counter()
+        requests = collections.Counter()
+        for i, content in enumerate(self.requests):
+            hit = c.get(content)
+            if not hit:
+                c.put(content)
+            if i >= 1000:
+                requests[content] += 1
+                hits[content] += hit
+        for content, hit_ratio in zip(contents, h[:, 0]):
+            expected = hits[content] / requests[content] if requests[content] else 0
+            self.assertAlmostEqual(expected, hit_ratio)
+        overall = cacheperf.stack_distance_cache_hit_ratio(self.requests, 1000, [size])
+        n_requests = np.array([requests[content] for content in contents])
+        self.assertAlmostEqual(overall[0], np.dot(h[:, 0], n_requests) / n_requests.sum())
+
+
 class TestLaoutarisPerContentCacheHitRatio(unittest.TestCase):
 
     def test_3rd_order_positive_disc(self):
@@ -1,3 +1,5 @@
+from __future__ import division
+import random
 import unittest
 import collections
 
@@ -24,12 +26,55 @@ class TestDiscreteDist(unittest.TestCase):
         pdf_2 = stats.DiscreteDist(pdf_1).pdf
         self.assertTrue(all(pdf_1[i] == pdf_2[i] for i in range(len(pdf_1))))
 
+    def test_invalid_method(self):
+        self.assertRaises(ValueError, stats.DiscreteDist, [0.4, 0.6],
+                          method='inverse')
+
+    def test_alias_table(self):
+        pdf = np.array([0.1, 0.25, 0.05, 0.4, 0.2])
+        prob, alias = stats.alias_table(pdf)
+        n = len(pdf)
+        mass = prob / n
+        for i in range(n):
+            mass[alias[i]] += (1 - prob[i]) / n
+        self.assertTrue(np.allclose(pdf, mass))
+
+    def test_rv_frequencies(self):
+        pdf = [0.1, 0.25, 0.05, 0.4, 0.2]
+        n = 50000
+        for method in ('cdf', 'alias'):
+            dist = stats.DiscreteDist(pdf, seed=1, method=method)
+            scalar = collections.Counter(dist.rv() for _ in range(n))
+            vector = collections.Counter(dist.rv(n).tolist())
+            for i, p in enumerate(pdf):
+                self.assertAlmostEqual(p, scalar[i + 1] / n, delta=0.01)
+                self.assertAlmostEqual(p, vector[i + 1] / n, delta=0.01)
+
+    def test_rv_reproducible(self):
+        for method in ('cdf', 'alias'):
+            dist_1 = stats.TruncatedZipfDist(0.8, 100, seed=3, method=method)
+            values_1 = [dist_1.rv() for _ in range(50)], dist_1.rv(50)
+            dist_2 = stats.TruncatedZipfDist(0.8, 100, seed=3, method=method)
+            values_2 = [dist_2.rv() for _ in range(50)], dist_2.rv(50)
+            self.assertEqual(values_1[0], values_2[0])
+            self.assertTrue(np.array_equal(values_1[1], values_2[1]))
+
+
 class TestTruncatedZipfDist(unittest.TestCase):
 
     def test_pdf_sum(self):
         p = stats.TruncatedZipfDist(alpha=0.6, n=1000).pdf
         self.assertAlmostEqual(np.sum(p), 1.0)
 
+    def test_cdf_method_unchanged(self):
+        dist = stats.TruncatedZipfDist(alpha=0.6, n=1000, seed=7)
+        values = [dist.rv() for _ in range(100)]
+        random.seed(7)
+        expected = [int(np.searchsorted(dist.cdf, random.random()) + 1)
+                    for _ in range(100)]
+        self.assertEqual('cdf', dist.method)
+        self.assertEqual(expected, values)
+
 
 class TestCdf(unittest.TestCase):
 
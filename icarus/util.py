@@ -14,6 +14,10 @@ __all__ = [
         'Settings',
         'AnyValue',
         'SequenceNumber',
+        'Message',
+        'LabelRegistry',
+        'LABELS',
+        'label_mask',
         'config_logging',
         'inheritdoc',
         'timestr',
@@ -473,6 +477,298 @@ class SequenceNumber(object):
         return self.__seq
 
 
+class LabelRegistry(object):
+    """Registry interning labels to small integer IDs.
+
+    Sets of labels are represented as bitmasks in which the bit of each
+    label ID is set, so that they can be hashed and compared in constant
+    time and a set *a* is a subset of a set *b* if *a & b == a*. The labels
+    themselves are only needed to report label sets in a readable form.
+    """
+
+    def __init__(self):
+        """Constructor"""
+        self._ids = {}
+        self._bits = {}
+        self._labels = []
+
+    def __len__(self):
+        return len(self._labels)
+
+    def intern(self, label):
+        """Return the ID of a label, assigning it a new one if needed
+
+        Parameters
+        ----------
+        label : any hashable type
+            The label
+
+        Returns
+        -------
+        label_id : int
+            The ID of the label
+        """
+        try:
+            return self._ids[label]
+        except KeyError:
+            label_id = self._ids[label] = len(self._labels)
+            self._bits[label] = 1 << label_id
+            self._labels.append(label)
+            return label_id
+
+    def label(self, label_id):
+        """Return the label with a given ID
+
+        Parameters
+        ----------
+        label_id : int
+            The ID of the label
+
+        Returns
+        -------
+        label : any hashable type
+            The label
+        """
+        return self._labels[label_id]
+
+    def mask(self, labels):
+        """Return the bitmask of a set of labels
+
+        Parameters
+        ----------
+        labels : iterable
+            The labels
+
+        Returns
+        -------
+        mask : int
+            The bitmask
+        """
+        mask = 0
+        bits = self._bits
+        for label in labels:
+            try:
+                mask |= bits[label]
+            except KeyError:
+                mask |= 1 << self.intern(label)
+        return mask
+
+    def labels(self, mask):
+        """Return the labels of a bitmask
+
+        Parameters
+        ----------
+        mask : int
+            The bitmask
+
+        Returns
+        -------
+        labels : list
+            The labels, in order of ID
+        """
+        return [label for label_id, label in enumerate(self._labels)
+                if mask >> label_id & 1]
+
+
+# Registry of all labels used by workloads, contents and nodes
+LABELS = LabelRegistry()
+
+
+def label_mask(labels):
+    """Return the bitmask of a set of labels interned in `LABELS`
+
+    Parameters
+    ----------
+    labels : iterable
+        The labels
+
+    Returns
+    -------
+    mask : int
+        The bitmask
+    """
+    return LABELS.mask(labels)
+
+
+class Message(object):
+    """Record of a message of the repository workloads.
+
+    Messages are created by workloads and content placements and are then
+    held by the `RepoStorage` of nodes and in `NetworkModel.contents`. Since
+    an experiment can create millions of them, their properties are stored in
+    slots rather than in a per-message dictionary, which reduces the memory
+    used by each message several times.
+
+    Messages can still be used as dictionaries, keyed by property name. Keys
+    other than the common properties are supported too, but are stored in an
+    additional dictionary created only for the messages having them.
+
+    The labels of a message are also available as a bitmask of label IDs
+    interned in `LABELS`. The bitmask is cached together with the labels it
+    was computed from and recomputed if they differ, so that it stays up to
+    date even if the labels are modified in place.
+    """
+
+    FIELDS = ('content', 'labels', 'service_type', 'msg_size', 'shelf_life',
+              'freshness_per', 'receiveTime', 'storTime', 'Fresh', 'Shelf',
+              'overtime', 'satisfied', 'replications', 'max_replications')
+
+    __slots__ = tuple(f for f in FIELDS if f != 'labels') + \
+                ('_labels', '_mask_cache', '_extra')
+
+    _field_set = frozenset(FIELDS)
+
+    __hash__ = None
+
+    def __init__(self, data=None, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        data : dict or Message, optional
+            The properties of the message
+        kwargs : keyworded properties of the message
+        """
+        self._mask_cache = None
+        self._extra = None
+        self.update(data, **kwargs)
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @labels.setter
+    def labels(self, labels):
+        self._labels = labels
+        self._mask_cache = None
+
+    @labels.deleter
+    def labels(self):
+        del self._labels
+        self._mask_cache = None
+
+    @property
+    def label_mask(self):
+        """Bitmask of the IDs of the labels of the message"""
+        labels = tuple(self.get('labels') or ())
+        if self._mask_cache is None or self._mask_cache[0] != labels:
+            self._mask_cache = (labels, LABELS.mask(labels))
+        return self._mask_cache[1]
+
+    def __getitem__(self, k):
+        if k in Message._field_set:
+            try:
+                return getattr(self, k)
+            except AttributeError:
+                raise KeyError(k)
+        if self._extra is None:
+            raise KeyError(k)
+        return self._extra[k]
+
+    def __setitem__(self, k, v):
+        if k in Message._field_set:
+            setattr(self, k, v)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[k] = v
+
+    def __delitem__(self, k):
+        if k in Message._field_set:
+            try:
+                delattr(self, k)
+            except AttributeError:
+                raise KeyError(k)
+        elif self._extra is None:
+            raise KeyError(k)
+        else:
+            del self._extra[k]
+
+    def __contains__(self, k):
+        if k in Message._field_set:
+            return hasattr(self, k)
+        return self._extra is not None and k in self._extra
+
+    has_key = __contains__
+
+    def __iter__(self):
+        for k in Message.FIELDS:
+            if hasattr(self, k):
+                yield k
+        if self._extra is not None:
+            for k in self._extra:
+                yield k
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Message, dict)):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __repr__(self):
+        return "Message({})".format(dict(self.items()))
+
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        self._mask_cache = None
+        self._extra = None
+        self.update(state)
+
+    def get(self, k, default=None):
+        try:
+            return self[k]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[k] for k in self]
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    def iteritems(self):
+        return ((k, self[k]) for k in self)
+
+    def update(self, data=None, **kwargs):
+        """Update the message from a dictionary or another message, similarly
+        to dict.update
+        """
+        if data is not None:
+            for k, v in (data.items() if hasattr(data, 'items') else data):
+                self[k] = v
+        for k, v in kwargs.items():
+            self[k] = v
+
+    def setdefault(self, k, default=None):
+        if k not in self:
+            self[k] = default
+        return self[k]
+
+    def pop(self, k, *default):
+        try:
+            v = self[k]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[k]
+        return v
+
+    def copy(self):
+        return Message(self)
+
+
 def config_logging(log_level='INFO'):
     """Configure logging level
 